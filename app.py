@@ -23,14 +23,103 @@ def main():
     parser.add_argument("--mix", "-m", action="store_true", help="音声結合モード")
     parser.add_argument("--performer", "-p", help="演者名（音声結合モード時に使用）")
     parser.add_argument("--date", "-d", help="日付（MMDD形式、音声結合モード時に使用）")
+    parser.add_argument(
+        "--trim", action="store_true", help="前後の無音を除去してから結合する（音声結合モード時に使用）"
+    )
+    parser.add_argument(
+        "--all", action="store_true", help="全演者・全日付をまとめて結合する（音声結合モード時に使用）"
+    )
+    parser.add_argument(
+        "--scan",
+        action="store_true",
+        help="インデックスに登録されていないテイクも演者フォルダから探して結合する（音声結合モード時に使用）",
+    )
+    parser.add_argument("--performers", help="演者名（カンマ区切り、音声結合モード時に使用）")
+    parser.add_argument("--from", dest="date_from", help="開始日（MMDD形式、音声結合モード時に使用）")
+    parser.add_argument("--to", dest="date_to", help="終了日（MMDD形式、音声結合モード時に使用）")
+    parser.add_argument(
+        "--batch", "-b", metavar="SCRIPT", help="台本（csv/tsv/txt）から一括生成するモード"
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        help="同時生成数（一括生成モード時、既定は4）・並列結合数（音声結合モード時、既定はCPU数）",
+    )
+    parser.add_argument("--manifest", help="マニフェストの出力パス（一括生成モード時に使用）")
+    parser.add_argument(
+        "--rebuild-index", action="store_true", help="保存済みの音声ファイルからテイクのインデックスを作り直す"
+    )
+    parser.add_argument(
+        "--fresh", action="store_true", help="キャッシュを使わずに生成し直す（一括生成モード時に使用）"
+    )
 
     args = parser.parse_args()
 
     try:
+        # テイクのインデックスを作り直す場合
+        if args.rebuild_index:
+            from utils.audio.mix_audio import ROOT_DIR as TAKES_DIR
+            from utils.audio.take_index import TakeIndex
+
+            result = TakeIndex.for_root(TAKES_DIR).rebuild()
+            print(
+                f"追加: {result['added']}, 更新: {result['updated']}, "
+                f"削除: {result['removed']}, 登録数: {result['total']}"
+            )
+
+        # 一括生成モードの場合
+        elif args.batch:
+            logger.info("一括生成モードで実行します")
+
+            if not os.path.exists(args.batch):
+                logger.error(f"台本ファイルが見つかりません: {args.batch}")
+                print(f"台本ファイルが見つかりません: {args.batch}")
+                sys.exit(1)
+
+            from utils.audio.batch_render import render_script
+
+            summary = render_script(args.batch, args.manifest, args.jobs or 4, args.fresh)
+
+            print(f"成功: {summary['ok']}, 失敗: {summary['error']}")
+            print(f"所要時間: {summary['elapsed_sec']:.1f}秒")
+            print(f"マニフェスト: {summary['manifest']}")
+            if summary["error"]:
+                sys.exit(1)
+
+            logger.info("処理が完了しました")
+            print("処理が完了しました")
+
         # 音声結合モードの場合
-        if args.mix:
+        elif args.mix:
             logger.info("音声結合モードで実行します")
 
+            # 複数の演者・日付をまとめて結合する場合
+            if args.all or args.performers or args.date_from or args.date_to:
+                from utils.audio.mix_all import format_summary, mix_all
+
+                performers = None
+                if args.performers:
+                    performers = [p.strip() for p in args.performers.split(",") if p.strip()]
+                elif args.performer:
+                    performers = [args.performer]
+                date_from = args.date_from or args.date
+                date_to = args.date_to or args.date
+
+                results, elapsed = mix_all(performers, date_from, date_to, args.jobs, scan=args.scan, trim=args.trim)
+                if not results:
+                    logger.error("結合対象の音声ファイルが見つかりません")
+                    print("結合対象の音声ファイルが見つかりません")
+                    sys.exit(1)
+
+                print(format_summary(results, elapsed))
+                if not all(result["output"] for result in results):
+                    sys.exit(1)
+
+                logger.info("処理が完了しました")
+                print("処理が完了しました")
+                return
+
             if not args.performer:
                 logger.error("演者名が指定されていません")
                 print("演者名を指定してください（例: --performer <演者名>）")
@@ -39,7 +128,7 @@ def main():
             # 音声結合処理を実行
             from utils.audio.mix_audio import process_audio
 
-            mixed_file = process_audio(args.performer, args.date)
+            mixed_file = process_audio(args.performer, args.date, trim=args.trim, scan=args.scan)
 
             if mixed_file:
                 logger.info(f"結合ファイル: {mixed_file}")
@@ -88,4 +177,8 @@ def main():
 
 
 if __name__ == "__main__":
+    # PyInstallerでビルドした実行ファイルでもプロセスプールを使えるようにする
+    import multiprocessing
+
+    multiprocessing.freeze_support()
     main()
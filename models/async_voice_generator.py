@@ -0,0 +1,331 @@
+import asyncio
+import concurrent.futures
+import contextlib
+import json
+import threading
+import weakref
+from websockets.asyncio.client import connect
+from models.cancellation import POLL_INTERVAL, GenerationCancelled
+from models.event_decoder import decode_event
+from models.generation_metrics import GenerationTimeline
+from models.realtime_session import build_session_update, build_text_item
+from models.voice_generator import VoiceGenerator
+from utils.audio.time_stretch import create_stretcher
+from utils.logger import get_logger
+
+# ロガーの取得
+logger = get_logger()
+
+
+class AsyncVoiceGenerator(VoiceGenerator):
+    """asyncioベースの音声生成エンジン
+
+    1つのイベントループ上で複数の生成を同時に実行できる。
+    生成ごとに独立したWebSocket接続と一時WAVファイル（memory_takesが有効な場合はメモリ）を使用し、
+    返された一時ファイルの管理は呼び出し側が行う。
+    """
+
+    def __init__(self, max_concurrency: int = 4, use_cache: bool = False, memory_takes: bool = False):
+        """
+        Args:
+            max_concurrency (int): 同時に開くWebSocket接続の上限
+            use_cache (bool): Trueの場合、同じ内容の生成結果をディスクから再利用する
+            memory_takes (bool): Trueの場合、生成したテイクをメモリに保持し、保存するまでファイルを作らない
+        """
+        super().__init__(use_cache=use_cache, memory_takes=memory_takes)
+        self.max_concurrency = max_concurrency
+        # セマフォはイベントループごとに作成する
+        self._semaphores = weakref.WeakKeyDictionary()
+        self._loop = None
+        self._loop_thread = None
+        self._sync_future = None
+        # generate_takes_syncで生成した未保存のテイク
+        self.takes = []
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    async def generate_voice(
+        self,
+        system_prompt: str,
+        acting_prompt: str,
+        text: str,
+        progress_callback=None,
+        actor: str = None,
+        force_fresh: bool = False,
+        timeout: float = None,
+    ) -> str:
+        """音声を生成し、一時WAVファイルのパスを返す
+
+        Args:
+            system_prompt (str): システムプロンプト
+            acting_prompt (str): 演技指導
+            text (str): セリフ
+            progress_callback (callable, optional): 進行状況コールバック
+            actor (str, optional): 演者名。省略時はset_actorで設定した演者
+            force_fresh (bool, optional): Trueの場合はキャッシュを使わずに生成する
+            timeout (float, optional): 接続から受信完了までのタイムアウト秒数
+
+        Raises:
+            TimeoutError: タイムアウトした場合（途中までの音声は破棄される）
+
+        Returns:
+            str: 生成された一時WAVファイルのパス
+        """
+        actor = actor or self.current_actor
+        if not actor:
+            logger.error("演者が設定されていません")
+            raise ValueError(
+                "演者が設定されていません。set_actorを呼び出してください。"
+            )
+
+        if progress_callback:
+            progress_callback("🎯 演者設定を確認中...")
+        voice_config = self._get_voice_config(actor)
+        prompt_text = f"{acting_prompt}\n「{text}」"
+        logger.info(f"音声生成開始 - 演者: {actor}")
+        timeline = GenerationTimeline(actor, text, voice=voice_config["voice"])
+
+        cache_key = None
+        if self.cache:
+            cache_key = self.cache.make_key(
+                self.ws_url, voice_config["voice"], voice_config["speed"], system_prompt, prompt_text
+            )
+            cached_file = None if force_fresh else self.cache.get(cache_key)
+            if cached_file:
+                temp_file = await asyncio.to_thread(self._load_cached_take, cached_file)
+                self.temp_file = temp_file
+                self._remember_take(temp_file, system_prompt, acting_prompt, text)
+                timeline.info["cache_hit"] = True
+                self.metrics.record(timeline)
+                return temp_file
+
+        try:
+            async with self._get_semaphore():
+                if progress_callback:
+                    progress_callback("🔗 WebSocket接続を確立中...")
+                writer = self._new_take_writer()
+                try:
+                    # 応答が止まった場合も接続枠を占有し続けないよう期限を設ける
+                    try:
+                        async with asyncio.timeout(timeout):
+                            await self._receive_audio(
+                                writer,
+                                voice_config["voice"],
+                                system_prompt,
+                                prompt_text,
+                                progress_callback,
+                                timeline,
+                                speed=voice_config["speed"],
+                            )
+                    except TimeoutError:
+                        raise TimeoutError(f"Realtime APIの応答がタイムアウトしました（{timeout}秒）") from None
+                    if writer.bytes_written == 0:
+                        raise Exception("音声ファイルの生成に失敗しました")
+                except BaseException:
+                    # エラー・キャンセル時は書き込み途中のファイルを削除
+                    writer.abort()
+                    raise
+                temp_file = self._keep_take(writer)
+                timeline.mark("wav_written")
+
+            if cache_key:
+                await asyncio.to_thread(self._cache_take, cache_key, temp_file)
+            self.temp_file = temp_file
+            self._remember_take(temp_file, system_prompt, acting_prompt, text)
+            logger.info(f"音声ファイルを保存: {temp_file}")
+            return temp_file
+        except Exception as e:
+            logger.error(f"音声生成エラー: {str(e)}", exc_info=True)
+            timeline.error = str(e)
+            raise
+        finally:
+            self.metrics.record(timeline)
+
+    async def generate_takes(
+        self,
+        system_prompt: str,
+        acting_prompt: str,
+        text: str,
+        count: int,
+        progress_callback=None,
+        actor: str = None,
+        timeout: float = None,
+    ) -> list:
+        """同じセリフをcount回、独立した接続で同時に生成する
+
+        一部のテイクが失敗した場合は成功したテイクだけを返す。
+
+        Raises:
+            Exception: すべてのテイクが失敗した場合（最初のエラー）
+
+        Returns:
+            list: 生成された一時WAVファイルのパス（テイク番号順）
+        """
+        if count < 1:
+            raise ValueError("テイク数は1以上を指定してください")
+        actor = actor or self.current_actor
+        logger.info(f"{count}テイクを同時に生成します - 演者: {actor}")
+        results = await asyncio.gather(
+            *(
+                # 同じ内容でも別のテイクを録るため、キャッシュは使わない
+                self.generate_voice(
+                    system_prompt,
+                    acting_prompt,
+                    text,
+                    progress_callback,
+                    actor=actor,
+                    force_fresh=True,
+                    timeout=timeout,
+                )
+                for _ in range(count)
+            ),
+            return_exceptions=True,
+        )
+        takes = [result for result in results if isinstance(result, str)]
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if not takes:
+            raise errors[0]
+        if errors:
+            logger.warning(f"{len(errors)}テイクの生成に失敗しました: {errors[0]}")
+        return takes
+
+    async def _receive_audio(
+        self, writer, voice: str, system_prompt: str, text: str, progress_callback=None, timeline=None, speed=1.0
+    ):
+        """1回分の生成を行い、受信したPCMデータを演者の速度に変換してwriterへ書き込む"""
+        timeline = timeline or GenerationTimeline()
+        timeline.mark("connect")
+        async with connect(self.ws_url, additional_headers=self.ws_headers, max_size=None) as ws:
+            logger.info("WebSocket接続が確立されました")
+            timeline.mark("open")
+            await ws.send(json.dumps(build_session_update(voice, system_prompt)))
+            await ws.send(json.dumps(build_text_item(text)))
+            await ws.send(json.dumps({"type": "response.create"}))
+
+            if progress_callback:
+                progress_callback("🎵 音声データを受信中...")
+
+            try:
+                await self._receive_events(ws, writer, timeline, create_stretcher(speed))
+            except asyncio.CancelledError:
+                # 中止・タイムアウト時は生成中のレスポンスを中止してから接続を閉じる
+                with contextlib.suppress(Exception):
+                    await ws.send(json.dumps({"type": "response.cancel"}))
+                raise
+
+    async def _receive_events(self, ws, writer, timeline, stretcher=None):
+        """response.doneまでのイベントを受信し、音声をwriterへ書き込む"""
+        audio_done = False
+        async for message in ws:
+            event = decode_event(message)
+            event_type = event.type
+            if event_type == "response.audio.delta":
+                pcm = event.audio
+                if pcm is None:
+                    logger.error("音声データが未定義です")
+                    continue
+                timeline.add_chunk(len(pcm))
+                writer.write(stretcher.process(pcm) if stretcher else pcm)
+            elif event_type == "response.audio.done":
+                logger.info("音声データの受信が完了しました")
+                timeline.mark("audio_done")
+                if stretcher:
+                    writer.write(stretcher.flush())
+                audio_done = True
+            elif event_type == "response.done":
+                logger.info("レスポンスが完了しました")
+                break
+            elif event_type == "error":
+                raise Exception(f"Realtime APIエラー: {event.data.get('error')}")
+
+        if not audio_done:
+            raise Exception("音声データの受信が完了する前に接続が閉じられました")
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """同期呼び出し用のイベントループ（バックグラウンドスレッドで実行）を取得する"""
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            self._loop_thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+            self._loop_thread.start()
+        return self._loop
+
+    def generate_voice_sync(
+        self, system_prompt: str, acting_prompt: str, text: str, progress_callback=None, timeout: float = None
+    ) -> str:
+        """同期版の音声生成（既存のGUIから呼び出す用）
+
+        VoiceGenerator.generate_voiceと同様に、前回の未保存の一時ファイルは削除される。
+        別スレッドからcancel()を呼び出すとGenerationCancelledとなる。
+        """
+        previous = self.temp_file
+        temp_file = self._run_sync(
+            self.generate_voice(system_prompt, acting_prompt, text, progress_callback, timeout=timeout)
+        )
+        if previous and previous != temp_file:
+            self._forget_take(previous)
+        return temp_file
+
+    def generate_takes_sync(
+        self,
+        system_prompt: str,
+        acting_prompt: str,
+        text: str,
+        count: int,
+        actor: str = None,
+        timeout: float = None,
+        on_wait=None,
+    ) -> list:
+        """同期版の複数テイク生成（GUIから呼び出す用）
+
+        前回生成したテイクのうち保存されていないものは削除される。
+        別スレッドまたはon_waitの中からcancel()を呼び出すとGenerationCancelledとなる。
+
+        Args:
+            on_wait (callable, optional): 待機中に定期的に呼び出すコールバック（GUIのイベント処理など）
+        """
+        for take in self.takes:
+            self._forget_take(take)
+            self.take_info.pop(take, None)
+        self.takes = []
+        self.takes = self._run_sync(
+            self.generate_takes(system_prompt, acting_prompt, text, count, actor=actor, timeout=timeout),
+            on_wait,
+        )
+        return list(self.takes)
+
+    def _run_sync(self, coro, on_wait=None):
+        """コルーチンをバックグラウンドのイベントループで実行し、結果を待つ"""
+        future = asyncio.run_coroutine_threadsafe(coro, self._get_loop())
+        self._sync_future = future
+        try:
+            if on_wait:
+                while not concurrent.futures.wait([future], timeout=POLL_INTERVAL).done:
+                    on_wait()
+            return future.result()
+        except concurrent.futures.CancelledError:
+            raise GenerationCancelled("生成が中止されました") from None
+        finally:
+            self._sync_future = None
+
+    def cancel(self):
+        """generate_voice_sync / generate_takes_syncで実行中の生成を中止する"""
+        future = self._sync_future
+        if future:
+            future.cancel()
+            logger.info("音声生成の中止を要求しました")
+
+    def close(self):
+        """接続とイベントループを閉じる"""
+        super().close()
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop_thread.join(timeout=5)
+            self._loop.close()
+            self._loop = None
+            self._loop_thread = None
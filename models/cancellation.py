@@ -0,0 +1,53 @@
+import time
+import threading
+
+# 待機中に中止・期限を確認する間隔（秒）
+POLL_INTERVAL = 0.05
+
+
+class GenerationCancelled(Exception):
+    """生成が中止された場合の例外"""
+
+
+class CancelToken:
+    """生成の中止を別スレッド（GUIなど）から通知するためのトークン"""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        """中止を要求する"""
+        self._event.set()
+
+    @property
+    def is_cancelled(self) -> bool:
+        """中止が要求されているかどうか"""
+        return self._event.is_set()
+
+
+def wait_for(event: threading.Event, timeout: float = None, cancel_token: CancelToken = None, on_wait=None):
+    """eventがセットされるまで待機する
+
+    Args:
+        event (threading.Event): 待機するイベント
+        timeout (float, optional): タイムアウト秒数（Noneの場合は無期限）
+        cancel_token (CancelToken, optional): 中止を確認するトークン
+        on_wait (callable, optional): 待機中に定期的に呼び出すコールバック（GUIのイベント処理など）
+
+    Raises:
+        GenerationCancelled: 中止が要求された場合
+        TimeoutError: タイムアウトした場合
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        interval = POLL_INTERVAL
+        if deadline is not None:
+            interval = max(0.0, min(interval, deadline - time.monotonic()))
+        if event.wait(interval):
+            return
+        if cancel_token and cancel_token.is_cancelled:
+            raise GenerationCancelled("生成が中止されました")
+        if deadline is not None and time.monotonic() >= deadline:
+            raise TimeoutError("Realtime APIの応答がタイムアウトしました")
+        if on_wait:
+            on_wait()
@@ -0,0 +1,89 @@
+import json
+import binascii
+
+# orjsonがインストールされている場合は高速なJSONパーサーを使用する
+try:
+    import orjson
+
+    loads = orjson.loads
+    JSON_BACKEND = "orjson"
+except ImportError:
+    loads = json.loads
+    JSON_BACKEND = "json"
+
+AUDIO_DELTA = "response.audio.delta"
+
+# response.audio.deltaの判定と音声データの位置の検索に使う文字列
+# （区切り文字の後に空白が入る形式にも対応する）
+_DELTA_TYPE_PATTERNS = (f'"type":"{AUDIO_DELTA}"', f'"type": "{AUDIO_DELTA}"')
+_DELTA_KEY_PATTERNS = ('"delta":"', '"delta": "')
+_DELTA_TYPE_PATTERNS_BYTES = tuple(p.encode() for p in _DELTA_TYPE_PATTERNS)
+_DELTA_KEY_PATTERNS_BYTES = tuple(p.encode() for p in _DELTA_KEY_PATTERNS)
+
+
+def _find_audio_span(raw):
+    """response.audio.deltaの場合、音声データ（base64）の範囲を返す
+
+    音声データはメッセージの大部分を占めるため、JSONとして解析せずに位置だけを求める。
+    該当しない場合や判定できない場合はNoneを返す（通常のJSON解析を行う）。
+    """
+    if isinstance(raw, str):
+        type_patterns, key_patterns, quote = _DELTA_TYPE_PATTERNS, _DELTA_KEY_PATTERNS, '"'
+    else:
+        type_patterns, key_patterns, quote = _DELTA_TYPE_PATTERNS_BYTES, _DELTA_KEY_PATTERNS_BYTES, b'"'
+
+    if not any(pattern in raw for pattern in type_patterns):
+        return None
+    for pattern in key_patterns:
+        start = raw.find(pattern)
+        if start != -1:
+            start += len(pattern)
+            end = raw.find(quote, start)
+            if end == -1:
+                return None
+            return start, end
+    return None
+
+
+class RealtimeEvent:
+    """Realtime APIから受信したイベント
+
+    response.audio.deltaはJSON全体を解析せずに種類を判定し、
+    音声データは参照された時にだけbase64をデコードする。
+    その他のイベントは通常どおりJSONとして解析する。
+    """
+
+    __slots__ = ("raw", "type", "_data", "_span")
+
+    def __init__(self, raw):
+        self.raw = raw
+        self._data = None
+        self._span = _find_audio_span(raw)
+        if self._span is not None:
+            self.type = AUDIO_DELTA
+        else:
+            self._data = loads(raw)
+            self.type = self._data.get("type") if isinstance(self._data, dict) else None
+
+    @property
+    def data(self) -> dict:
+        """イベント全体（音声イベントの場合は参照時に解析する）"""
+        if self._data is None:
+            self._data = loads(self.raw)
+        return self._data
+
+    @property
+    def audio(self):
+        """音声データ（PCM16）。音声イベントでない場合はNone"""
+        if self._span is not None:
+            start, end = self._span
+            chunk = self.raw[start:end] if isinstance(self.raw, str) else memoryview(self.raw)[start:end]
+            return binascii.a2b_base64(chunk)
+        if self.type == AUDIO_DELTA and "delta" in self.data:
+            return binascii.a2b_base64(self.data["delta"])
+        return None
+
+
+def decode_event(raw) -> RealtimeEvent:
+    """受信したメッセージ（str / bytes）をイベントに変換する"""
+    return RealtimeEvent(raw)
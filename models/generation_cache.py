@@ -0,0 +1,143 @@
+import os
+import json
+import wave
+import contextlib
+import shutil
+import hashlib
+import tempfile
+import threading
+from utils.logger import get_logger
+
+# ロガーの取得
+logger = get_logger()
+
+
+class GenerationCache:
+    """生成結果をディスクに保存し、同じリクエストを再利用するキャッシュ
+
+    キーはモデルURL・音声・速度・システムプロンプト・送信テキストのハッシュ。
+    エントリの最終利用時刻はファイルの更新時刻で管理し、
+    合計サイズがmax_bytesを超えた場合は最も古いものから削除する（LRU）。
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 500 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(model_url: str, voice: str, speed: float, system_prompt: str, text: str) -> str:
+        """リクエスト内容からキャッシュキーを作成する"""
+        payload = json.dumps(
+            [model_url, voice, speed, system_prompt, text], ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.wav")
+
+    def get(self, key: str):
+        """キャッシュされたファイルのパスを返す（存在しない場合はNone）"""
+        path = self._path(key)
+        with self._lock:
+            if os.path.exists(path):
+                self.hits += 1
+                # 最終利用時刻を更新（LRU）
+                try:
+                    os.utime(path)
+                except OSError:
+                    pass
+                logger.info(f"キャッシュヒット: {key[:12]}")
+                return path
+            self.misses += 1
+            return None
+
+    def put(self, key: str, file_path: str):
+        """生成したファイルをキャッシュに登録する"""
+        path = self._path(key)
+        tmp_path = None
+        try:
+            # 書き込み途中のファイルを読まれないよう、一時ファイルにコピーしてから置き換える
+            fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=self.cache_dir)
+            os.close(fd)
+            shutil.copyfile(file_path, tmp_path)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"キャッシュへの登録に失敗: {e}")
+            if tmp_path:
+                with contextlib.suppress(OSError):
+                    os.remove(tmp_path)
+            return
+        logger.debug(f"キャッシュに登録: {key[:12]}")
+        self.evict()
+
+    def put_pcm(self, key: str, pcm: bytes, samplerate: int = 24000):
+        """メモリ上の音声データ（PCM16・モノラル）をWAVファイルとしてキャッシュに登録する"""
+        path = self._path(key)
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=self.cache_dir)
+            with os.fdopen(fd, "wb") as f, wave.open(f, "wb") as wav_file:
+                wav_file.setnchannels(1)
+                wav_file.setsampwidth(2)
+                wav_file.setframerate(samplerate)
+                wav_file.writeframes(pcm)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"キャッシュへの登録に失敗: {e}")
+            if tmp_path:
+                with contextlib.suppress(OSError):
+                    os.remove(tmp_path)
+            return
+        logger.debug(f"キャッシュに登録: {key[:12]}")
+        self.evict()
+
+    def evict(self):
+        """合計サイズが上限を超えた場合、古いエントリから削除する"""
+        with self._lock:
+            entries = []
+            total = 0
+            for entry in os.scandir(self.cache_dir):
+                if entry.is_file() and entry.name.endswith(".wav"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                    logger.debug(f"キャッシュから削除: {os.path.basename(path)}")
+                except OSError as e:
+                    logger.warning(f"キャッシュの削除に失敗: {e}")
+
+    def clear(self):
+        """キャッシュをすべて削除する"""
+        with self._lock:
+            for entry in os.scandir(self.cache_dir):
+                if entry.is_file():
+                    try:
+                        os.remove(entry.path)
+                    except OSError as e:
+                        logger.warning(f"キャッシュの削除に失敗: {e}")
+
+    def stats(self) -> dict:
+        """キャッシュの統計情報を返す"""
+        entries = 0
+        total = 0
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith(".wav"):
+                entries += 1
+                total += entry.stat().st_size
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": entries,
+            "bytes": total,
+        }
@@ -0,0 +1,186 @@
+import os
+import json
+import time
+import uuid
+import threading
+from collections import deque
+from datetime import datetime
+from utils.logger import get_logger
+
+# ロガーの取得
+logger = get_logger()
+
+# Realtime APIの出力音声フォーマット（PCM16 / 24kHz / モノラル）
+BYTES_PER_SECOND = 24000 * 2
+
+# 記録するタイミング（記録順）
+#   start:          generate_voiceの呼び出し
+#   connect:        WebSocket接続の開始
+#   open:           接続完了（セッション再利用時は接続済みを確認した時点）
+#   first_delta:    最初のresponse.audio.delta
+#   last_delta:     最後のresponse.audio.delta
+#   audio_done:     response.audio.done
+#   wav_written:    WAVファイルの書き込み完了
+#   playback_start: 再生開始
+#   end:            生成処理の終了
+MARKS = (
+    "start",
+    "connect",
+    "open",
+    "first_delta",
+    "last_delta",
+    "audio_done",
+    "wav_written",
+    "playback_start",
+    "end",
+)
+
+
+class GenerationTimeline:
+    """1回の生成の各段階の時刻と受信量を記録するタイムライン"""
+
+    def __init__(self, actor: str = None, text: str = "", **info):
+        self.id = uuid.uuid4().hex[:12]
+        self.actor = actor
+        self.text = text
+        self.info = info
+        self.started_at = datetime.now().isoformat(timespec="milliseconds")
+        self.bytes_received = 0
+        self.chunks = 0
+        self.error = None
+        self._origin = time.perf_counter()
+        self.marks = {"start": 0.0}
+
+    def _elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._origin) * 1000
+
+    def mark(self, name: str):
+        """現在時刻を記録する（既に記録済みの場合は最初の時刻を残す）"""
+        if name not in self.marks:
+            self.marks[name] = self._elapsed_ms()
+
+    def add_chunk(self, size: int):
+        """音声チャンクの受信を記録する"""
+        now = self._elapsed_ms()
+        if self.chunks == 0:
+            self.marks["first_delta"] = now
+        self.marks["last_delta"] = now
+        self.chunks += 1
+        self.bytes_received += size
+
+    def _between(self, start: str, end: str):
+        if start in self.marks and end in self.marks:
+            return self.marks[end] - self.marks[start]
+        return None
+
+    @property
+    def ttfb_ms(self):
+        """生成開始から最初の音声を受信するまでの時間"""
+        return self._between("start", "first_delta")
+
+    @property
+    def server_ttfb_ms(self):
+        """接続完了から最初の音声を受信するまでの時間（ネットワーク+サーバー）"""
+        return self._between("open", "first_delta")
+
+    @property
+    def total_ms(self):
+        """生成開始から終了までの時間"""
+        return self._between("start", "end")
+
+    @property
+    def audio_sec(self) -> float:
+        """受信した音声の長さ（秒）"""
+        return self.bytes_received / BYTES_PER_SECOND
+
+    @property
+    def realtime_factor(self):
+        """経過時間1秒あたりに受信した音声の秒数"""
+        total_ms = self.total_ms
+        if not total_ms:
+            return None
+        return self.audio_sec / (total_ms / 1000)
+
+    def to_record(self) -> dict:
+        """JSONLへ出力する形式に変換する"""
+        def rounded(value):
+            return None if value is None else round(value, 3)
+
+        return {
+            "id": self.id,
+            "started_at": self.started_at,
+            "actor": self.actor,
+            "text": self.text,
+            **self.info,
+            "marks_ms": {name: round(self.marks[name], 3) for name in MARKS if name in self.marks},
+            "ttfb_ms": rounded(self.ttfb_ms),
+            "server_ttfb_ms": rounded(self.server_ttfb_ms),
+            "total_ms": rounded(self.total_ms),
+            "audio_sec": round(self.audio_sec, 3),
+            "audio_sec_per_wall_sec": rounded(self.realtime_factor),
+            "bytes_received": self.bytes_received,
+            "chunks": self.chunks,
+            "error": self.error,
+        }
+
+
+class MetricsRecorder:
+    """生成のタイムラインを保持し、JSONLファイルへ出力する
+
+    直近の記録はメモリ上にも保持し、latest / historyで参照できる。
+    """
+
+    def __init__(self, log_dir: str = None, history_size: int = 100):
+        self.log_dir = log_dir
+        self.history = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+
+    @property
+    def latest(self):
+        """直近の記録（なければNone）"""
+        return self.history[-1] if self.history else None
+
+    @property
+    def log_file(self):
+        """出力先のJSONLファイル"""
+        if not self.log_dir:
+            return None
+        current_date = datetime.now().strftime("%Y-%m-%d")
+        return os.path.join(self.log_dir, f"metrics_{current_date}.jsonl")
+
+    def record(self, timeline: GenerationTimeline) -> dict:
+        """タイムラインを記録する"""
+        timeline.mark("end")
+        record = timeline.to_record()
+        with self._lock:
+            self.history.append(record)
+        self._write({"event": "generation", **record})
+
+        if record["ttfb_ms"] is not None:
+            logger.info(
+                f"生成時間: TTFB={record['ttfb_ms']:.0f}ms, 合計={record['total_ms']:.0f}ms, "
+                f"音声={record['audio_sec']:.2f}秒, 受信={record['bytes_received']}バイト"
+            )
+        return record
+
+    def record_playback(self, timeline: GenerationTimeline):
+        """生成後に再生を開始した時刻を記録する（受信中に再生しない場合）"""
+        timeline.mark("playback_start")
+        marks = timeline.to_record()["marks_ms"]
+        with self._lock:
+            for record in self.history:
+                if record["id"] == timeline.id:
+                    record["marks_ms"] = marks
+        self._write({"event": "playback", "id": timeline.id, "playback_start_ms": marks["playback_start"]})
+
+    def _write(self, record: dict):
+        log_file = self.log_file
+        if not log_file:
+            return
+        try:
+            with self._lock:
+                os.makedirs(self.log_dir, exist_ok=True)
+                with open(log_file, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except OSError as e:
+            logger.warning(f"メトリクスの書き込みに失敗: {e}")
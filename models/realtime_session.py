@@ -0,0 +1,466 @@
+import json
+import threading
+import time
+from models.cancellation import POLL_INTERVAL, GenerationCancelled, wait_for
+from models.event_decoder import decode_event
+from utils.logger import get_logger
+from websocket._app import WebSocketApp
+from websocket._exceptions import WebSocketConnectionClosedException
+
+# ロガーの取得
+logger = get_logger()
+
+
+def build_session_update(voice: str, instructions: str) -> dict:
+    """session.updateイベントを作成する"""
+    return {
+        "type": "session.update",
+        "session": {
+            "voice": voice,
+            "instructions": instructions,
+            "turn_detection": {"type": "server_vad"},
+            "modalities": ["text", "audio"],
+            "temperature": 0.8,
+        },
+    }
+
+
+def build_text_item(text: str) -> dict:
+    """conversation.item.createイベントを作成する"""
+    return {
+        "type": "conversation.item.create",
+        "item": {
+            "type": "message",
+            "role": "user",
+            "content": [{"type": "input_text", "text": text}],
+        },
+    }
+
+
+class RealtimeSession:
+    """Realtime APIとのWebSocket接続を維持し、複数回の生成で使い回すセッション
+
+    接続はバックグラウンドスレッドで維持し、pingで生存確認を行う。
+    切断されていた場合は次の生成時に自動で再接続する。
+    Realtime APIでは音声出力後にvoiceを変更できないため、voiceは固定とし、
+    instructionsが変わった場合のみsession.updateを送り直す。
+    """
+
+    def __init__(
+        self,
+        url: str,
+        headers: dict,
+        voice: str,
+        ping_interval: float = 20,
+        ping_timeout: float = 10,
+        connect_timeout: float = 10.0,
+        cancel_grace: float = 1.0,
+    ):
+        self.url = url
+        self.headers = headers
+        self.voice = voice
+        self.ping_interval = ping_interval
+        self.ping_timeout = ping_timeout
+        self.connect_timeout = connect_timeout
+        self.cancel_grace = cancel_grace
+
+        self.ws = None
+        self.instructions = None  # 現在の接続に適用済みのinstructions
+        self.last_used = time.monotonic()
+        self._thread = None
+        self._connected = threading.Event()
+        self._connect_finished = threading.Event()
+        self._response_done = threading.Event()
+        self._lock = threading.Lock()
+        self._listener = None
+        self._item_ids = []
+        self._error = None
+        self._retriable = True
+        # 中止したレスポンスの完了（response.done）をまだ確認していない場合True
+        self._cancel_pending = False
+
+    @property
+    def is_connected(self) -> bool:
+        """接続が有効かどうか"""
+        return self._connected.is_set() and self.ws is not None
+
+    def connect(self, deadline: float = None, cancel_token=None, on_wait=None):
+        """接続されていなければ接続する
+
+        接続の完了はconnect_timeoutと期限（deadline、time.monotonic()の値）の早い方まで待ち、
+        cancel_tokenで中止された場合は接続を閉じてGenerationCancelledとする。
+        """
+        if self.is_connected:
+            return
+
+        self._connected.clear()
+        self._connect_finished.clear()
+        # 新しい接続ではセッション設定をやり直す
+        self.instructions = None
+        self._cancel_pending = False
+        ws = WebSocketApp(
+            self.url,
+            header=self.headers,
+            on_message=self._on_message,
+            on_error=self._on_error,
+            on_close=self._on_close,
+            on_open=self._on_open,
+        )
+        self.ws = ws
+        self._thread = threading.Thread(
+            target=ws.run_forever,
+            kwargs={
+                "ping_interval": self.ping_interval,
+                "ping_timeout": self.ping_timeout,
+            },
+            daemon=True,
+        )
+        self._thread.start()
+
+        timeout = self.connect_timeout
+        if deadline is not None:
+            timeout = min(timeout, max(0.0, deadline - time.monotonic()))
+        try:
+            wait_for(self._connect_finished, timeout, cancel_token, on_wait)
+        except GenerationCancelled:
+            self.close()
+            raise
+        except TimeoutError:
+            self.close()
+            if deadline is not None and time.monotonic() >= deadline:
+                raise
+            raise ConnectionError("Realtime APIへ接続できませんでした") from None
+        if not self._connected.is_set():
+            self.close()
+            raise ConnectionError("Realtime APIへ接続できませんでした")
+
+    def close(self):
+        """接続を閉じる"""
+        ws = self.ws
+        self.ws = None
+        self._connected.clear()
+        if ws:
+            try:
+                ws.close()
+            except Exception as e:
+                logger.warning(f"セッションのクローズに失敗: {e}")
+
+    def update_instructions(self, instructions: str):
+        """instructionsが変わった場合のみsession.updateを送信する"""
+        if self.instructions == instructions:
+            logger.debug("セッション設定は変更なし（session.updateを省略）")
+            return
+        self.ws.send(json.dumps(build_session_update(self.voice, instructions)))
+        self.instructions = instructions
+        logger.info(f"セッション設定を送信: voice={self.voice}")
+
+    def warm(self, instructions: str) -> bool:
+        """事前に接続してセッション設定を送信しておく
+
+        生成中の場合は何もしない。
+
+        Returns:
+            bool: 事前接続を行った場合True
+        """
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            self.connect()
+            self.update_instructions(instructions)
+            self.last_used = time.monotonic()
+            return True
+        finally:
+            self._lock.release()
+
+    def close_if_idle(self, idle_timeout: float) -> bool:
+        """一定時間使われていない接続を閉じる
+
+        Returns:
+            bool: 接続を閉じた場合True
+        """
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            if not self.is_connected or time.monotonic() - self.last_used < idle_timeout:
+                return False
+            logger.info(f"使われていないセッションを閉じます: voice={self.voice}")
+            self.close()
+            return True
+        finally:
+            self._lock.release()
+
+    def request(
+        self,
+        instructions: str,
+        text: str,
+        on_message,
+        timeout: float = None,
+        on_connected=None,
+        cancel_token=None,
+        on_wait=None,
+    ):
+        """セリフを送信し、response.doneを受信するまで待機する
+
+        Args:
+            instructions (str): システムプロンプト
+            text (str): 送信するテキスト
+            on_message (callable): 受信メッセージを受け取るコールバック(ws, message)
+            timeout (float, optional): 応答待ちのタイムアウト秒数
+            on_connected (callable, optional): 接続を確認した後、送信前に呼び出すコールバック
+            cancel_token (CancelToken, optional): 中止を確認するトークン
+            on_wait (callable, optional): 応答待ちの間、定期的に呼び出すコールバック
+
+        timeoutは事前準備の完了待ち・接続・応答待ちを含めた全体に適用する。
+
+        Raises:
+            TimeoutError: タイムアウトした場合
+            ConnectionError: 受信途中で接続が切れた場合
+            GenerationCancelled: 中止が要求された場合
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self._acquire(deadline, cancel_token, on_wait)
+        try:
+            self.last_used = time.monotonic()
+            self._finish_cancel(deadline, cancel_token, on_wait)
+            # 音声受信前に切断された場合は一度だけ再接続してやり直す
+            for attempt in range(2):
+                self.connect(deadline, cancel_token, on_wait)
+                if on_connected:
+                    on_connected()
+                self._listener = on_message
+                self._response_done.clear()
+                self._error = None
+                self._retriable = True
+                try:
+                    self.update_instructions(instructions)
+                    self.ws.send(json.dumps(build_text_item(text)))
+                    self.ws.send(json.dumps({"type": "response.create"}))
+                except (WebSocketConnectionClosedException, AttributeError):
+                    logger.warning("セッションが切断されていたため再接続します")
+                    self.close()
+                    continue
+
+                try:
+                    wait_for(self._response_done, self._remaining(deadline), cancel_token, on_wait)
+                except GenerationCancelled:
+                    self._cancel_response()
+                    raise
+                except TimeoutError:
+                    self._listener = None
+                    self.close()
+                    raise
+                self._listener = None
+                self.last_used = time.monotonic()
+                if self._error is None:
+                    return
+                if not self._retriable or attempt == 1:
+                    raise ConnectionError(f"Realtime APIとの通信に失敗しました: {self._error}")
+                logger.warning(f"セッションを再接続します: {self._error}")
+                self.close()
+
+            raise ConnectionError("Realtime APIに再接続できませんでした")
+        finally:
+            self._lock.release()
+
+    @staticmethod
+    def _remaining(deadline):
+        """期限までの残り秒数（期限なしの場合はNone）"""
+        if deadline is None:
+            return None
+        return max(0.0, deadline - time.monotonic())
+
+    def _acquire(self, deadline, cancel_token=None, on_wait=None):
+        """生成のためにセッションを確保する（事前準備中の場合は終わるまで待つ）
+
+        待っている間も期限と中止を確認する。
+        """
+        while not self._lock.acquire(timeout=POLL_INTERVAL):
+            if cancel_token and cancel_token.is_cancelled:
+                raise GenerationCancelled("生成が中止されました")
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError("Realtime APIの応答がタイムアウトしました")
+            if on_wait:
+                on_wait()
+
+    def _cancel_response(self):
+        """生成中のレスポンスを中止する
+
+        中止の完了（response.done）は待たずに戻り、次の生成の前に確認する。
+        """
+        # 中止後に届く音声は呼び出し元へ渡さない
+        self._listener = None
+        try:
+            self.ws.send(json.dumps({"type": "response.cancel"}))
+            logger.info("レスポンスの中止を送信しました")
+        except Exception as e:
+            logger.warning(f"レスポンスの中止に失敗: {e}")
+            self.close()
+            return
+        self._cancel_pending = not self._response_done.is_set()
+
+    def _finish_cancel(self, deadline, cancel_token=None, on_wait=None):
+        """前回中止したレスポンスの完了を確認する
+
+        cancel_grace秒以内に完了（response.done）を受信できた場合は接続をそのまま使い回し、
+        受信できない場合は接続を閉じる（この後の接続で再接続する）。
+        """
+        if not self._cancel_pending or not self.is_connected:
+            self._cancel_pending = False
+            return
+        grace = self.cancel_grace
+        if deadline is not None:
+            grace = min(grace, self._remaining(deadline))
+        try:
+            wait_for(self._response_done, grace, cancel_token, on_wait)
+        except TimeoutError:
+            logger.warning("中止の完了を確認できないため接続を閉じます")
+            self.close()
+        self._cancel_pending = False
+
+    def _delete_items(self):
+        """生成に使った会話アイテムを削除し、次のセリフに文脈を持ち越さない"""
+        item_ids, self._item_ids = self._item_ids, []
+        for item_id in item_ids:
+            try:
+                self.ws.send(json.dumps({"type": "conversation.item.delete", "item_id": item_id}))
+            except Exception as e:
+                logger.warning(f"会話アイテムの削除に失敗: {e}")
+                return
+
+    def _on_open(self, ws):
+        logger.info("Realtimeセッションを確立しました")
+        self._connected.set()
+        self._connect_finished.set()
+
+    def _on_message(self, ws, message):
+        try:
+            event = decode_event(message)
+        except ValueError:
+            logger.error("受信データを解析できません")
+            return
+
+        event_type = event.type
+        if event_type == "conversation.item.created":
+            self._item_ids.append(event.data.get("item", {}).get("id"))
+        elif event_type == "response.audio.delta":
+            # 音声を受信し始めた後の切断はやり直さない
+            self._retriable = False
+
+        listener = self._listener
+        if listener:
+            listener(ws, message)
+
+        if event_type == "error":
+            logger.error(f"Realtime APIエラー: {event.data.get('error')}")
+            if listener:
+                # 生成中のサーバーエラーは再接続しても解決しないため即座に失敗とする
+                self._error = event.data.get("error")
+                self._retriable = False
+                self._response_done.set()
+
+        if event_type == "response.done":
+            self._delete_items()
+            self._response_done.set()
+
+    def _on_error(self, ws, error):
+        logger.error(f"セッションのWebSocketエラー: {str(error)}")
+        if ws is self.ws:
+            self._error = error
+
+    def _on_close(self, ws, close_status_code, close_msg):
+        logger.info("Realtimeセッションが閉じられました")
+        # 明示的に閉じた古い接続の通知は無視する
+        if ws is not self.ws:
+            return
+        self._connected.clear()
+        self._connect_finished.set()
+        if self._error is None:
+            self._error = close_msg or "connection closed"
+        self._response_done.set()
+
+
+class RealtimeSessionManager:
+    """演者・音声ごとにRealtimeSessionを保持して使い回す
+
+    idle_timeout秒以上使われていないセッションはバックグラウンドで閉じる。
+    """
+
+    def __init__(self, url: str, headers: dict, idle_timeout: float = 300):
+        self.url = url
+        self.headers = headers
+        self.idle_timeout = idle_timeout
+        self.sessions = {}
+        self._lock = threading.Lock()
+        self._reaper = None
+        self._reaper_stop = threading.Event()
+
+    def get_session(self, actor: str, voice: str) -> RealtimeSession:
+        """演者と音声に対応するセッションを取得する（なければ作成する）"""
+        key = (actor, voice)
+        with self._lock:
+            session = self.sessions.get(key)
+            if session is None:
+                session = RealtimeSession(self.url, self.headers, voice)
+                self.sessions[key] = session
+                logger.info(f"新しいセッションを作成: 演者={actor}, voice={voice}")
+            self._start_reaper()
+            return session
+
+    def prewarm(self, actor: str, voice: str, instructions: str) -> threading.Thread:
+        """バックグラウンドで接続し、セッション設定を送信しておく"""
+        session = self.get_session(actor, voice)
+
+        def warm():
+            try:
+                if session.warm(instructions):
+                    logger.info(f"セッションを事前に準備しました: 演者={actor}")
+            except Exception as e:
+                logger.warning(f"セッションの事前準備に失敗: {e}")
+
+        thread = threading.Thread(target=warm, daemon=True)
+        thread.start()
+        return thread
+
+    def close_idle(self) -> int:
+        """使われていないセッションを閉じ、閉じた数を返す"""
+        with self._lock:
+            sessions = list(self.sessions.items())
+        closed = 0
+        for key, session in sessions:
+            if session.close_if_idle(self.idle_timeout):
+                with self._lock:
+                    if self.sessions.get(key) is session:
+                        del self.sessions[key]
+                closed += 1
+        return closed
+
+    def _start_reaper(self):
+        """使われていないセッションを定期的に閉じるスレッドを開始する"""
+        if not self.idle_timeout:
+            return
+        if self._reaper and self._reaper.is_alive() and not self._reaper_stop.is_set():
+            return
+        # 停止済みのスレッドと区別するため、停止用のイベントはスレッドごとに作成する
+        self._reaper_stop = threading.Event()
+        self._reaper = threading.Thread(target=self._reap, args=(self._reaper_stop,), daemon=True)
+        self._reaper.start()
+
+    def _reap(self, stop: threading.Event):
+        interval = max(0.01, min(self.idle_timeout / 2, 30))
+        while not stop.wait(interval):
+            self.close_idle()
+
+    def set_url(self, url: str):
+        """接続先を変更する（既存のセッションは閉じる）"""
+        self.close_all()
+        self.url = url
+        logger.info(f"接続先を変更: {url}")
+
+    def close_all(self):
+        """すべてのセッションを閉じる"""
+        self._reaper_stop.set()
+        with self._lock:
+            sessions = list(self.sessions.values())
+            self.sessions.clear()
+        for session in sessions:
+            session.close()
@@ -0,0 +1,185 @@
+import os
+import time
+import tempfile
+import threading
+from utils.logger import get_logger
+
+# ロガーの取得
+logger = get_logger()
+
+# 一時ファイル名の接頭辞（共有の一時ディレクトリでは、この名前のファイルだけを管理する）
+PREFIX = "take_"
+# 他のプロセスが書き込み中の可能性があるため、作成から一定時間は容量超過でも削除しない
+GRACE_SECONDS = 10 * 60
+# 作成時の掃除の間隔（前回の掃除から一定時間経つか、一定数のファイルを作成したら掃除する）
+SWEEP_INTERVAL = 60.0
+SWEEP_EVERY = 100
+
+
+def _read_umask() -> int:
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+# 起動時のumask（読み取るには一時的に変更する必要があるため、スレッドが動き出す前の読み込み時に取得する）
+UMASK = _read_umask()
+
+
+def apply_default_mode(path: str):
+    """一時ファイル（所有者だけが読み書きできる）を、通常に作成したファイルと同じ権限にする
+
+    一時ファイルを保存先へ移動する前に呼び出す。
+    """
+    os.chmod(path, 0o666 & ~UMASK)
+
+
+class TempStore:
+    """生成した音声の一時ファイルを管理するストア
+
+    ファイルは名前を予約して排他的に作成する（他のプロセスと同じ名前を使わない）。
+    合計サイズがmax_bytesを超えた場合は古いものから、max_age秒より古いものは無条件に削除する。
+    このインスタンスで作成して使用中のファイル（releaseされていないもの）は削除しない。
+    作成時にも一定の間隔で掃除するため、異常終了などで残ったファイルも次回の起動時に削除される。
+    同じプロセス内では、for_dirでディレクトリごとに1つのストアを共有する
+    （別々のストアが互いの使用中のファイルを削除しないようにする）。
+    """
+
+    _stores = {}
+    _stores_lock = threading.Lock()
+
+    def __init__(
+        self,
+        temp_dir: str,
+        max_bytes: int = 1024 * 1024 * 1024,
+        max_age: float = 24 * 60 * 60,
+        shared: bool = False,
+        sweep_interval: float = SWEEP_INTERVAL,
+        sweep_every: int = SWEEP_EVERY,
+    ):
+        """
+        Args:
+            temp_dir (str): 一時ファイルの保存先ディレクトリ
+            max_bytes (int): 一時ファイルの合計サイズの上限
+            max_age (float): 一時ファイルを残しておく秒数
+            shared (bool): Trueの場合、他のアプリケーションと共有するディレクトリとして接頭辞の付いたファイルだけを扱う
+            sweep_interval (float): 作成時に掃除する間隔（秒）
+            sweep_every (int): この数のファイルを作成したら、間隔に関係なく掃除する
+        """
+        self.temp_dir = temp_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.shared = shared
+        self.sweep_interval = sweep_interval
+        self.sweep_every = sweep_every
+        self._active = set()
+        self._lock = threading.Lock()
+        self._created_since_sweep = 0
+        self._last_sweep = time.monotonic()
+        os.makedirs(temp_dir, exist_ok=True)
+        self.sweep()
+        usage = self.usage()
+        logger.info(f"一時ファイル: {usage['files']}件 ({usage['bytes'] / 1024 / 1024:.1f}MB) - {temp_dir}")
+
+    @classmethod
+    def for_dir(cls, temp_dir: str, **kwargs) -> "TempStore":
+        """ディレクトリのストアを返す（同じディレクトリには同じストアを返す）
+
+        最初に作成した時の設定（kwargs）を使う。
+        """
+        key = os.path.abspath(temp_dir)
+        with cls._stores_lock:
+            store = cls._stores.get(key)
+            if store is None:
+                store = cls._stores[key] = cls(temp_dir, **kwargs)
+            return store
+
+    @classmethod
+    def get(cls, temp_dir: str):
+        """for_dirで作成済みのストアを返す（ない場合はNone）"""
+        with cls._stores_lock:
+            return cls._stores.get(os.path.abspath(temp_dir))
+
+    def create(self, suffix: str = ".wav") -> str:
+        """空の一時ファイルを排他的に作成し、そのパスを返す
+
+        前回の掃除からsweep_interval秒経つか、sweep_every個のファイルを作成した場合は掃除する。
+        """
+        fd, path = tempfile.mkstemp(prefix=PREFIX, suffix=suffix, dir=self.temp_dir)
+        os.close(fd)
+        with self._lock:
+            self._active.add(path)
+            self._created_since_sweep += 1
+            due = (
+                self._created_since_sweep >= self.sweep_every
+                or time.monotonic() - self._last_sweep >= self.sweep_interval
+            )
+        if due:
+            self.sweep()
+        return path
+
+    def release(self, path: str):
+        """一時ファイルを使用中から外す（削除・移動した後や、残す必要がなくなった時に呼び出す）"""
+        with self._lock:
+            self._active.discard(path)
+
+    def _is_managed(self, name: str) -> bool:
+        if name.startswith(PREFIX):
+            return True
+        # 専用のディレクトリでは以前の形式の一時ファイル（tmp*.wav）も対象とする
+        return not self.shared and name.endswith(".wav")
+
+    def _entries(self) -> list:
+        """管理対象のファイルを（更新時刻, サイズ, パス）の古い順で返す"""
+        entries = []
+        for entry in os.scandir(self.temp_dir):
+            if entry.is_file() and self._is_managed(entry.name):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort()
+        return entries
+
+    def sweep(self) -> int:
+        """古いファイルと上限を超えた分のファイルを削除し、削除した件数を返す"""
+        now = time.time()
+        removed = 0
+        with self._lock:
+            self._created_since_sweep = 0
+            self._last_sweep = time.monotonic()
+            entries = self._entries()
+            # 保存などで移動・削除されたファイルは使用中から外す
+            self._active &= {path for _, _, path in entries}
+            total = sum(size for _, size, _ in entries)
+            for mtime, size, path in entries:
+                if path in self._active:
+                    continue
+                age = now - mtime
+                if age <= self.max_age and (total <= self.max_bytes or age <= GRACE_SECONDS):
+                    continue
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    logger.warning(f"一時ファイルの削除に失敗しました: {e}")
+                    continue
+                total -= size
+                removed += 1
+        if removed:
+            logger.info(f"不要な一時ファイルを{removed}件削除しました")
+        if total > self.max_bytes:
+            logger.warning(f"一時ファイルの合計サイズが上限を超えています: {total}バイト（上限 {self.max_bytes}バイト）")
+        return removed
+
+    def usage(self) -> dict:
+        """一時ファイルの件数・合計サイズ・使用中の件数を返す"""
+        with self._lock:
+            entries = self._entries()
+            active = len(self._active)
+        return {
+            "files": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "active": active,
+            "max_bytes": self.max_bytes,
+        }
@@ -1,15 +1,42 @@
 import os
+import re
 import sys
+import shutil
 import tempfile
+import threading
+import time
+import contextlib
+import logging
 from datetime import datetime
 import soundfile as sf
 import sounddevice as sd
 from openai import OpenAI
 from utils.logger import get_logger
+from utils.audio.stream_player import StreamingPlayer
+from utils.audio.time_stretch import create_stretcher
+from utils.audio.silence_trim import (
+    DEFAULT_PADDING_MS,
+    DEFAULT_THRESHOLD_DB,
+    copy_range,
+    find_voiced_range_in_file,
+    trim_silence,
+)
+from utils.audio.take_index import TakeIndex
+from utils.audio.take_encoder import ENCODINGS, TakeEncoder
+from models.generation_cache import GenerationCache
+from models.temp_store import TempStore, apply_default_mode
+from models.generation_metrics import GenerationTimeline, MetricsRecorder
+from models.event_decoder import decode_event
+from models.cancellation import CancelToken, GenerationCancelled, wait_for
 from websocket._app import WebSocketApp
+from models.realtime_session import (
+    RealtimeSessionManager,
+    build_session_update,
+    build_text_item,
+)
 import json
-import base64
 import wave
+import numpy as np
 
 # ロガーの取得
 logger = get_logger()
@@ -23,16 +50,204 @@ else:
     # 通常の Python で実行されている場合
     ROOT_DIR = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
 
+# Realtime APIの接続先
+DEFAULT_WS_URL = "wss://api.openai.com/v1/realtime?model=gpt-4o-realtime-preview-2024-12-17"
+
+# 使われていない接続を閉じるまでの秒数
+SESSION_IDLE_TIMEOUT = 300
+
+# Realtime APIの出力音声フォーマット（PCM16 / 24kHz / モノラル）
+SAMPLE_RATE = 24000
+
+# システムプロンプトで速く読むよう指示している文（「通常より30%早く読んでください」など）
+SPEED_INSTRUCTION_PATTERN = re.compile(r"\d+\s*[%％]\s*[早速]く")
+
+# カーネル内でコピーできない場合に1回で読み書きするバイト数
+COPY_CHUNK_BYTES = 1024 * 1024
+
+
+def _copy_in_kernel(src_fd: int, dst_fd: int, size: int) -> bool:
+    """copy_file_range / sendfileでカーネル内でコピーする（使えない場合はFalse）"""
+    for name in ("copy_file_range", "sendfile"):
+        if not hasattr(os, name):
+            continue
+        offset = 0
+        try:
+            while offset < size:
+                if name == "copy_file_range":
+                    copied = os.copy_file_range(src_fd, dst_fd, size - offset, offset, offset)
+                else:
+                    # 書き込み先の位置は先頭のまま（前の方法が途中で失敗した場合も先頭から書き直す）
+                    copied = os.sendfile(dst_fd, src_fd, offset, size - offset)
+                if copied == 0:
+                    break
+                offset += copied
+        except OSError as e:
+            # ファイルシステムやOSが対応していない場合（EXDEV, ENOSYS, ENOTSOCKなど）
+            logger.debug(f"{name}でコピーできませんでした: {e}")
+            continue
+        if offset == size:
+            return True
+    return False
+
+
+def copy_file(source: str, destination: str):
+    """ファイルをコピーする
+
+    copy_file_range → sendfile → 一定サイズごとの読み書きの順に試し、
+    ファイル全体をメモリに読み込まずにコピーする。
+    """
+    try:
+        with open(source, "rb") as src, open(destination, "wb") as dst:
+            size = os.fstat(src.fileno()).st_size
+            if not _copy_in_kernel(src.fileno(), dst.fileno(), size):
+                src.seek(0)
+                dst.seek(0)
+                dst.truncate()
+                shutil.copyfileobj(src, dst, COPY_CHUNK_BYTES)
+    except BaseException:
+        # コピー途中のファイルを残さない
+        with contextlib.suppress(OSError):
+            os.remove(destination)
+        raise
+
+
+def move_file(source: str, destination: str):
+    """ファイルを移動する
+
+    同じファイルシステム内ではos.replaceで置き換える（データはコピーしない）。
+    異なるディスク間などで置き換えられない場合はコピーしてから元のファイルを削除する。
+    """
+    try:
+        os.replace(source, destination)
+        return
+    except OSError as e:
+        logger.debug(f"os.replaceで移動できないためコピーします: {e}")
+    copy_file(source, destination)
+    os.remove(source)
+
+
+class StreamingWavWriter:
+    """受信したPCM16データを逐次WAVファイルへ書き込むライター
+
+    受信データはメモリに保持せずそのままファイルへ書き込み、
+    close時にRIFFヘッダーのサイズを確定する。
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.bytes_written = 0
+        self._stack = contextlib.ExitStack()
+        self._wav_file = self._stack.enter_context(wave.open(file_path, "wb"))
+        self._wav_file.setnchannels(1)  # モノラル
+        self._wav_file.setsampwidth(2)  # 16ビット
+        self._wav_file.setframerate(SAMPLE_RATE)  # サンプルレート
+
+    def write(self, pcm: bytes):
+        """PCMデータを追記する"""
+        self._wav_file.writeframesraw(pcm)
+        self.bytes_written += len(pcm)
+
+    def close(self) -> str:
+        """ヘッダーを確定してファイルを閉じる"""
+        self._stack.close()
+        return self.file_path
+
+    def abort(self):
+        """書き込みを中止し、途中までのファイルを削除する"""
+        try:
+            self._stack.close()
+        except Exception as e:
+            logger.warning(f"WAVファイルのクローズに失敗: {e}")
+        try:
+            if os.path.exists(self.file_path):
+                os.remove(self.file_path)
+        except (OSError, PermissionError) as e:
+            logger.warning(f"一時ファイルの削除に失敗しました: {e}")
+
+
+# メモリに保持するテイクの上限（超えた分は一時ファイルへ書き出す、約5分）
+SPILL_BYTES = 16 * 1024 * 1024
+
+
+class TakeBuffer:
+    """受信したPCM16データをメモリに保持するバッファ
+
+    再生・保存まではファイルに書き込まず（file_pathは名前の予約のみ）、spill_bytesを超えた場合は
+    StreamingWavWriterに切り替えて以降のデータを一時ファイルへ書き込む。
+    close後、メモリに保持したままの場合はsamplesに音声データ（int16）が入る。
+    """
+
+    def __init__(self, file_path: str, spill_bytes: int = SPILL_BYTES):
+        self.file_path = file_path
+        self.spill_bytes = spill_bytes
+        self.bytes_written = 0
+        self.samples = None
+        self._buffer = bytearray()
+        self._writer = None
+
+    @property
+    def spilled(self) -> bool:
+        """一時ファイルへ書き出しているかどうか"""
+        return self._writer is not None
+
+    def write(self, pcm: bytes):
+        """PCMデータを追記する"""
+        self.bytes_written += len(pcm)
+        if self._writer:
+            self._writer.write(pcm)
+            return
+        self._buffer += pcm
+        if len(self._buffer) > self.spill_bytes:
+            logger.info(f"音声が{self.spill_bytes}バイトを超えたため一時ファイルへ書き出します: {self.file_path}")
+            self._writer = StreamingWavWriter(self.file_path)
+            self._writer.write(bytes(self._buffer))
+            self._buffer = bytearray()
+
+    def close(self) -> str:
+        """書き込みを終える（メモリに保持している場合はsamplesに音声データを設定する）"""
+        if self._writer:
+            return self._writer.close()
+        # 16ビット単位で読み込めない端数は捨てる
+        usable = len(self._buffer) - len(self._buffer) % 2
+        self.samples = np.frombuffer(self._buffer, dtype=np.int16, count=usable // 2)
+        self._buffer = bytearray()
+        return self.file_path
+
+    def abort(self):
+        """書き込みを中止し、途中までのデータを破棄する"""
+        self._buffer = bytearray()
+        if self._writer:
+            self._writer.abort()
+        elif os.path.exists(self.file_path):
+            # 名前の予約のために作成した空のファイルを削除
+            try:
+                os.remove(self.file_path)
+            except (OSError, PermissionError) as e:
+                logger.warning(f"一時ファイルの削除に失敗しました: {e}")
 
 
 class VoiceGenerator:
     # その他の演者用のデフォルト設定
     FALLBACK_VOICE_SETTING = {
         "voice": "alloy",  # デフォルト音声
-        "speed": 1.3,  # 通常より30%早く
+        "speed": 1.0,  # 速度変更なし
     }
 
-    def __init__(self):
+    def __init__(
+        self,
+        reuse_sessions: bool = False,
+        use_cache: bool = False,
+        session_idle_timeout: float = SESSION_IDLE_TIMEOUT,
+        memory_takes: bool = False,
+    ):
+        """
+        Args:
+            reuse_sessions (bool): Trueの場合、演者ごとのWebSocket接続を維持して使い回す
+            use_cache (bool): Trueの場合、同じ内容の生成結果をディスクから再利用する
+            session_idle_timeout (float): 使われていない接続を閉じるまでの秒数
+            memory_takes (bool): Trueの場合、生成したテイクをメモリに保持し、保存するまでファイルを作らない
+        """
         api_key = self._get_api_key()
         if not api_key:
             logger.error("OPENAI_API_KEYが設定されていません")
@@ -42,26 +257,73 @@ class VoiceGenerator:
 
         # WebSocket接続の設定
         self.ws = None
-        self.ws_url = (
-            "wss://api.openai.com/v1/realtime?model=gpt-4o-realtime-preview-2024-12-17"
-        )
         self.ws_headers = {
             "Authorization": f"Bearer {api_key}",
             "OpenAI-Beta": "realtime=v1",
         }
-        self.audio_chunks = bytearray()
+        # 接続を使い回す場合のセッション管理
+        self.session_manager = (
+            RealtimeSessionManager(DEFAULT_WS_URL, self.ws_headers, session_idle_timeout)
+            if reuse_sessions
+            else None
+        )
+        # 接続先（環境変数でモックサーバーなどに変更可能）
+        self.ws_url = os.getenv("OPENAI_REALTIME_URL") or DEFAULT_WS_URL
+        # 受信中の音声を書き込むライター（生成ごとに作成）
+        self.wav_writer = None
+        # 受信しながら再生する場合のプレイヤー
+        self.stream_player = None
+        # 演者の速度設定を適用するストレッチャー（等速の場合はNone）
+        self.stretcher = None
+        # 保存時に前後の無音を除去する設定
+        self.trim_silence = True
+        self.silence_threshold_db = DEFAULT_THRESHOLD_DB
+        self.silence_padding_ms = DEFAULT_PADDING_MS
+        # 保存したテイクをインデックスに登録する設定と、一時ファイルごとのプロンプト・セリフ
+        self.index_takes = True
+        self.take_info = {}
+        # 保存したテイクを演者の保存形式（flac / opus）に変換するワーカー（必要になった時に作成）
+        self.encoder = None
+        # 生成結果のキャッシュ
+        self.cache = GenerationCache(self._get_cache_dir()) if use_cache else None
+        # 生成ごとの処理時間の記録（timelineは直近の生成）
+        self.metrics = MetricsRecorder(self._get_log_dir())
+        self.timeline = None
+        # 実行中の生成を中止するためのトークン
+        self.cancel_token = None
         self.client = OpenAI(api_key=api_key)
+        # メモリに保持しているテイク（一時ファイルのパス → int16の音声データ）
+        # spill_bytesを超えたテイクは一時ファイルへ書き出す
+        self.memory_takes = memory_takes
+        self.spill_bytes = SPILL_BYTES
+        self.takes_in_memory = {}
         self.temp_file = None
-        self._create_temp_file()
+        # 一時ファイルのストア（作成時に前回までに残った一時ファイルを掃除する）
+        self.temp_store = None
+        self._get_temp_store()
         self.current_actor = None
         self.current_system_prompt = ""
         self.current_text = ""
+        # プロンプトの速度指示のためにspeedを適用しなかったことを警告済みの演者
+        self.speed_warned_actors = set()
         
         # 演者設定をJSONから読み込み
         self.performer_configs = self.load_performer_configs()
         
         logger.info("VoiceGeneratorが初期化されました")
     
+    @property
+    def ws_url(self) -> str:
+        """Realtime APIの接続先URL"""
+        return self._ws_url
+
+    @ws_url.setter
+    def ws_url(self, url: str):
+        # 維持しているセッションも新しい接続先へ切り替える
+        self._ws_url = url
+        if self.session_manager and self.session_manager.url != url:
+            self.session_manager.set_url(url)
+
     def _get_api_key(self):
         """APIキーを取得（GUI設定ファイル → 環境変数の順で確認）"""
         # 1. GUI設定ファイルから取得を試行
@@ -87,13 +349,31 @@ class VoiceGenerator:
 
     def _create_temp_file(self):
         """一時ファイルを作成する"""
-        if self.temp_file and os.path.exists(self.temp_file):
-            try:
-                os.remove(self.temp_file)
-            except (OSError, PermissionError) as e:
-                logger.warning(f"一時ファイルの削除に失敗しました: {e}")
+        self._forget_take(self.temp_file)
+        self.temp_file = self._new_temp_path()
+        logger.debug(f"一時ファイルを作成: {self.temp_file}")
+
+    def _new_temp_path(self) -> str:
+        """新しい一時ファイルを作成してそのパスを取得する（名前の重複を防ぐため排他的に作成する）"""
+        return self._get_temp_store().create()
+
+    def _get_temp_store(self) -> TempStore:
+        """一時ファイルのストアを取得する（保存先が変わった場合は取得し直す）
+
+        同じディレクトリを使う他のジェネレーターとストアを共有する。
+        """
+        temp_dir = self._get_temp_dir()
+        if self.temp_store is None or self.temp_store.temp_dir != temp_dir:
+            # 権限エラーでシステムの一時ディレクトリを使う場合は、このアプリのファイルだけを扱う
+            self.temp_store = TempStore.for_dir(temp_dir, shared=temp_dir == tempfile.gettempdir())
+        return self.temp_store
+
+    def temp_usage(self) -> dict:
+        """一時ファイルの使用状況（件数・合計サイズ・使用中の件数・上限）を返す"""
+        return self._get_temp_store().usage()
 
-        # tempモジュールを使用して一時ファイルを作成
+    def _get_temp_dir(self) -> str:
+        """一時ファイルの保存先ディレクトリを取得する"""
         # 実行ファイル内では書き込み可能なディレクトリを使用
         if getattr(sys, 'frozen', False):
             # PyInstaller で実行されている場合
@@ -108,10 +388,113 @@ class VoiceGenerator:
         except PermissionError:
             # 権限エラーの場合、システムの一時ディレクトリを使用
             temp_dir = tempfile.gettempdir()
+        return temp_dir
+
+    def _get_cache_dir(self) -> str:
+        """生成キャッシュの保存先ディレクトリを取得する"""
+        if getattr(sys, 'frozen', False):
+            # PyInstaller で実行されている場合
+            return os.path.join(tempfile.gettempdir(), "realtime_api_gui", "cache")
+        # 通常の Python で実行されている場合
+        return os.path.join(ROOT_DIR, "cache")
+
+    def _get_log_dir(self) -> str:
+        """メトリクスの出力先ディレクトリを取得する"""
+        if getattr(sys, 'frozen', False):
+            # PyInstaller で実行されている場合
+            return os.path.join(tempfile.gettempdir(), "realtime_api_gui", "log")
+        # 通常の Python で実行されている場合
+        return os.path.join(ROOT_DIR, "log")
+
+    def _cache_key(self, voice_config: dict) -> str:
+        """現在のプロンプトとテキストからキャッシュキーを作成する"""
+        return GenerationCache.make_key(
+            self.ws_url,
+            voice_config["voice"],
+            voice_config["speed"],
+            self.current_system_prompt,
+            self.current_text,
+        )
+
+    def _use_cached_take(self, cached_file: str, stream_playback: bool = False) -> str:
+        """キャッシュされた音声を直近の生成結果とする"""
+        temp_file = self._load_cached_take(cached_file)
+        self._forget_take(self.temp_file)
+        self.temp_file = temp_file
+
+        if stream_playback:
+            samples = self.takes_in_memory.get(temp_file)
+            if samples is not None:
+                pcm = samples.tobytes()
+            else:
+                with wave.open(temp_file, "rb") as wav_file:
+                    pcm = wav_file.readframes(wav_file.getnframes())
+            self.stream_player = StreamingPlayer(on_start=self._on_playback_start)
+            self.stream_player.feed(pcm)
+            self.stream_player.finish()
+        return temp_file
+
+    def _load_cached_take(self, cached_file: str) -> str:
+        """キャッシュされた音声から新しいテイクを作成し、そのパスを返す"""
+        temp_file = self._new_temp_path()
+        if self.memory_takes:
+            self.takes_in_memory[temp_file], _ = sf.read(cached_file, dtype="int16")
+        else:
+            # 保存時に一時ファイルは移動されるため、キャッシュ本体ではなくコピーを使う
+            shutil.copyfile(cached_file, temp_file)
+        return temp_file
+
+    def _cache_take(self, cache_key: str, temp_file: str):
+        """生成したテイクをキャッシュに登録する"""
+        samples = self.takes_in_memory.get(temp_file)
+        if samples is not None:
+            self.cache.put_pcm(cache_key, samples.tobytes())
+        else:
+            self.cache.put(cache_key, temp_file)
+
+    def _new_take_writer(self):
+        """受信した音声の書き込み先を作成する（memory_takesが有効な場合はメモリに保持する）"""
+        if self.memory_takes:
+            return TakeBuffer(self._new_temp_path(), self.spill_bytes)
+        return StreamingWavWriter(self._new_temp_path())
+
+    def _keep_take(self, writer) -> str:
+        """書き込みを終えたテイクを確定し、そのパスを返す"""
+        temp_file = writer.close()
+        samples = getattr(writer, "samples", None)
+        if samples is not None:
+            self.takes_in_memory[temp_file] = samples
+        return temp_file
+
+    def _has_take(self, temp_file: str) -> bool:
+        """テイクがメモリまたは一時ファイルに存在するかどうか"""
+        return bool(temp_file) and (temp_file in self.takes_in_memory or os.path.exists(temp_file))
+
+    def _forget_take(self, temp_file: str):
+        """保存されなかったテイクを破棄する（メモリ上のデータと一時ファイル）"""
+        if not temp_file:
+            return
+        self.takes_in_memory.pop(temp_file, None)
+        if os.path.exists(temp_file):
+            try:
+                os.remove(temp_file)
+            except (OSError, PermissionError) as e:
+                logger.warning(f"一時ファイルの削除に失敗しました: {e}")
+        self._release_temp(temp_file)
+
+    def _release_temp(self, temp_file: str):
+        """一時ファイルをストアの使用中から外す（削除できなかった場合は次の掃除で削除される）"""
+        if not temp_file:
+            return
+        # 保存先が変わった後でも、作成したディレクトリのストアから外す
+        store = TempStore.get(os.path.dirname(temp_file))
+        if store:
+            store.release(temp_file)
+
+    def take_samples(self, temp_file: str = None):
+        """メモリに保持しているテイクの音声データ（int16）を返す（ファイルに書き出したテイクはNone）"""
+        return self.takes_in_memory.get(temp_file or self.temp_file)
 
-        self.temp_file = tempfile.mktemp(suffix=".wav", dir=temp_dir)
-        logger.debug(f"一時ファイルを作成: {self.temp_file}")
-    
     def load_performer_configs(self):
         """演者設定をJSONファイルから読み込み"""
         try:
@@ -131,41 +514,127 @@ class VoiceGenerator:
         self.current_actor = actor
         logger.info(f"演者を設定: {actor}")
 
+    def _get_voice_config(self, actor: str = None) -> dict:
+        """演者の音声設定を取得する（存在しない場合はフォールバック設定）"""
+        actor = actor or self.current_actor
+        if actor in self.performer_configs and "voice" in self.performer_configs[actor]:
+            return {
+                "voice": self.performer_configs[actor]["voice"],
+                "speed": self.performer_configs[actor].get("speed", 1.0)
+            }
+        logger.warning(f"演者 '{actor}' の音声設定が見つかりません。デフォルト設定を使用します。")
+        return self.FALLBACK_VOICE_SETTING
+
+    def _speed_for_prompt(self, voice_config: dict, system_prompt: str) -> dict:
+        """システムプロンプトで速く読むよう指示している場合は速度変更をしない音声設定を返す
+
+        以前の設定（プロンプトの「通常より30%早く読んでください」とspeed 1.3）のままだと
+        速度が二重にかかるため、プロンプトの指示を優先してspeedを適用しない。
+        """
+        if voice_config["speed"] == 1.0 or not SPEED_INSTRUCTION_PATTERN.search(system_prompt or ""):
+            return voice_config
+        if self.current_actor not in self.speed_warned_actors:
+            self.speed_warned_actors.add(self.current_actor)
+            logger.warning(
+                f"演者 '{self.current_actor}' のシステムプロンプトで速く読むよう指示しているため、"
+                f"speed {voice_config['speed']} を適用しません。speedを使う場合はプロンプトの指示を削除してください。"
+            )
+        return {**voice_config, "speed": 1.0}
+
+    def _commit_take(self):
+        """書き込み中のテイクを確定し、直近の生成結果とする"""
+        writer, self.wav_writer = self.wav_writer, None
+        temp_file = self._keep_take(writer)
+        # 前回の未保存のテイクを破棄
+        if self.temp_file != temp_file:
+            self._forget_take(self.temp_file)
+        self.temp_file = temp_file
+
+    def _discard_take(self):
+        """書き込み途中のテイクを破棄する（エラー・中断時）"""
+        writer, self.wav_writer = self.wav_writer, None
+        if writer:
+            writer.abort()
+            logger.info("書き込み途中の音声を破棄しました")
+
+    def prewarm(self, system_prompt: str, actor: str = None):
+        """演者のセッションをバックグラウンドで接続・設定しておく
+
+        生成時にはセリフの送信だけで済むため、最初の音声までの時間が短くなる。
+        接続を使い回さない設定の場合は何もしない。
+        """
+        actor = actor or self.current_actor
+        if not self.session_manager or not actor:
+            return None
+        voice_config = self._get_voice_config(actor)
+        return self.session_manager.prewarm(actor, voice_config["voice"], system_prompt)
+
+    def close(self):
+        """維持しているWebSocket接続をすべて閉じ、依頼済みのテイクの変換が終わるまで待つ"""
+        if self.session_manager:
+            self.session_manager.close_all()
+        if self.encoder:
+            self.encoder.shutdown(wait=True)
+            self.encoder = None
+
     def _on_message(self, ws, message):
+        # 中止後に届いたデータは書き込まない
+        cancel_token = self.cancel_token
+        if cancel_token and cancel_token.is_cancelled:
+            return
         try:
-            data = json.loads(message)
-            logger.debug(f"受信データ: {data['type']}")
+            event = decode_event(message)
+            debug = logger.isEnabledFor(logging.DEBUG)
+            if debug:
+                logger.debug(f"受信データ: {event.type}")
 
-            if data["type"] == "response.audio.delta":
-                if "delta" not in data:
+            if event.type == "response.audio.delta":
+                audio_buffer = event.audio
+                if audio_buffer is None:
                     logger.error("音声データが未定義です")
                     return
-                audio_buffer = base64.b64decode(data["delta"])
-                self.audio_chunks.extend(audio_buffer)
-                logger.debug(
-                    f"音声データ受信. Chunk size: {len(audio_buffer)}, Total size: {len(self.audio_chunks)}"
-                )
+                # 受信したデータはその場で一時ファイル（memory_takesが有効な場合はメモリ）へ書き込む
+                if self.wav_writer is None:
+                    self.wav_writer = self._new_take_writer()
+                if self.timeline:
+                    self.timeline.add_chunk(len(audio_buffer))
+                if self.stretcher:
+                    audio_buffer = self.stretcher.process(audio_buffer)
+                self.wav_writer.write(audio_buffer)
+                if self.stream_player and audio_buffer:
+                    self.stream_player.feed(audio_buffer)
+                if debug:
+                    logger.debug(
+                        f"音声データ受信. Chunk size: {len(audio_buffer)}, Total size: {self.wav_writer.bytes_written}"
+                    )
 
-            elif data["type"] == "response.audio.done":
+            elif event.type == "response.audio.done":
                 logger.info("音声データの受信が完了しました")
-                if len(self.audio_chunks) == 0:
+                if self.timeline:
+                    self.timeline.mark("audio_done")
+                if self.stretcher and self.wav_writer:
+                    # 速度変更で保留している末尾のデータを書き出す
+                    tail = self.stretcher.flush()
+                    self.wav_writer.write(tail)
+                    if self.stream_player and tail:
+                        self.stream_player.feed(tail)
+                self.stretcher = None
+                if self.stream_player:
+                    self.stream_player.finish()
+                if self.wav_writer is None or self.wav_writer.bytes_written == 0:
                     logger.warning("音声データが空です")
+                    self._discard_take()
                     return
 
-                # 一時ファイルを作成
-                self._create_temp_file()
-
-                # WAVファイルとして保存
-                with wave.open(self.temp_file, "wb") as wav_file:
-                    wav_file.setnchannels(1)  # モノラル
-                    wav_file.setsampwidth(2)  # 16ビット
-                    wav_file.setframerate(24000)  # サンプルレート
-                    wav_file.writeframes(self.audio_chunks)
-
-                self.audio_chunks = bytearray()
-                logger.info(f"音声ファイルを保存: {self.temp_file}")
+                self._commit_take()
+                if self.timeline:
+                    self.timeline.mark("wav_written")
+                if self.temp_file in self.takes_in_memory:
+                    logger.info(f"音声をメモリに保持: {self.temp_file}")
+                else:
+                    logger.info(f"音声ファイルを保存: {self.temp_file}")
 
-            elif data["type"] == "response.done":
+            elif event.type == "response.done":
                 logger.info("レスポンスが完了しました")
                 # WebSocket接続を閉じる
                 if self.ws:
@@ -185,43 +654,41 @@ class VoiceGenerator:
 
     def _on_open(self, ws):
         logger.info("WebSocket接続が確立されました")
+        if self.timeline:
+            self.timeline.mark("open")
         # セッション設定を送信
         # 演者の音声設定をJSONから取得（存在しない場合はフォールバック設定を使用）
-        if self.current_actor in self.performer_configs and "voice" in self.performer_configs[self.current_actor]:
-            voice_config = {
-                "voice": self.performer_configs[self.current_actor]["voice"],
-                "speed": self.performer_configs[self.current_actor].get("speed", 1.3)
-            }
-        else:
-            voice_config = self.FALLBACK_VOICE_SETTING
-            logger.warning(f"演者 '{self.current_actor}' の音声設定が見つかりません。デフォルト設定を使用します。")
-        
-        session_config = {
-            "type": "session.update",
-            "session": {
-                "voice": voice_config["voice"],
-                "instructions": self.current_system_prompt,
-                "turn_detection": {"type": "server_vad"},
-                "modalities": ["text", "audio"],
-                "temperature": 0.8,
-            },
-        }
-        ws.send(json.dumps(session_config))
+        voice_config = self._get_voice_config()
+        ws.send(json.dumps(build_session_update(voice_config["voice"], self.current_system_prompt)))
 
         # メッセージを作成して送信
-        message = {
-            "type": "conversation.item.create",
-            "item": {
-                "type": "message",
-                "role": "user",
-                "content": [{"type": "input_text", "text": self.current_text}],
-            },
-        }
-        ws.send(json.dumps(message))
+        ws.send(json.dumps(build_text_item(self.current_text)))
         ws.send(json.dumps({"type": "response.create"}))
 
-    def generate_voice(self, system_prompt: str, acting_prompt: str, text: str, progress_callback=None) -> str:
-        """音声を生成する"""
+    def generate_voice(
+        self,
+        system_prompt: str,
+        acting_prompt: str,
+        text: str,
+        progress_callback=None,
+        stream_playback: bool = False,
+        force_fresh: bool = False,
+        timeout: float = None,
+        cancel_token: CancelToken = None,
+        on_wait=None,
+    ) -> str:
+        """音声を生成する
+
+        stream_playback=Trueの場合、受信した音声を受信しながら再生する。
+        生成完了後も再生は続くため、再度play_audioを呼び出す必要はない。
+        キャッシュが有効な場合、同じ内容の生成結果があればそれを返す。
+        force_fresh=Trueの場合はキャッシュを使わずに新しいテイクを生成する。
+
+        timeoutを指定した場合はその秒数で打ち切り、TimeoutErrorとする。
+        cancel_token（省略時はcancel()で中止できるトークンを作成）で中止された場合は
+        response.cancelを送信し、受信途中の音声を破棄してGenerationCancelledとする。
+        on_waitは応答待ちの間に定期的に呼び出される（GUIのイベント処理など）。
+        """
         if not self.current_actor:
             logger.error("演者が設定されていません")
             raise ValueError(
@@ -233,15 +700,15 @@ class VoiceGenerator:
             progress_callback("🎯 演者設定を確認中...")
 
         # 現在の演者の音声設定を取得
-        if self.current_actor in self.performer_configs and "voice" in self.performer_configs[self.current_actor]:
-            voice_config = {
-                "voice": self.performer_configs[self.current_actor]["voice"],
-                "speed": self.performer_configs[self.current_actor].get("speed", 1.3)
-            }
-        else:
-            voice_config = self.FALLBACK_VOICE_SETTING
-            logger.warning(f"演者 '{self.current_actor}' の音声設定が見つかりません。デフォルト設定を使用します。")
+        voice_config = self._speed_for_prompt(self._get_voice_config(), system_prompt)
         logger.info(f"音声生成開始 - 演者: {self.current_actor}")
+        timeline = GenerationTimeline(
+            self.current_actor, text, voice=voice_config["voice"], stream_playback=stream_playback
+        )
+        self.timeline = timeline
+        cancel_token = cancel_token or CancelToken()
+        self.cancel_token = cancel_token
+        deadline = None if timeout is None else time.monotonic() + timeout
 
         try:
             # プロンプトとテキストを保存
@@ -250,48 +717,190 @@ class VoiceGenerator:
             self.current_system_prompt = system_prompt
             self.current_text = f"{acting_prompt}\n「{text}」"
 
-            # WebSocket接続を確立
-            if progress_callback:
-                progress_callback("🔗 WebSocket接続を確立中...")
-            self.ws = WebSocketApp(
-                self.ws_url,
-                header=self.ws_headers,
-                on_message=self._on_message,
-                on_error=self._on_error,
-                on_close=self._on_close,
-                on_open=self._on_open,
-            )
-            
-            if progress_callback:
-                progress_callback("🎵 音声データを受信中...")
-            self.ws.run_forever()
+            # 前回の生成で完了しなかったデータを持ち越さない
+            self._discard_take()
+            # 保存されずに削除された一時ファイルの記録は残さない
+            self.take_info = {path: info for path, info in self.take_info.items() if self._has_take(path)}
+            # 前回のストリーミング再生を止めてから新しいプレイヤーを用意
+            self.stop_playback()
+
+            cache_key = self._cache_key(voice_config) if self.cache else None
+            if cache_key and not force_fresh:
+                cached_file = self.cache.get(cache_key)
+                if cached_file:
+                    if progress_callback:
+                        progress_callback("💾 キャッシュから取得中...")
+                    timeline.info["cache_hit"] = True
+                    temp_file = self._use_cached_take(cached_file, stream_playback)
+                    self._remember_take(temp_file, system_prompt, acting_prompt, text)
+                    return temp_file
 
-            # 接続が閉じられた後に一時ファイルが存在することを確認
-            if not self.temp_file or not os.path.exists(self.temp_file):
+            if stream_playback:
+                self.stream_player = StreamingPlayer(on_start=self._on_playback_start)
+            # 受信した音声に演者の速度設定を適用する（音程は変えない）
+            self.stretcher = create_stretcher(voice_config["speed"])
+
+            if self.session_manager:
+                # 維持しているセッションを使い回す（接続・セッション設定は必要な場合のみ）
+                if progress_callback:
+                    progress_callback("🔗 セッションを準備中...")
+                session = self.session_manager.get_session(self.current_actor, voice_config["voice"])
+                timeline.info["reused_session"] = bool(session.is_connected)
+                timeline.mark("connect")
+                if progress_callback:
+                    progress_callback("🎵 音声データを受信中...")
+                session.request(
+                    self.current_system_prompt,
+                    self.current_text,
+                    self._on_message,
+                    timeout=self._remaining(deadline),
+                    on_connected=lambda: timeline.mark("open"),
+                    cancel_token=cancel_token,
+                    on_wait=on_wait,
+                )
+            else:
+                # WebSocket接続を確立
+                if progress_callback:
+                    progress_callback("🔗 WebSocket接続を確立中...")
+                self.ws = WebSocketApp(
+                    self.ws_url,
+                    header=self.ws_headers,
+                    on_message=self._on_message,
+                    on_error=self._on_error,
+                    on_close=self._on_close,
+                    on_open=self._on_open,
+                )
+
+                if progress_callback:
+                    progress_callback("🎵 音声データを受信中...")
+                timeline.mark("connect")
+                self._run_one_shot(self.ws, deadline, cancel_token, on_wait)
+
+            # response.audio.doneを受信せずに終了した場合は途中のデータを破棄
+            self._discard_take()
+
+            # 接続が閉じられた後にテイクが存在することを確認
+            if not self._has_take(self.temp_file):
                 raise Exception("音声ファイルの生成に失敗しました")
 
+            if cache_key:
+                self._cache_take(cache_key, self.temp_file)
+            self._remember_take(self.temp_file, system_prompt, acting_prompt, text)
             return self.temp_file
+        except GenerationCancelled as e:
+            logger.info("音声生成を中止しました")
+            timeline.error = str(e)
+            self._discard_take()
+            self.stop_playback()
+            raise
         except Exception as e:
             logger.error(f"音声生成エラー: {str(e)}", exc_info=True)
+            timeline.error = str(e)
+            self._discard_take()
+            self.stop_playback()
             raise
+        finally:
+            self.cancel_token = None
+            self.metrics.record(timeline)
 
-    def save_voice(self, actor: str) -> str:
-        """生成した音声を保存する"""
-        if not self.temp_file or not os.path.exists(self.temp_file):
-            logger.warning("保存するファイルがありません")
+    @staticmethod
+    def _remaining(deadline):
+        """期限までの残り秒数（期限なしの場合はNone）"""
+        if deadline is None:
             return None
+        return max(0.0, deadline - time.monotonic())
 
-        timestamp = datetime.now().strftime("%m%d_%H%M%S")
+    def _run_one_shot(self, ws, deadline, cancel_token, on_wait):
+        """1回限りの接続をバックグラウンドで実行し、終了・期限・中止を待つ"""
+        finished = threading.Event()
+        errors = []
 
-        # 演者のディレクトリを作成
+        def run():
+            try:
+                ws.run_forever()
+            except Exception as e:
+                errors.append(e)
+            finally:
+                finished.set()
+
+        threading.Thread(target=run, daemon=True).start()
+        try:
+            wait_for(finished, self._remaining(deadline), cancel_token, on_wait)
+        except (GenerationCancelled, TimeoutError):
+            # 生成中のレスポンスを中止して接続を閉じる（以降に届く音声は受け取らない）
+            # 接続の終了は待たずに戻る（受信スレッドはクローズ後に自然に終了する）
+            self.ws = None
+            ws.on_message = None
+            try:
+                ws.send(json.dumps({"type": "response.cancel"}))
+            except Exception as e:
+                logger.debug(f"レスポンスの中止を送信できませんでした: {e}")
+            ws.close()
+            raise
+        if errors:
+            raise errors[0]
+
+    def cancel(self):
+        """実行中の生成を中止する（別スレッドから呼び出す）"""
+        cancel_token = self.cancel_token
+        if cancel_token:
+            cancel_token.cancel()
+            logger.info("音声生成の中止を要求しました")
+
+    def _on_playback_start(self):
+        if self.timeline:
+            self.timeline.mark("playback_start")
+
+    def stop_playback(self):
+        """ストリーミング再生を止める"""
+        if self.stream_player:
+            self.stream_player.stop()
+            self.stream_player = None
+
+    def _remember_take(self, temp_file: str, system_prompt: str, acting_prompt: str, text: str):
+        """一時ファイルを生成したプロンプト・セリフを記録する（保存時にインデックスへ登録する）"""
+        self.take_info[temp_file] = {
+            "system_prompt": system_prompt,
+            "acting_prompt": acting_prompt,
+            "text": text,
+        }
+
+    def _get_output_dir(self) -> str:
+        """演者フォルダとテイクのインデックスの保存先ディレクトリを取得する"""
         # 実行ファイル内では書き込み可能なディレクトリを使用
         if getattr(sys, 'frozen', False):
             # PyInstaller で実行されている場合
-            save_dir = os.path.expanduser(f"~/Documents/realtime_api_gui_output")
-            actor_dir = os.path.join(save_dir, actor)
-        else:
-            # 通常の Python で実行されている場合
-            actor_dir = os.path.join(ROOT_DIR, actor)
+            return os.path.expanduser("~/Documents/realtime_api_gui_output")
+        # 通常の Python で実行されている場合
+        return ROOT_DIR
+
+    def save_voice(self, actor: str, temp_file: str = None) -> str:
+        """生成した音声を保存する
+
+        trim_silenceが有効な場合は前後の無音を除去して保存する。
+        メモリに保持しているテイクはこの時に初めてファイルに書き出す。
+        index_takesが有効な場合は保存したテイクをインデックスに登録する。
+        演者の保存形式（performer_configsのformat）がflac / opusの場合は、
+        WAVで保存した後にバックグラウンドで変換し、変換後に元のWAVを削除する。
+
+        Args:
+            actor (str): 演者名
+            temp_file (str, optional): 保存する一時ファイル。省略時は直近の生成結果
+
+        Returns:
+            str: 保存したWAVファイルのパス（変換する場合も、変換の完了前に存在するWAVのパスを返す）
+        """
+        source = temp_file or self.temp_file
+        if not self._has_take(source):
+            logger.warning("保存するファイルがありません")
+            return None
+
+        saved_at = datetime.now()
+        timestamp = saved_at.strftime("%m%d_%H%M%S")
+
+        # 演者のディレクトリを作成
+        output_dir = self._get_output_dir()
+        actor_dir = os.path.join(output_dir, actor)
         
         try:
             os.makedirs(actor_dir, exist_ok=True)
@@ -302,29 +911,114 @@ class VoiceGenerator:
             logger.warning(f"権限エラーのため、保存先を変更しました: {actor_dir}")
 
         save_path = os.path.join(actor_dir, f"{actor}_{timestamp}.wav")
+        # 同じ秒に複数保存した場合は連番を付けて上書きを防ぐ（ファイル名順が保存順になる）
+        counter = 1
+        while os.path.exists(save_path) and counter < 1000:
+            save_path = os.path.join(actor_dir, f"{actor}_{timestamp}_{counter:03d}.wav")
+            counter += 1
         try:
-            # 一時ファイルからコピーして保存（os.renameは異なるディスクだとエラーになる可能性がある）
-            with open(self.temp_file, "rb") as src, open(save_path, "wb") as dst:
-                dst.write(src.read())
-            # 一時ファイルを削除
-            os.remove(self.temp_file)
-            self.temp_file = None
+            samples = self.takes_in_memory.get(source)
+            if samples is not None:
+                self._write_samples(samples, save_path)
+                self._forget_take(source)
+            elif self._trim_to(source, save_path):
+                # 一時ファイルを削除
+                os.remove(source)
+            else:
+                # 除去する無音がない場合はデータを読み込まずにファイルごと移動する
+                # （一時ファイルは所有者しか読めないため、通常のファイルと同じ権限にしてから移動する）
+                apply_default_mode(source)
+                move_file(source, save_path)
+            self._release_temp(source)
+            if source == self.temp_file:
+                self.temp_file = None
             logger.info(f"音声ファイルを保存: {save_path}")
-            return save_path
         except Exception as e:
             logger.error(f"ファイル保存エラー: {str(e)}", exc_info=True)
             raise
 
+        take_info = self.take_info.pop(source, {})
+        if self.index_takes:
+            self._register_take(output_dir, save_path, actor, saved_at, timestamp[:4], take_info)
+        # 演者の保存形式がWAV以外の場合は、保存後にバックグラウンドで変換する（変換は待たない）
+        output_format = self.get_output_format(actor)
+        if output_format != "wav":
+            self._encode_in_background(output_dir, save_path, output_format)
+        return save_path
+
+    def get_output_format(self, actor: str) -> str:
+        """演者の保存形式（wav / flac / opus）を取得する"""
+        output_format = str(self.performer_configs.get(actor, {}).get("format", "wav")).lower()
+        if output_format != "wav" and output_format not in ENCODINGS:
+            logger.warning(f"演者 '{actor}' の保存形式 '{output_format}' には対応していません。WAVで保存します。")
+            return "wav"
+        return output_format
+
+    def _encode_in_background(self, output_dir: str, save_path: str, output_format: str):
+        """保存したテイクをバックグラウンドで圧縮形式に変換する（変換の完了は待たない）"""
+        if not self.encoder:
+            self.encoder = TakeEncoder()
+
+        def on_encoded(old_path, new_path):
+            # 元のWAVを削除する前にインデックスのパスを変換後のファイルに変更する
+            if self.index_takes:
+                TakeIndex.for_root(output_dir).move(old_path, new_path)
+
+        return self.encoder.submit(save_path, output_format, on_encoded)
+
+    def _register_take(self, output_dir: str, save_path: str, actor: str, saved_at, date: str, take_info: dict):
+        """保存したテイクをインデックスに登録する（失敗しても保存は成功とする）"""
+        try:
+            TakeIndex.for_root(output_dir).add(save_path, actor, recorded_at=saved_at, date=date, **take_info)
+        except Exception as e:
+            logger.warning(f"テイクのインデックスへの登録に失敗しました: {e}")
+
+    def _write_samples(self, samples, save_path: str):
+        """メモリに保持しているテイクをWAVファイルに書き出す（trim_silenceが有効な場合は前後の無音を除去）"""
+        if self.trim_silence:
+            samples = trim_silence(samples, SAMPLE_RATE, self.silence_threshold_db, self.silence_padding_ms)
+        sf.write(save_path, samples, SAMPLE_RATE, subtype="PCM_16")
+
+    def _trim_to(self, source: str, save_path: str) -> bool:
+        """前後の無音を除去して保存する（無効な場合・除去する無音がない場合・失敗した場合はFalse）
+
+        声の範囲はファイルの先頭と末尾からブロックごとに探し、その範囲だけを書き出す。
+        """
+        if not self.trim_silence:
+            return False
+        try:
+            voiced_range = find_voiced_range_in_file(source, self.silence_threshold_db, self.silence_padding_ms)
+            if voiced_range is None:
+                return False
+            start, end, length = voiced_range
+            if start == 0 and end == length:
+                return False
+            copy_range(source, save_path, start, end)
+            logger.info(f"前後の無音を除去しました: {(length - (end - start)) / SAMPLE_RATE:.2f}秒 ({save_path})")
+            return True
+        except Exception as e:
+            # 書きかけのファイルはこの後の移動で上書きされる
+            logger.warning(f"無音の除去に失敗したため、そのまま保存します: {e}")
+            return False
+
     def play_audio(self, file_path: str = None):
-        """音声を再生する"""
+        """音声を再生する（メモリに保持しているテイクはファイルを読まずに再生する）"""
         target_file = file_path if file_path else self.temp_file
-        if not target_file or not os.path.exists(target_file):
+        if not self._has_take(target_file):
             logger.warning("再生するファイルがありません")
             return
 
         try:
-            data, samplerate = sf.read(target_file)
+            self.stop_playback()
+            samples = self.takes_in_memory.get(target_file)
+            if samples is not None:
+                data, samplerate = samples, SAMPLE_RATE
+            else:
+                data, samplerate = sf.read(target_file)
             sd.play(data, samplerate)
+            # 直近の生成結果を再生した場合は再生開始時刻を記録
+            if self.timeline and target_file == self.temp_file and "playback_start" not in self.timeline.marks:
+                self.metrics.record_playback(self.timeline)
             sd.wait()
             logger.info("音声再生完了")
         except Exception as e:
@@ -153,9 +153,11 @@ class TestVoiceGenerationWorkflow:
             
             vg._on_message(mock_ws, audio_message)
             
-            # 音声データが蓄積されることを確認
-            assert len(vg.audio_chunks) > 0
-            assert b"test audio data" in vg.audio_chunks
+            # 音声データが一時ファイルへ書き込まれることを確認
+            assert vg.wav_writer.bytes_written > 0
+            vg._on_message(mock_ws, json.dumps({"type": "response.audio.done"}))
+            with open(vg.temp_file, "rb") as f:
+                assert b"test audio data" in f.read()
 
     @pytest.mark.integration
     @patch("models.voice_generator.sf.read")
@@ -275,6 +277,7 @@ class TestVoiceGenerationWorkflow:
             
             vg = VoiceGenerator()
             vg.set_actor("統合テスト演者1")
+            vg._create_temp_file()
             
             # 音声生成を実行
             result = vg.generate_voice("system", "acting", "text")
@@ -297,15 +300,21 @@ class TestVoiceGenerationWorkflow:
         with patch("models.voice_generator.ROOT_DIR", str(integration_config.parent.parent)):
             vg = VoiceGenerator()
             
-            # 初期状態で一時ファイルが設定されることを確認
+            # 生成するまで一時ファイルは作成されないことを確認
+            assert vg.temp_file is None
+            
+            # 一時ファイルの作成（名前を予約するため空のファイルを作成する）
+            vg._create_temp_file()
             initial_temp_file = vg.temp_file
-            assert initial_temp_file is not None
             assert initial_temp_file.endswith(".wav")
+            assert os.path.exists(initial_temp_file)
             
             # 一時ファイルの再作成
             vg._create_temp_file()
             
-            # 新しい一時ファイルが作成されることを確認
+            # 新しい一時ファイルが作成され、前回の一時ファイルは削除されることを確認
             new_temp_file = vg.temp_file
             assert new_temp_file is not None
-            assert new_temp_file != initial_temp_file
\ No newline at end of file
+            assert new_temp_file != initial_temp_file
+            assert not os.path.exists(initial_temp_file)
+            assert vg.temp_usage()["files"] == 1
\ No newline at end of file
@@ -0,0 +1,262 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+AsyncVoiceGeneratorクラスのユニットテスト
+"""
+
+import asyncio
+import base64
+import json
+import os
+import time
+import wave
+import pytest
+from unittest.mock import patch
+
+from models.async_voice_generator import AsyncVoiceGenerator
+from models.cancellation import GenerationCancelled
+
+
+class FakeConnection:
+    """Realtime APIの応答を模擬する非同期WebSocket接続"""
+
+    def __init__(self, events, delay=0.0):
+        self.events = events
+        self.delay = delay
+        self.sent = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    async def send(self, message):
+        self.sent.append(json.loads(message))
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for event in self.events:
+            await asyncio.sleep(self.delay)
+            yield json.dumps(event)
+
+
+def audio_events(pcm=b"\x01\x00\x02\x00"):
+    return [
+        {"type": "response.audio.delta", "delta": base64.b64encode(pcm).decode()},
+        {"type": "response.audio.done"},
+        {"type": "response.done"},
+    ]
+
+
+class TestAsyncVoiceGenerator:
+    """AsyncVoiceGeneratorクラスのテスト"""
+
+    @pytest.fixture
+    def generator(self, mock_env_vars, mock_prompts_file, temp_dir):
+        with patch("models.voice_generator.ROOT_DIR", str(mock_prompts_file.parent.parent)):
+            gen = AsyncVoiceGenerator(max_concurrency=2)
+        gen._get_temp_dir = lambda: str(temp_dir)
+        yield gen
+        gen.close()
+
+    @pytest.mark.unit
+    def test_generate_voice_writes_wav(self, generator):
+        """生成結果がWAVファイルとして保存されることを確認"""
+        connection = FakeConnection(audio_events())
+        generator.set_actor("テスト演者1")
+
+        with patch("models.async_voice_generator.connect", return_value=connection):
+            result = asyncio.run(generator.generate_voice("system", "acting", "text"))
+
+        assert os.path.exists(result)
+        assert generator.temp_file == result
+        with wave.open(result, "rb") as wav_file:
+            assert wav_file.getframerate() == 24000
+            assert wav_file.readframes(2) == b"\x01\x00\x02\x00"
+        # 演者の音声設定が送信されることを確認
+        assert connection.sent[0]["session"]["voice"] == "ballad"
+
+    @pytest.mark.unit
+    def test_fallback_voice(self, generator):
+        """未知の演者ではフォールバック設定を使用することを確認"""
+        connection = FakeConnection(audio_events())
+
+        with patch("models.async_voice_generator.connect", return_value=connection):
+            asyncio.run(generator.generate_voice("system", "acting", "text", actor="未知の演者"))
+
+        assert connection.sent[0]["session"]["voice"] == AsyncVoiceGenerator.FALLBACK_VOICE_SETTING["voice"]
+
+    @pytest.mark.unit
+    def test_concurrent_generations(self, generator):
+        """複数の生成を同時に実行できることを確認"""
+        with patch(
+            "models.async_voice_generator.connect",
+            side_effect=lambda *args, **kwargs: FakeConnection(audio_events(), delay=0.01),
+        ):
+            async def run_all():
+                return await asyncio.gather(*[
+                    generator.generate_voice("system", "acting", f"text {i}", actor="テスト演者2")
+                    for i in range(4)
+                ])
+
+            results = asyncio.run(run_all())
+
+        assert len(set(results)) == 4
+        assert all(os.path.exists(path) for path in results)
+
+    @pytest.mark.unit
+    def test_no_actor(self, generator):
+        """演者未設定時はエラーとなることを確認"""
+        with pytest.raises(ValueError, match="演者が設定されていません"):
+            asyncio.run(generator.generate_voice("system", "acting", "text"))
+
+    @pytest.mark.unit
+    def test_server_error(self, generator):
+        """サーバーエラーが例外になることを確認"""
+        connection = FakeConnection([{"type": "error", "error": {"message": "bad"}}])
+        generator.set_actor("テスト演者1")
+
+        with patch("models.async_voice_generator.connect", return_value=connection):
+            with pytest.raises(Exception, match="Realtime APIエラー"):
+                asyncio.run(generator.generate_voice("system", "acting", "text"))
+
+    @pytest.mark.unit
+    def test_generate_voice_sync_replaces_previous_take(self, generator):
+        """同期版では前回の一時ファイルが削除されることを確認"""
+        generator.set_actor("テスト演者1")
+
+        with patch(
+            "models.async_voice_generator.connect",
+            side_effect=lambda *args, **kwargs: FakeConnection(audio_events()),
+        ):
+            first = generator.generate_voice_sync("system", "acting", "text 1")
+            second = generator.generate_voice_sync("system", "acting", "text 2")
+
+        assert not os.path.exists(first)
+        assert os.path.exists(second)
+
+    @pytest.mark.unit
+    def test_generate_voice_uses_cache(self, generator, temp_dir):
+        """同じ内容の生成はキャッシュのコピーを返すことを確認"""
+        from models.generation_cache import GenerationCache
+
+        generator.cache = GenerationCache(str(temp_dir / "cache"))
+        generator.set_actor("テスト演者1")
+
+        with patch(
+            "models.async_voice_generator.connect",
+            side_effect=lambda *args, **kwargs: FakeConnection(audio_events()),
+        ) as mock_connect:
+            first = asyncio.run(generator.generate_voice("system", "acting", "text"))
+            second = asyncio.run(generator.generate_voice("system", "acting", "text"))
+            asyncio.run(generator.generate_voice("system", "acting", "text", force_fresh=True))
+
+        assert mock_connect.call_count == 2
+        assert first != second
+        assert open(first, "rb").read() == open(second, "rb").read()
+        assert generator.cache.hits == 1
+
+    @pytest.mark.unit
+    def test_timeout_cancels_response(self, generator, temp_dir):
+        """タイムアウト時はresponse.cancelを送信し、途中のファイルを削除することを確認"""
+        connection = FakeConnection(audio_events(), delay=1.0)
+        generator.set_actor("テスト演者1")
+
+        with patch("models.async_voice_generator.connect", return_value=connection):
+            with pytest.raises(TimeoutError, match="タイムアウト"):
+                asyncio.run(generator.generate_voice("system", "acting", "text", timeout=0.05))
+
+        assert connection.sent[-1]["type"] == "response.cancel"
+        assert not list(temp_dir.glob("*.wav"))
+
+    @pytest.mark.unit
+    def test_generate_takes_runs_concurrently(self, generator):
+        """複数テイクが同時に生成され、かかる時間が1テイク分程度であることを確認"""
+        generator.max_concurrency = 4
+        generator.set_actor("テスト演者1")
+
+        with patch(
+            "models.async_voice_generator.connect",
+            side_effect=lambda *args, **kwargs: FakeConnection(audio_events(), delay=0.1),
+        ):
+            started = time.perf_counter()
+            takes = generator.generate_takes_sync("system", "acting", "text", 4)
+            elapsed = time.perf_counter() - started
+
+        assert len(takes) == 4
+        assert len(set(takes)) == 4
+        assert all(os.path.exists(path) for path in takes)
+        # 順番に生成すると約1.2秒（4テイク×3イベント×0.1秒）かかる
+        assert elapsed < 0.9
+
+    @pytest.mark.unit
+    def test_generate_takes_keeps_successful_takes(self, generator):
+        """一部のテイクが失敗しても成功したテイクは返されることを確認"""
+        generator.set_actor("テスト演者1")
+        connections = iter([
+            FakeConnection(audio_events()),
+            FakeConnection([{"type": "error", "error": {"message": "bad"}}]),
+            FakeConnection(audio_events()),
+        ])
+
+        with patch("models.async_voice_generator.connect", side_effect=lambda *args, **kwargs: next(connections)):
+            takes = generator.generate_takes_sync("system", "acting", "text", 3)
+
+        assert len(takes) == 2
+
+    @pytest.mark.unit
+    def test_generate_takes_removes_unsaved_previous_takes(self, generator):
+        """前回の未保存のテイクが次の生成時に削除されることを確認"""
+        generator.set_actor("テスト演者1")
+
+        with patch(
+            "models.async_voice_generator.connect",
+            side_effect=lambda *args, **kwargs: FakeConnection(audio_events()),
+        ):
+            first = generator.generate_takes_sync("system", "acting", "text", 2)
+            second = generator.generate_takes_sync("system", "acting", "text", 2)
+
+        assert not any(os.path.exists(path) for path in first)
+        assert all(os.path.exists(path) for path in second)
+
+    @pytest.mark.unit
+    def test_generate_takes_cancel_from_on_wait(self, generator):
+        """待機中のコールバックから中止できることを確認"""
+        generator.set_actor("テスト演者1")
+
+        with patch(
+            "models.async_voice_generator.connect",
+            side_effect=lambda *args, **kwargs: FakeConnection(audio_events(), delay=5),
+        ):
+            with pytest.raises(GenerationCancelled):
+                generator.generate_takes_sync("system", "acting", "text", 2, on_wait=generator.cancel)
+
+    @pytest.mark.unit
+    def test_memory_takes(self, mock_env_vars, mock_prompts_file, temp_dir):
+        """memory_takesが有効な場合、テイクをメモリに保持し、保存時にファイルへ書き出すことを確認"""
+        with patch("models.voice_generator.ROOT_DIR", str(mock_prompts_file.parent.parent)):
+            generator = AsyncVoiceGenerator(max_concurrency=2, memory_takes=True)
+        generator._get_temp_dir = lambda: str(temp_dir)
+        generator._get_output_dir = lambda: str(temp_dir / "output")
+        generator.trim_silence = False
+        generator.set_actor("テスト演者1")
+
+        try:
+            with patch(
+                "models.async_voice_generator.connect",
+                side_effect=lambda *args, **kwargs: FakeConnection(audio_events()),
+            ):
+                first_takes = generator.generate_takes_sync("system", "acting", "text", 2)
+                takes = generator.generate_takes_sync("system", "acting", "text", 2)
+
+            assert sorted(generator.takes_in_memory) == sorted(takes)
+            assert not any(os.path.exists(take) for take in first_takes)
+            assert all(os.path.getsize(take) == 0 for take in takes)
+            saved = generator.save_voice("テスト演者1", takes[0])
+            assert open(saved, "rb").read()[-4:] == b"\x01\x00\x02\x00"
+            assert list(generator.takes_in_memory) == [takes[1]]
+        finally:
+            generator.close()
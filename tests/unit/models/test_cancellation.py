@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+生成の中止・タイムアウトのユニットテスト
+"""
+
+import threading
+import pytest
+from unittest.mock import Mock
+
+from models.cancellation import CancelToken, GenerationCancelled, wait_for
+
+
+class TestCancellation:
+    """CancelToken / wait_forのテスト"""
+
+    @pytest.mark.unit
+    def test_wait_for_returns_when_set(self):
+        """イベントがセットされると待機を終了することを確認"""
+        event = threading.Event()
+        threading.Timer(0.05, event.set).start()
+        wait_for(event, timeout=1)
+        assert event.is_set()
+
+    @pytest.mark.unit
+    def test_wait_for_timeout(self):
+        """期限を過ぎるとTimeoutErrorとなることを確認"""
+        with pytest.raises(TimeoutError):
+            wait_for(threading.Event(), timeout=0.05)
+
+    @pytest.mark.unit
+    def test_wait_for_cancel(self):
+        """中止を要求するとGenerationCancelledとなることを確認"""
+        token = CancelToken()
+        threading.Timer(0.05, token.cancel).start()
+        with pytest.raises(GenerationCancelled):
+            wait_for(threading.Event(), timeout=5, cancel_token=token)
+        assert token.is_cancelled
+
+    @pytest.mark.unit
+    def test_wait_for_calls_on_wait(self):
+        """待機中にon_waitが呼び出されることを確認"""
+        token = CancelToken()
+        on_wait = Mock(side_effect=lambda: on_wait.call_count >= 3 and token.cancel())
+        with pytest.raises(GenerationCancelled):
+            wait_for(threading.Event(), cancel_token=token, on_wait=on_wait)
+        assert on_wait.call_count == 3
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+イベントデコーダーのユニットテスト
+"""
+
+import base64
+import json
+import pytest
+from unittest.mock import patch
+
+from models.event_decoder import decode_event
+
+
+def delta_message(pcm):
+    return json.dumps(
+        {"type": "response.audio.delta", "delta": base64.b64encode(pcm).decode()}, separators=(",", ":")
+    )
+
+
+class TestEventDecoder:
+    """decode_eventのテスト"""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("separators", [(",", ":"), (", ", ": ")])
+    def test_audio_delta_fast_path(self, separators):
+        """音声イベントはJSON全体を解析せずにデコードされることを確認"""
+        pcm = b"\x01\x00\x02\x00\xff\x7f"
+        message = json.dumps(
+            {"event_id": "e1", "type": "response.audio.delta", "item_id": "i1", "delta": base64.b64encode(pcm).decode()},
+            separators=separators,
+        )
+
+        with patch("models.event_decoder.loads", side_effect=json.loads) as mock_loads:
+            event = decode_event(message)
+            assert event.type == "response.audio.delta"
+            assert event.audio == pcm
+            mock_loads.assert_not_called()
+            # その他の項目は参照時に解析される
+            assert event.data["item_id"] == "i1"
+
+    @pytest.mark.unit
+    def test_bytes_message(self):
+        """bytesのメッセージも扱えることを確認"""
+        pcm = b"\x10\x00\x20\x00"
+        event = decode_event(delta_message(pcm).encode())
+        assert event.type == "response.audio.delta"
+        assert event.audio == pcm
+
+    @pytest.mark.unit
+    def test_escaped_slash(self):
+        """JSONでエスケープされた / を含む音声データも正しくデコードされることを確認"""
+        pcm = bytes([0xff, 0xff, 0xff, 0xfe])  # base64に / を含む
+        encoded = base64.b64encode(pcm).decode()
+        assert "/" in encoded
+        message = '{"type":"response.audio.delta","delta":"' + encoded.replace("/", "\\/") + '"}'
+        assert decode_event(message).audio == pcm
+
+    @pytest.mark.unit
+    def test_other_events(self):
+        """音声以外のイベントは通常どおり解析されることを確認"""
+        event = decode_event(json.dumps({
+            "item": {"type": "message", "id": "item_1"},
+            "type": "conversation.item.created",
+        }))
+        assert event.type == "conversation.item.created"
+        assert event.data["item"]["id"] == "item_1"
+        assert event.audio is None
+
+        # 文字起こしのdeltaは音声として扱わない
+        event = decode_event(json.dumps({"type": "response.audio_transcript.delta", "delta": "こんにちは"}))
+        assert event.type == "response.audio_transcript.delta"
+        assert event.audio is None
+
+    @pytest.mark.unit
+    def test_delta_without_audio(self):
+        """音声データがない音声イベントの場合はNoneを返すことを確認"""
+        event = decode_event(json.dumps({"type": "response.audio.delta"}))
+        assert event.type == "response.audio.delta"
+        assert event.audio is None
+
+    @pytest.mark.unit
+    def test_invalid_json(self):
+        """不正なJSONはValueErrorになることを確認"""
+        with pytest.raises(ValueError):
+            decode_event("not json")
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+GenerationCacheクラスのユニットテスト
+"""
+
+import os
+import pytest
+from unittest.mock import patch
+
+from models.generation_cache import GenerationCache
+
+
+class TestGenerationCache:
+    """GenerationCacheクラスのテスト"""
+
+    @pytest.fixture
+    def cache(self, temp_dir):
+        return GenerationCache(str(temp_dir / "cache"), max_bytes=100)
+
+    def _make_file(self, temp_dir, name, size):
+        path = temp_dir / name
+        path.write_bytes(b"x" * size)
+        return str(path)
+
+    @pytest.mark.unit
+    def test_make_key(self):
+        """キーが各要素の違いを区別することを確認"""
+        base = ("wss://example", "ballad", 1.0, "system", "text")
+        key = GenerationCache.make_key(*base)
+
+        assert key == GenerationCache.make_key(*base)
+        for i, value in enumerate(("wss://other", "sage", 1.3, "other", "other")):
+            changed = list(base)
+            changed[i] = value
+            assert GenerationCache.make_key(*changed) != key
+
+    @pytest.mark.unit
+    def test_get_and_put(self, cache, temp_dir):
+        """登録したファイルが取得でき、ヒット数・ミス数が記録されることを確認"""
+        assert cache.get("key") is None
+        cache.put("key", self._make_file(temp_dir, "take.wav", 10))
+
+        path = cache.get("key")
+        assert open(path, "rb").read() == b"x" * 10
+        assert cache.stats() == {"hits": 1, "misses": 1, "entries": 1, "bytes": 10}
+
+    @pytest.mark.unit
+    def test_put_failure_removes_temp_file(self, cache, temp_dir):
+        """登録に失敗した場合に書き込み途中の一時ファイルを残さないことを確認"""
+        source = self._make_file(temp_dir, "take.wav", 10)
+
+        with patch("models.generation_cache.os.replace", side_effect=OSError("disk full")):
+            cache.put("key", source)
+
+        assert os.listdir(cache.cache_dir) == []
+        assert cache.get("key") is None
+
+    @pytest.mark.unit
+    def test_put_pcm(self, cache):
+        """メモリ上の音声データがWAVファイルとして登録されることを確認"""
+        import wave
+
+        cache.max_bytes = 1000
+        cache.put_pcm("key", b"\x01\x00\x02\x00")
+
+        with wave.open(cache.get("key"), "rb") as wav_file:
+            assert (wav_file.getnchannels(), wav_file.getsampwidth(), wav_file.getframerate()) == (1, 2, 24000)
+            assert wav_file.readframes(2) == b"\x01\x00\x02\x00"
+        assert [name for name in os.listdir(cache.cache_dir) if name.endswith(".tmp")] == []
+
+    @pytest.mark.unit
+    def test_evicts_least_recently_used(self, cache, temp_dir):
+        """上限を超えた場合に最も古く使われたエントリから削除されることを確認"""
+        for i, key in enumerate(("a", "b")):
+            cache.put(key, self._make_file(temp_dir, f"{key}.wav", 40))
+            os.utime(cache._path(key), (i, i))
+        # aを使用してbを最も古いエントリにする
+        assert cache.get("a") is not None
+        cache.put("c", self._make_file(temp_dir, "c.wav", 40))
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+        assert cache.stats()["bytes"] <= 100
+
+    @pytest.mark.unit
+    def test_clear(self, cache, temp_dir):
+        """キャッシュをすべて削除できることを確認"""
+        cache.put("key", self._make_file(temp_dir, "take.wav", 10))
+        cache.clear()
+        assert cache.get("key") is None
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+生成メトリクスのユニットテスト
+"""
+
+import json
+import pytest
+from unittest.mock import patch
+
+from models.generation_metrics import GenerationTimeline, MetricsRecorder
+
+
+class TestGenerationMetrics:
+    """GenerationTimeline / MetricsRecorderのテスト"""
+
+    @pytest.mark.unit
+    def test_timeline_derived_metrics(self):
+        """TTFB・合計時間・音声の長さが計算されることを確認"""
+        clock = iter([0.0, 0.1, 0.3, 0.5, 0.9, 1.0, 2.0])
+        with patch("models.generation_metrics.time.perf_counter", side_effect=lambda: next(clock)):
+            timeline = GenerationTimeline("演者A", "セリフ", voice="sage")
+            timeline.mark("connect")          # 0.1
+            timeline.mark("open")             # 0.3
+            timeline.add_chunk(24000)         # 0.5 first_delta / last_delta
+            timeline.add_chunk(24000)         # 0.9 last_delta
+            timeline.mark("audio_done")       # 1.0
+            timeline.mark("end")              # 2.0
+
+        record = timeline.to_record()
+        assert record["marks_ms"]["first_delta"] == 500
+        assert record["marks_ms"]["last_delta"] == 900
+        assert record["ttfb_ms"] == 500
+        assert record["server_ttfb_ms"] == 200
+        assert record["total_ms"] == 2000
+        assert record["bytes_received"] == 48000
+        assert record["audio_sec"] == 1.0
+        assert record["audio_sec_per_wall_sec"] == 0.5
+        assert record["voice"] == "sage"
+
+    @pytest.mark.unit
+    def test_recorder_writes_jsonl(self, temp_dir):
+        """記録がJSONLとメモリの両方に保存されることを確認"""
+        recorder = MetricsRecorder(str(temp_dir / "log"))
+        timeline = GenerationTimeline("演者A", "セリフ")
+        timeline.add_chunk(100)
+
+        record = recorder.record(timeline)
+        recorder.record_playback(timeline)
+
+        assert recorder.latest is record
+        assert "playback_start" in recorder.latest["marks_ms"]
+        with open(recorder.log_file, "r", encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f]
+        assert [line["event"] for line in lines] == ["generation", "playback"]
+        assert lines[0]["bytes_received"] == 100
+        assert lines[1]["id"] == timeline.id
+
+    @pytest.mark.unit
+    def test_recorder_without_log_dir(self):
+        """出力先がない場合もメモリ上に記録されることを確認"""
+        recorder = MetricsRecorder(history_size=2)
+        for _ in range(3):
+            recorder.record(GenerationTimeline())
+        assert len(recorder.history) == 2
+        assert recorder.latest["ttfb_ms"] is None
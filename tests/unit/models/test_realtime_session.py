@@ -0,0 +1,345 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+RealtimeSession / RealtimeSessionManagerのユニットテスト
+"""
+
+import base64
+import json
+import time
+import pytest
+from unittest.mock import Mock, patch
+
+from models.cancellation import CancelToken, GenerationCancelled
+from models.realtime_session import RealtimeSession, RealtimeSessionManager
+
+
+class FakeWebSocketApp:
+    """Realtime APIの応答を模擬するWebSocketApp"""
+
+    instances = []
+
+    def __init__(self, url, header=None, on_message=None, on_error=None, on_close=None, on_open=None):
+        self.url = url
+        self.on_message = on_message
+        self.on_close = on_close
+        self.on_open = on_open
+        self.sent = []
+        self.closed = False
+        self._item_counter = 0
+        FakeWebSocketApp.instances.append(self)
+
+    def run_forever(self, **kwargs):
+        self.run_kwargs = kwargs
+        self.on_open(self)
+
+    def send(self, message):
+        data = json.loads(message)
+        self.sent.append(data)
+        if data["type"] == "conversation.item.create":
+            self._item_counter += 1
+            self._emit({"type": "conversation.item.created", "item": {"id": f"item_{self._item_counter}"}})
+        elif data["type"] == "response.create":
+            self._emit({"type": "response.audio.delta", "delta": base64.b64encode(b"\x01\x00").decode()})
+            self._emit({"type": "response.audio.done"})
+            self._emit({"type": "response.done"})
+
+    def close(self):
+        self.closed = True
+
+    def _emit(self, data):
+        self.on_message(self, json.dumps(data))
+
+    def sent_types(self):
+        return [m["type"] for m in self.sent]
+
+
+class TestRealtimeSession:
+    """RealtimeSessionのテスト"""
+
+    @pytest.fixture(autouse=True)
+    def fake_websocket(self):
+        FakeWebSocketApp.instances = []
+        with patch("models.realtime_session.WebSocketApp", FakeWebSocketApp):
+            yield
+
+    @pytest.mark.unit
+    def test_request_forwards_messages(self):
+        """受信メッセージがコールバックに渡されることを確認"""
+        session = RealtimeSession("ws://test", {}, "sage")
+        listener = Mock()
+
+        session.request("system", "text", listener, timeout=1)
+
+        received = [json.loads(call.args[1])["type"] for call in listener.call_args_list]
+        assert "response.audio.delta" in received
+        assert "response.done" in received
+
+    @pytest.mark.unit
+    def test_reuses_connection_and_session_update(self):
+        """2回目以降は接続とsession.updateを省略することを確認"""
+        session = RealtimeSession("ws://test", {}, "sage")
+
+        session.request("system", "line 1", Mock(), timeout=1)
+        session.request("system", "line 2", Mock(), timeout=1)
+
+        assert len(FakeWebSocketApp.instances) == 1
+        ws = FakeWebSocketApp.instances[0]
+        assert ws.sent_types().count("session.update") == 1
+        assert ws.sent_types().count("response.create") == 2
+
+    @pytest.mark.unit
+    def test_instructions_change_sends_session_update(self):
+        """instructionsが変わった場合はsession.updateを送り直すことを確認"""
+        session = RealtimeSession("ws://test", {}, "sage")
+
+        session.request("system A", "line", Mock(), timeout=1)
+        session.request("system B", "line", Mock(), timeout=1)
+
+        ws = FakeWebSocketApp.instances[0]
+        updates = [m for m in ws.sent if m["type"] == "session.update"]
+        assert [u["session"]["instructions"] for u in updates] == ["system A", "system B"]
+        assert all(u["session"]["voice"] == "sage" for u in updates)
+
+    @pytest.mark.unit
+    def test_deletes_conversation_items(self):
+        """生成後に会話アイテムを削除することを確認"""
+        session = RealtimeSession("ws://test", {}, "sage")
+
+        session.request("system", "line", Mock(), timeout=1)
+
+        ws = FakeWebSocketApp.instances[0]
+        deletes = [m["item_id"] for m in ws.sent if m["type"] == "conversation.item.delete"]
+        assert deletes == ["item_1"]
+
+    @pytest.mark.unit
+    def test_reconnects_after_close(self):
+        """切断後は次のリクエストで再接続することを確認"""
+        session = RealtimeSession("ws://test", {}, "sage")
+        session.request("system", "line 1", Mock(), timeout=1)
+
+        # サーバー側から切断
+        first = FakeWebSocketApp.instances[0]
+        first.on_close(first, None, "server closed")
+        assert not session.is_connected
+
+        session.request("system", "line 2", Mock(), timeout=1)
+
+        assert len(FakeWebSocketApp.instances) == 2
+        # 新しい接続ではsession.updateを送り直す
+        assert FakeWebSocketApp.instances[1].sent_types()[0] == "session.update"
+
+    @pytest.mark.unit
+    def test_server_error_raises(self):
+        """生成中のサーバーエラーが例外になることを確認"""
+        session = RealtimeSession("ws://test", {}, "sage")
+        session.connect()
+        ws = FakeWebSocketApp.instances[0]
+        ws.send = lambda message: ws._emit({"type": "error", "error": {"message": "bad"}}) \
+            if json.loads(message)["type"] == "response.create" else None
+
+        with pytest.raises(ConnectionError):
+            session.request("system", "line", Mock(), timeout=1)
+
+    @pytest.mark.unit
+    def test_timeout(self):
+        """応答がない場合にTimeoutErrorとなることを確認"""
+        session = RealtimeSession("ws://test", {}, "sage")
+        session.connect()
+        ws = FakeWebSocketApp.instances[0]
+        ws.send = Mock()
+
+        with pytest.raises(TimeoutError):
+            session.request("system", "line", Mock(), timeout=0.05)
+        assert ws.closed
+
+    @pytest.mark.unit
+    def test_cancel_keeps_connection(self):
+        """中止時はresponse.cancelを送信し、完了を受信できれば接続を使い回すことを確認"""
+        session = RealtimeSession("ws://test", {}, "sage")
+        session.connect()
+        ws = FakeWebSocketApp.instances[0]
+
+        def send(message):
+            data = json.loads(message)
+            ws.sent.append(data)
+            if data["type"] == "response.cancel":
+                ws._emit({"type": "response.done", "response": {"status": "cancelled"}})
+
+        ws.send = send
+        token = CancelToken()
+        token.cancel()
+
+        with pytest.raises(GenerationCancelled):
+            session.request("system", "line", Mock(), cancel_token=token)
+        assert "response.cancel" in ws.sent_types()
+        assert not ws.closed
+        assert session.is_connected
+
+    @pytest.mark.unit
+    def test_cancel_without_response_closes(self):
+        """中止の完了を受信できない場合は接続を閉じることを確認"""
+        session = RealtimeSession("ws://test", {}, "sage", cancel_grace=0.05)
+        session.connect()
+        ws = FakeWebSocketApp.instances[0]
+        ws.send = Mock()
+        token = CancelToken()
+        on_wait = Mock(side_effect=token.cancel)
+
+        with pytest.raises(GenerationCancelled):
+            session.request("system", "line", Mock(), cancel_token=token, on_wait=on_wait)
+        on_wait.assert_called_once()
+        # 中止の完了は待たずに戻り、次の生成の前に確認する
+        assert not ws.closed
+
+        session.request("system", "line", Mock(), timeout=1)
+
+        assert ws.closed
+        assert len(FakeWebSocketApp.instances) == 2
+
+    @pytest.mark.unit
+    def test_cancel_while_session_busy(self):
+        """事前準備でセッションが使用中の間も中止を確認することを確認"""
+        session = RealtimeSession("ws://test", {}, "sage")
+        session._lock.acquire()
+        token = CancelToken()
+        on_wait = Mock(side_effect=token.cancel)
+
+        start = time.monotonic()
+        with pytest.raises(GenerationCancelled):
+            session.request("system", "line", Mock(), cancel_token=token, on_wait=on_wait)
+        assert time.monotonic() - start < 0.5
+        session._lock.release()
+
+    @pytest.mark.unit
+    def test_timeout_while_session_busy(self):
+        """セッションが使用中のまま期限を過ぎた場合にTimeoutErrorとなることを確認"""
+        session = RealtimeSession("ws://test", {}, "sage")
+        session._lock.acquire()
+
+        with pytest.raises(TimeoutError):
+            session.request("system", "line", Mock(), timeout=0.1)
+        session._lock.release()
+
+    @pytest.mark.unit
+    def test_connect_honours_deadline(self):
+        """接続の待機がconnect_timeoutではなく生成の期限で打ち切られることを確認"""
+        session = RealtimeSession("ws://test", {}, "sage", connect_timeout=10.0)
+
+        start = time.monotonic()
+        # 接続が完了しないサーバー
+        with patch.object(FakeWebSocketApp, "run_forever", lambda self, **kwargs: None):
+            with pytest.raises(TimeoutError):
+                session.request("system", "line", Mock(), timeout=0.1)
+        assert time.monotonic() - start < 1.0
+        assert FakeWebSocketApp.instances[0].closed
+
+    @pytest.mark.unit
+    def test_connect_honours_cancel(self):
+        """接続の待機中に中止できることを確認"""
+        session = RealtimeSession("ws://test", {}, "sage", connect_timeout=10.0)
+        token = CancelToken()
+        on_wait = Mock(side_effect=token.cancel)
+
+        start = time.monotonic()
+        with patch.object(FakeWebSocketApp, "run_forever", lambda self, **kwargs: None):
+            with pytest.raises(GenerationCancelled):
+                session.request("system", "line", Mock(), cancel_token=token, on_wait=on_wait)
+        assert time.monotonic() - start < 1.0
+        assert FakeWebSocketApp.instances[0].closed
+
+
+class TestRealtimeSessionManager:
+    """RealtimeSessionManagerのテスト"""
+
+    @pytest.mark.unit
+    def test_get_session_is_cached_per_actor_and_voice(self):
+        """演者・音声ごとに同じセッションが返されることを確認"""
+        manager = RealtimeSessionManager("ws://test", {})
+
+        first = manager.get_session("演者A", "sage")
+        assert manager.get_session("演者A", "sage") is first
+        assert manager.get_session("演者A", "alloy") is not first
+        assert manager.get_session("演者B", "sage") is not first
+
+    @pytest.mark.unit
+    def test_close_all(self):
+        """すべてのセッションが閉じられることを確認"""
+        manager = RealtimeSessionManager("ws://test", {})
+        session = manager.get_session("演者A", "sage")
+        session.close = Mock()
+
+        manager.close_all()
+
+        session.close.assert_called_once()
+        assert manager.sessions == {}
+
+
+class TestSessionPrewarm:
+    """セッションの事前接続と未使用セッションの破棄のテスト"""
+
+    @pytest.fixture(autouse=True)
+    def fake_websocket(self):
+        FakeWebSocketApp.instances = []
+        with patch("models.realtime_session.WebSocketApp", FakeWebSocketApp):
+            yield
+
+    @pytest.mark.unit
+    def test_warm_sends_session_update_before_request(self):
+        """事前接続後の生成ではセリフとresponse.createだけを送ることを確認"""
+        session = RealtimeSession("ws://test", {}, "sage")
+
+        assert session.warm("system")
+        ws = FakeWebSocketApp.instances[0]
+        assert ws.sent_types() == ["session.update"]
+
+        session.request("system", "line", Mock(), timeout=1)
+
+        assert len(FakeWebSocketApp.instances) == 1
+        assert "session.update" not in ws.sent_types()[1:]
+        assert ws.sent_types()[1:3] == ["conversation.item.create", "response.create"]
+
+    @pytest.mark.unit
+    def test_manager_prewarm_runs_in_background(self):
+        """prewarmがバックグラウンドでセッションを準備することを確認"""
+        manager = RealtimeSessionManager("ws://test", {}, idle_timeout=0)
+
+        thread = manager.prewarm("演者A", "sage", "system")
+        thread.join(timeout=1)
+
+        session = manager.get_session("演者A", "sage")
+        assert session.is_connected
+        assert FakeWebSocketApp.instances[0].sent_types() == ["session.update"]
+
+    @pytest.mark.unit
+    def test_close_idle_drops_unused_sessions(self):
+        """一定時間使われていないセッションが閉じられることを確認"""
+        manager = RealtimeSessionManager("ws://test", {}, idle_timeout=60)
+        idle = manager.get_session("演者A", "sage")
+        active = manager.get_session("演者B", "sage")
+        idle.warm("system")
+        active.warm("system")
+        idle.last_used -= 120
+
+        manager.close_idle()
+
+        assert FakeWebSocketApp.instances[0].closed
+        assert not FakeWebSocketApp.instances[1].closed
+        assert ("演者A", "sage") not in manager.sessions
+        assert ("演者B", "sage") in manager.sessions
+        manager.close_all()
+
+    @pytest.mark.unit
+    def test_reaper_closes_idle_sessions(self):
+        """監視スレッドがタイムアウトしたセッションを閉じることを確認"""
+        manager = RealtimeSessionManager("ws://test", {}, idle_timeout=0.05)
+        manager.prewarm("演者A", "sage", "system").join(timeout=1)
+
+        for _ in range(100):
+            if not manager.sessions:
+                break
+            time.sleep(0.02)
+
+        assert manager.sessions == {}
+        assert FakeWebSocketApp.instances[0].closed
+        manager.close_all()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+TempStoreクラスのユニットテスト
+"""
+
+import os
+import time
+import pytest
+from unittest.mock import patch
+
+from models.temp_store import GRACE_SECONDS, TempStore
+
+
+class TestTempStore:
+    """TempStoreクラスのテスト"""
+
+    def _make_file(self, directory, name, size, age=0):
+        path = directory / name
+        path.write_bytes(b"x" * size)
+        mtime = time.time() - age
+        os.utime(path, (mtime, mtime))
+        return path
+
+    @pytest.mark.unit
+    def test_create_is_exclusive(self, temp_dir):
+        """一時ファイルが重複しない名前で作成され、使用状況に反映されることを確認"""
+        store = TempStore(str(temp_dir))
+
+        paths = {store.create() for _ in range(5)}
+
+        assert len(paths) == 5
+        assert all(os.path.exists(path) and path.endswith(".wav") for path in paths)
+        assert store.usage() == {"files": 5, "bytes": 0, "active": 5, "max_bytes": store.max_bytes}
+
+    @pytest.mark.unit
+    def test_startup_sweeps_orphans(self, temp_dir):
+        """起動時に古いファイルを削除し、新しいファイルと管理対象外のファイルは残すことを確認"""
+        old = self._make_file(temp_dir, "tmpabc.wav", 10, age=2 * 24 * 60 * 60)
+        recent = self._make_file(temp_dir, "take_recent.wav", 10, age=60)
+        other = self._make_file(temp_dir, "memo.txt", 10, age=2 * 24 * 60 * 60)
+
+        store = TempStore(str(temp_dir))
+
+        assert not old.exists()
+        assert recent.exists()
+        assert other.exists()
+        assert store.usage()["files"] == 1
+
+    @pytest.mark.unit
+    def test_size_cap_removes_oldest_unused(self, temp_dir):
+        """上限を超えた場合、使用中でない古いファイルから削除することを確認"""
+        oldest = self._make_file(temp_dir, "take_1.wav", 60, age=GRACE_SECONDS + 300)
+        older = self._make_file(temp_dir, "take_2.wav", 60, age=GRACE_SECONDS + 200)
+        store = TempStore(str(temp_dir), max_bytes=100)
+        assert not oldest.exists()
+        assert older.exists()
+
+        active = store.create()
+        with open(active, "wb") as f:
+            f.write(b"x" * 200)
+        os.utime(active, (0, 0))
+        store.sweep()
+
+        # 使用中のファイルは上限を超えていても削除しない
+        assert os.path.exists(active)
+        assert not older.exists()
+
+        store.release(active)
+        store.sweep()
+        assert not os.path.exists(active)
+        assert store.usage()["files"] == 0
+
+    @pytest.mark.unit
+    def test_shared_directory_only_manages_own_files(self, temp_dir):
+        """共有の一時ディレクトリでは接頭辞の付いたファイルだけを削除することを確認"""
+        foreign = self._make_file(temp_dir, "tmpabc.wav", 10, age=2 * 24 * 60 * 60)
+        own = self._make_file(temp_dir, "take_abc.wav", 10, age=2 * 24 * 60 * 60)
+
+        TempStore(str(temp_dir), shared=True)
+
+        assert foreign.exists()
+        assert not own.exists()
+
+    @pytest.mark.unit
+    def test_for_dir_shares_store(self, temp_dir):
+        """同じディレクトリには同じストアを返し、他の利用者の使用中のファイルを削除しないことを確認"""
+        first = TempStore.for_dir(str(temp_dir), max_bytes=0)
+        second = TempStore.for_dir(os.path.join(str(temp_dir), "."), max_bytes=0)
+        assert second is first
+        assert TempStore.get(str(temp_dir)) is first
+
+        in_use = first.create()
+        os.utime(in_use, (0, 0))
+        second.sweep()
+
+        assert os.path.exists(in_use)
+        assert first.usage()["active"] == 1
+
+    @pytest.mark.unit
+    def test_create_sweeps_are_throttled(self, temp_dir):
+        """作成のたびには掃除せず、一定数の作成または一定時間ごとに掃除することを確認"""
+        store = TempStore(str(temp_dir), sweep_interval=60, sweep_every=3)
+
+        with patch.object(store, "sweep", wraps=store.sweep) as mock_sweep:
+            for _ in range(5):
+                store.create()
+            assert mock_sweep.call_count == 1
+
+            store._last_sweep -= 61
+            store.create()
+            assert mock_sweep.call_count == 2
@@ -7,9 +7,15 @@ VoiceGeneratorクラスのユニットテスト
 import pytest
 import os
 import json
-from unittest.mock import Mock, patch, mock_open
+import base64
+import threading
+import time
+import numpy as np
+from unittest.mock import Mock, patch
 
-from models.voice_generator import VoiceGenerator
+from models.cancellation import CancelToken, GenerationCancelled
+from models.voice_generator import TakeBuffer, VoiceGenerator
+from utils.audio.time_stretch import create_stretcher
 
 
 class TestVoiceGenerator:
@@ -91,6 +97,43 @@ class TestVoiceGenerator:
         assert "voice" in fallback
         assert "speed" in fallback
 
+    @pytest.mark.unit
+    def test_speed_is_opt_in(self, voice_generator):
+        """速度を指定していない演者とフォールバック設定では速度変更をしないことを確認"""
+        voice_generator.performer_configs = {"速度なし": {"voice": "sage"}}
+
+        assert voice_generator._get_voice_config("速度なし")["speed"] == 1.0
+        assert voice_generator._get_voice_config("存在しない演者")["speed"] == 1.0
+        assert create_stretcher(voice_generator._get_voice_config("速度なし")["speed"]) is None
+
+    @pytest.mark.unit
+    def test_speed_is_skipped_when_prompt_asks_to_read_faster(self, voice_generator):
+        """システムプロンプトで速く読むよう指示している場合はspeedを適用せず、警告は演者ごとに1回だけ出すことを確認"""
+        voice_generator.set_actor("神田")
+        config = {"voice": "ballad", "speed": 1.3}
+
+        with patch("models.voice_generator.logger") as mock_logger:
+            assert voice_generator._speed_for_prompt(config, "通常より30%早く読んでください。")["speed"] == 1.0
+            assert voice_generator._speed_for_prompt(config, "通常より３０％早く読んで")["speed"] == 1.0
+            assert voice_generator._speed_for_prompt(config, "20％速く話してください。")["speed"] == 1.0
+            assert voice_generator._speed_for_prompt(config, "落ち着いて読んでください。") is config
+
+        assert mock_logger.warning.call_count == 1
+        assert config["speed"] == 1.3
+
+    @pytest.mark.unit
+    def test_bundled_prompts_use_speed_without_prompt_instruction(self):
+        """同梱の演者設定はspeedで速度を指定し、プロンプトでは速度を指示していないことを確認"""
+        import json
+        from models.voice_generator import ROOT_DIR, SPEED_INSTRUCTION_PATTERN
+
+        with open(os.path.join(ROOT_DIR, "config", "prompts.json"), encoding="utf-8") as f:
+            configs = json.load(f)
+
+        for config in configs.values():
+            assert config["speed"] == 1.3
+            assert not SPEED_INSTRUCTION_PATTERN.search(config["system_prompt"])
+
     @pytest.mark.unit
     @patch("models.voice_generator.WebSocketApp")
     def test_generate_voice_no_actor(self, mock_websocket, voice_generator):
@@ -98,6 +141,29 @@ class TestVoiceGenerator:
         with pytest.raises(ValueError, match="演者が設定されていません"):
             voice_generator.generate_voice("system", "acting", "text")
 
+    @pytest.mark.unit
+    @patch("models.voice_generator.WebSocketApp")
+    def test_generate_voice_cancel_returns_promptly(self, mock_websocket_class, voice_generator):
+        """1回限りの接続で中止した場合、接続の終了を待たずに戻ることを確認"""
+        voice_generator.set_actor("テスト演者1")
+        closed = threading.Event()
+        mock_websocket = Mock()
+        # 応答せず、閉じられた後もすぐには終了しない接続
+        mock_websocket.run_forever.side_effect = lambda: closed.wait(5)
+        mock_websocket_class.return_value = mock_websocket
+        token = CancelToken()
+
+        start = time.monotonic()
+        with pytest.raises(GenerationCancelled):
+            voice_generator.generate_voice(
+                "system", "acting", "text", cancel_token=token, on_wait=token.cancel
+            )
+        assert time.monotonic() - start < 0.5
+        mock_websocket.close.assert_called_once()
+        # 中止後に届いたデータは受け取らない
+        assert mock_websocket.on_message is None
+        closed.set()
+
     @pytest.mark.unit
     @patch("models.voice_generator.WebSocketApp")
     @patch("models.voice_generator.os.path.exists")
@@ -124,10 +190,9 @@ class TestVoiceGenerator:
         assert "test text" in voice_generator.current_text
 
     @pytest.mark.unit
-    def test_on_message_audio_delta(self, voice_generator):
+    def test_on_message_audio_delta(self, voice_generator, temp_dir):
         """音声データ受信メッセージのテスト"""
         mock_ws = Mock()
-        test_audio_data = b"test audio data"
         encoded_data = "dGVzdCBhdWRpbyBkYXRh"  # base64エンコードされた "test audio data"
         
         message = json.dumps({
@@ -135,34 +200,102 @@ class TestVoiceGenerator:
             "delta": encoded_data
         })
         
-        voice_generator._on_message(mock_ws, message)
+        with patch("models.voice_generator.ROOT_DIR", str(temp_dir)):
+            voice_generator._on_message(mock_ws, message)
         
-        assert test_audio_data in voice_generator.audio_chunks
+        # 受信データはメモリに溜めずに一時ファイルへ書き込まれる
+        assert voice_generator.wav_writer is not None
+        assert voice_generator.wav_writer.bytes_written == len(b"test audio data")
+        voice_generator._discard_take()
 
     @pytest.mark.unit
     @patch("models.voice_generator.wave.open")
     def test_on_message_audio_done(self, mock_wave_open, voice_generator, temp_dir):
         """音声データ完了メッセージのテスト"""
         mock_ws = Mock()
-        voice_generator.audio_chunks = bytearray(b"test audio data")
-        
-        # 一時ファイルの設定
-        with patch("models.voice_generator.ROOT_DIR", str(temp_dir)):
-            voice_generator._create_temp_file()
-        
         mock_wav_file = Mock()
         mock_wave_open.return_value.__enter__.return_value = mock_wav_file
         
-        message = json.dumps({"type": "response.audio.done"})
-        
-        voice_generator._on_message(mock_ws, message)
+        with patch("models.voice_generator.ROOT_DIR", str(temp_dir)):
+            voice_generator._on_message(mock_ws, json.dumps({
+                "type": "response.audio.delta",
+                "delta": "dGVzdCBhdWRpbyBkYXRh",
+            }))
+            voice_generator._on_message(mock_ws, json.dumps({"type": "response.audio.done"}))
         
         # WAVファイルの設定が呼ばれることを確認
         mock_wav_file.setnchannels.assert_called_with(1)
         mock_wav_file.setsampwidth.assert_called_with(2)
         mock_wav_file.setframerate.assert_called_with(24000)
         # 音声データが書き込まれることを確認（空でない）
-        mock_wav_file.writeframes.assert_called_once()
+        mock_wav_file.writeframesraw.assert_called_once_with(b"test audio data")
+        # ファイルが閉じられ（ヘッダー確定）、直近の生成結果になることを確認
+        mock_wave_open.return_value.__exit__.assert_called_once()
+        assert voice_generator.wav_writer is None
+        assert voice_generator.temp_file.startswith(str(temp_dir))
+
+    @pytest.mark.unit
+    def test_on_message_applies_speed(self, voice_generator, temp_dir):
+        """演者の速度設定が受信した音声に適用されることを確認"""
+        import wave
+        from utils.audio.time_stretch import WsolaStretcher
+
+        mock_ws = Mock()
+        voice_generator._get_temp_dir = lambda: str(temp_dir)
+        voice_generator.stretcher = WsolaStretcher(1.2)
+        pcm = (np.sin(np.arange(24000) * 0.05) * 8000).astype("<i2").tobytes()
+
+        for start in range(0, len(pcm), 4800):
+            voice_generator._on_message(mock_ws, json.dumps({
+                "type": "response.audio.delta",
+                "delta": base64.b64encode(pcm[start:start + 4800]).decode(),
+            }))
+        voice_generator._on_message(mock_ws, json.dumps({"type": "response.audio.done"}))
+
+        with wave.open(voice_generator.temp_file, "rb") as wav_file:
+            assert wav_file.getnframes() == 20000
+        assert voice_generator.stretcher is None
+
+    @pytest.mark.unit
+    def test_streaming_wav_writer_header(self, voice_generator, temp_dir):
+        """逐次書き込みしたWAVファイルのヘッダーが確定されることを確認"""
+        import wave
+        from models.voice_generator import StreamingWavWriter
+
+        path = str(temp_dir / "stream.wav")
+        writer = StreamingWavWriter(path)
+        for _ in range(10):
+            writer.write(b"\x01\x00" * 100)
+        writer.close()
+
+        with wave.open(path, "rb") as wav_file:
+            assert wav_file.getnframes() == 1000
+            assert wav_file.getframerate() == 24000
+        assert os.path.getsize(path) == 44 + 2000
+
+    @pytest.mark.unit
+    def test_discard_incomplete_take(self, voice_generator, temp_dir):
+        """完了しなかったテイクは破棄され、次の生成に持ち越されないことを確認"""
+        previous = temp_dir / "previous.wav"
+        previous.write_bytes(b"RIFF")
+        voice_generator.temp_file = str(previous)
+        mock_ws = Mock()
+
+        with patch("models.voice_generator.ROOT_DIR", str(temp_dir)):
+            voice_generator._on_message(mock_ws, json.dumps({
+                "type": "response.audio.delta",
+                "delta": "dGVzdCBhdWRpbyBkYXRh",
+            }))
+        partial = voice_generator.wav_writer.file_path
+        assert os.path.exists(partial)
+
+        voice_generator._discard_take()
+
+        assert not os.path.exists(partial)
+        assert voice_generator.wav_writer is None
+        # 前回の生成結果はそのまま残る
+        assert voice_generator.temp_file == str(previous)
+        assert previous.exists()
 
     @pytest.mark.unit
     def test_on_message_response_done(self, voice_generator):
@@ -213,26 +346,105 @@ class TestVoiceGenerator:
         assert mock_ws.send.call_count == 3
 
     @pytest.mark.unit
-    @patch("models.voice_generator.os.path.exists")
-    @patch("models.voice_generator.os.makedirs")
-    def test_save_voice_success(self, mock_makedirs, mock_exists, voice_generator, temp_dir):
-        """音声保存成功のテスト"""
+    def test_save_voice_success(self, voice_generator, temp_dir):
+        """音声保存成功のテスト（一時ファイルはコピーせずに移動される）"""
         # テスト用一時ファイルを作成
         temp_file = temp_dir / "temp.wav"
         temp_file.write_bytes(b"test audio data")
         voice_generator.temp_file = str(temp_file)
         
-        mock_exists.return_value = True
-        
         with patch("models.voice_generator.ROOT_DIR", str(temp_dir)), \
-             patch("builtins.open", mock_open(read_data=b"test audio data")) as mock_file, \
-             patch("models.voice_generator.os.remove") as mock_remove:
+             patch("models.voice_generator.copy_file") as mock_copy:
             
             result = voice_generator.save_voice("テスト演者")
             
             assert result is not None
             assert "テスト演者" in result
-            mock_remove.assert_called_once()
+            assert open(result, "rb").read() == b"test audio data"
+            assert not temp_file.exists()
+            assert voice_generator.temp_file is None
+            mock_copy.assert_not_called()
+
+    @pytest.mark.unit
+    def test_save_voice_across_filesystems(self, voice_generator, temp_dir):
+        """os.replaceで移動できない場合はコピーして元のファイルを削除することを確認"""
+        import errno
+
+        data = os.urandom(3 * 1024 * 1024 + 123)
+        temp_file = temp_dir / "temp.wav"
+        temp_file.write_bytes(data)
+        voice_generator.trim_silence = False
+
+        with patch("models.voice_generator.ROOT_DIR", str(temp_dir)), \
+             patch("models.voice_generator.os.replace", side_effect=OSError(errno.EXDEV, "cross-device link")):
+            result = voice_generator.save_voice("テスト演者", str(temp_file))
+
+        assert open(result, "rb").read() == data
+        assert not temp_file.exists()
+
+    @pytest.mark.unit
+    def test_copy_file_chunked_fallback(self, temp_dir):
+        """カーネル内でコピーできない場合は一定サイズごとにコピーすることを確認"""
+        import errno
+        from models.voice_generator import copy_file
+
+        data = os.urandom(2 * 1024 * 1024 + 7)
+        source = temp_dir / "source.wav"
+        source.write_bytes(data)
+        destination = temp_dir / "destination.wav"
+
+        with patch("models.voice_generator.os.copy_file_range", side_effect=OSError(errno.ENOSYS, "nosys"), create=True), \
+             patch("models.voice_generator.os.sendfile", side_effect=OSError(errno.EINVAL, "invalid"), create=True):
+            copy_file(str(source), str(destination))
+
+        assert destination.read_bytes() == data
+
+    @pytest.mark.unit
+    def test_save_voice_trims_silence(self, voice_generator, temp_dir):
+        """保存時に前後の無音が除去されることを確認"""
+        import soundfile as sf
+
+        voice = (np.sin(np.arange(12000) * 0.05) * 8000).astype(np.int16)
+        silence = np.zeros(24000, dtype=np.int16)
+        temp_file = temp_dir / "temp.wav"
+        sf.write(temp_file, np.concatenate((silence, voice, silence)), 24000, subtype="PCM_16")
+        voice_generator.temp_file = str(temp_file)
+        voice_generator.silence_padding_ms = 0
+
+        with patch("models.voice_generator.ROOT_DIR", str(temp_dir)):
+            result = voice_generator.save_voice("テスト演者")
+
+        saved, _ = sf.read(result, dtype="int16")
+        assert len(saved) == pytest.approx(len(voice), abs=240)
+        assert not temp_file.exists()
+
+        # 無効にした場合はそのまま保存する
+        sf.write(temp_file, np.concatenate((silence, voice)), 24000, subtype="PCM_16")
+        voice_generator.trim_silence = False
+        with patch("models.voice_generator.ROOT_DIR", str(temp_dir)):
+            result = voice_generator.save_voice("テスト演者", str(temp_file))
+        assert sf.info(result).frames == len(silence) + len(voice)
+
+    @pytest.mark.unit
+    def test_save_voice_moves_untrimmed_take(self, voice_generator, temp_dir):
+        """除去する無音がない場合はファイルを読み直さずに移動し、通常のファイルと同じ権限になることを確認"""
+        import soundfile as sf
+        from models.temp_store import UMASK
+
+        voice = (np.sin(np.arange(24000) * 0.05) * 8000).astype(np.int16)
+        temp_file = voice_generator._new_temp_path()
+        sf.write(temp_file, voice, 24000, subtype="PCM_16")
+        os.chmod(temp_file, 0o600)
+        voice_generator.temp_file = temp_file
+
+        with patch("models.voice_generator.ROOT_DIR", str(temp_dir)), \
+             patch("models.voice_generator.copy_range") as mock_copy_range:
+            result = voice_generator.save_voice("テスト演者")
+
+        mock_copy_range.assert_not_called()
+        assert not os.path.exists(temp_file)
+        np.testing.assert_array_equal(sf.read(result, dtype="int16")[0], voice)
+        assert os.stat(result).st_mode & 0o777 == 0o666 & ~UMASK
 
     @pytest.mark.unit
     def test_save_voice_no_temp_file(self, voice_generator):
@@ -285,4 +497,251 @@ class TestVoiceGenerator:
             actor_config = voice_generator.performer_configs[actor_name]
             assert "system_prompt" in actor_config
             assert "voice" in actor_config
-            assert "speed" in actor_config
\ No newline at end of file
+            assert "speed" in actor_config
+    @pytest.mark.unit
+    def test_generate_voice_with_reused_session(self, mock_env_vars, mock_prompts_file, temp_dir):
+        """セッション再利用時はWebSocketAppを作らずセッションへ送信することを確認"""
+        with patch("models.voice_generator.ROOT_DIR", str(mock_prompts_file.parent.parent)):
+            vg = VoiceGenerator(reuse_sessions=True)
+        vg.set_actor("テスト演者1")
+        vg.temp_file = str(temp_dir / "test.wav")
+        (temp_dir / "test.wav").write_bytes(b"RIFF")
+        mock_session = Mock()
+        vg.session_manager = Mock()
+        vg.session_manager.get_session.return_value = mock_session
+
+        with patch("models.voice_generator.WebSocketApp") as mock_websocket_class:
+            result = vg.generate_voice("system prompt", "acting prompt", "test text")
+
+        assert result == str(temp_dir / "test.wav")
+        mock_websocket_class.assert_not_called()
+        vg.session_manager.get_session.assert_called_once_with("テスト演者1", "ballad")
+        args = mock_session.request.call_args[0]
+        assert args[0] == "system prompt"
+        assert "test text" in args[1]
+
+    @pytest.mark.unit
+    def test_prewarm(self, mock_env_vars, mock_prompts_file):
+        """現在の演者の音声でセッションが事前準備されることを確認"""
+        with patch("models.voice_generator.ROOT_DIR", str(mock_prompts_file.parent.parent)):
+            vg = VoiceGenerator(reuse_sessions=True)
+            no_reuse = VoiceGenerator()
+        vg.set_actor("テスト演者1")
+        vg.session_manager = Mock()
+
+        vg.prewarm("system prompt")
+
+        vg.session_manager.prewarm.assert_called_once_with("テスト演者1", "ballad", "system prompt")
+        no_reuse.set_actor("テスト演者1")
+        assert no_reuse.prewarm("system prompt") is None
+
+    @pytest.mark.unit
+    def test_save_voice_same_second_is_unique(self, voice_generator, temp_dir):
+        """同じ秒に保存しても上書きされないことを確認"""
+        paths = []
+        with patch("models.voice_generator.ROOT_DIR", str(temp_dir)):
+            for i in range(3):
+                temp_file = temp_dir / f"temp{i}.wav"
+                temp_file.write_bytes(f"take {i}".encode())
+                paths.append(voice_generator.save_voice("テスト演者", temp_file=str(temp_file)))
+
+        assert len(set(paths)) == 3
+        # ファイル名順が保存順と一致することを確認
+        assert sorted(paths) == paths
+        assert [open(p, "rb").read() for p in paths] == [b"take 0", b"take 1", b"take 2"]
+
+    @pytest.mark.unit
+    def test_save_voice_registers_take(self, voice_generator, temp_dir):
+        """保存したテイクがプロンプト・セリフと一緒にインデックスへ登録されることを確認"""
+        import soundfile as sf
+        from utils.audio.take_index import TakeIndex
+
+        temp_file = temp_dir / "temp.wav"
+        sf.write(temp_file, np.full(12000, 8000, dtype=np.int16), 24000, subtype="PCM_16")
+        voice_generator._remember_take(str(temp_file), "システム", "元気に", "こんにちは")
+
+        with patch("models.voice_generator.ROOT_DIR", str(temp_dir)):
+            result = voice_generator.save_voice("テスト演者", str(temp_file))
+
+        takes = TakeIndex.for_root(str(temp_dir)).find(actor="テスト演者")
+        assert len(takes) == 1
+        assert takes[0]["path"] == result
+        assert takes[0]["date"] == os.path.basename(result).split("_")[1]
+        assert takes[0]["duration"] == pytest.approx(0.5)
+        assert (takes[0]["system_prompt"], takes[0]["acting_prompt"], takes[0]["text"]) == ("システム", "元気に", "こんにちは")
+        assert voice_generator.take_info == {}
+
+    @pytest.mark.unit
+    @patch("models.voice_generator.StreamingWavWriter")
+    def test_on_message_feeds_stream_player(self, mock_writer_class, voice_generator, temp_dir):
+        """ストリーミング再生時に受信データがプレイヤーへ渡されることを確認"""
+        voice_generator._get_temp_dir = lambda: str(temp_dir)
+        mock_ws = Mock()
+        voice_generator.stream_player = Mock()
+
+        voice_generator._on_message(mock_ws, json.dumps({
+            "type": "response.audio.delta",
+            "delta": "dGVzdCBhdWRpbyBkYXRh",
+        }))
+        voice_generator._on_message(mock_ws, json.dumps({"type": "response.audio.done"}))
+
+        voice_generator.stream_player.feed.assert_called_once_with(b"test audio data")
+        voice_generator.stream_player.finish.assert_called_once()
+        # 受信完了後もファイルは保存される
+        mock_writer_class.return_value.write.assert_called_once_with(b"test audio data")
+        mock_writer_class.return_value.close.assert_called_once()
+
+    @pytest.mark.unit
+    def test_generate_voice_uses_cache(self, mock_env_vars, mock_prompts_file, temp_dir):
+        """同じ内容の2回目の生成はキャッシュから返し、force_freshで生成し直すことを確認"""
+        with patch("models.voice_generator.ROOT_DIR", str(temp_dir)):
+            vg = VoiceGenerator(reuse_sessions=True, use_cache=True)
+        vg.performer_configs = {"テスト演者1": {"voice": "ballad", "speed": 1.0}}
+        vg._get_temp_dir = lambda: str(temp_dir)
+        vg.set_actor("テスト演者1")
+
+        def fake_request(system_prompt, text, on_message, **kwargs):
+            on_message(None, json.dumps({"type": "response.audio.delta", "delta": "AQACAA=="}))
+            on_message(None, json.dumps({"type": "response.audio.done"}))
+
+        vg.session_manager = Mock()
+        vg.session_manager.get_session.return_value.request.side_effect = fake_request
+
+        first = vg.generate_voice("system", "acting", "text")
+        second = vg.generate_voice("system", "acting", "text")
+
+        assert vg.session_manager.get_session.return_value.request.call_count == 1
+        assert (vg.cache.hits, vg.cache.misses) == (1, 1)
+        # キャッシュからは別の一時ファイルとして返され、前回の一時ファイルは削除される
+        assert second != first
+        assert not os.path.exists(first)
+        assert open(second, "rb").read()[-4:] == b"\x01\x00\x02\x00"
+
+        # 内容が変わる場合や新しいテイクを指定した場合は生成する
+        vg.generate_voice("system", "acting", "other text")
+        vg.generate_voice("system", "acting", "text", force_fresh=True)
+        assert vg.session_manager.get_session.return_value.request.call_count == 3
+        assert (vg.cache.hits, vg.cache.misses) == (1, 2)
+
+    @pytest.mark.unit
+    def test_save_voice_encodes_in_background(self, voice_generator, temp_dir):
+        """保存形式がflacの演者は保存したWAVのパスを返し、バックグラウンドで変換してインデックスも更新されることを確認"""
+        import soundfile as sf
+        from utils.audio.take_index import TakeIndex
+
+        temp_file = temp_dir / "temp.wav"
+        sf.write(temp_file, np.full(12000, 8000, dtype=np.int16), 24000, subtype="PCM_16")
+        voice_generator.performer_configs["テスト演者"] = {"voice": "alloy", "format": "flac"}
+
+        with patch("models.voice_generator.ROOT_DIR", str(temp_dir)):
+            result = voice_generator.save_voice("テスト演者", str(temp_file))
+            voice_generator.close()
+
+        encoded = os.path.splitext(result)[0] + ".flac"
+        assert result.endswith(".wav")
+        assert not os.path.exists(result)
+        assert sf.info(encoded).format == "FLAC"
+        assert [t["path"] for t in TakeIndex.for_root(str(temp_dir)).find(actor="テスト演者")] == [encoded]
+
+    @pytest.mark.unit
+    def test_get_output_format(self, voice_generator):
+        """演者の保存形式の既定値と、対応していない形式の扱いを確認"""
+        voice_generator.performer_configs = {"A": {"format": "OPUS"}, "B": {"format": "mp3"}, "C": {}}
+
+        assert voice_generator.get_output_format("A") == "opus"
+        assert voice_generator.get_output_format("B") == "wav"
+        assert voice_generator.get_output_format("C") == "wav"
+        assert voice_generator.get_output_format("存在しない演者") == "wav"
+
+    @pytest.mark.unit
+    def test_take_buffer_spills_to_file(self, temp_dir):
+        """上限を超えるまではメモリに保持し、超えた場合は一時ファイルへ書き出すことを確認"""
+        import soundfile as sf
+
+        small = TakeBuffer(str(temp_dir / "small.wav"), spill_bytes=8)
+        small.write(b"\x01\x00\x02\x00")
+        assert small.close() == str(temp_dir / "small.wav")
+        np.testing.assert_array_equal(small.samples, [1, 2])
+        assert not small.spilled
+        assert not (temp_dir / "small.wav").exists()
+
+        large = TakeBuffer(str(temp_dir / "large.wav"), spill_bytes=4)
+        large.write(b"\x01\x00\x02\x00")
+        large.write(b"\x03\x00\x04\x00")
+        large.write(b"\x05\x00")
+        large.close()
+        assert large.spilled
+        assert large.samples is None
+        assert large.bytes_written == 10
+        np.testing.assert_array_equal(sf.read(temp_dir / "large.wav", dtype="int16")[0], [1, 2, 3, 4, 5])
+
+    @pytest.mark.unit
+    @patch("models.voice_generator.sd.play")
+    @patch("models.voice_generator.sd.wait")
+    def test_memory_takes_play_and_save(self, mock_wait, mock_play, mock_env_vars, mock_prompts_file, temp_dir):
+        """memory_takesが有効な場合、保存するまでファイルを作らずにメモリから再生することを確認"""
+        import soundfile as sf
+
+        with patch("models.voice_generator.ROOT_DIR", str(mock_prompts_file.parent.parent)):
+            vg = VoiceGenerator(reuse_sessions=True, memory_takes=True)
+        vg._get_temp_dir = lambda: str(temp_dir / "temp")
+        vg._get_output_dir = lambda: str(temp_dir / "output")
+        vg.set_actor("テスト演者1")
+        vg.trim_silence = False
+        pcm = (np.arange(240, dtype=np.int16) * 100).tobytes()
+
+        def fake_request(system_prompt, text, on_message, **kwargs):
+            on_message(None, json.dumps({"type": "response.audio.delta", "delta": base64.b64encode(pcm).decode()}))
+            on_message(None, json.dumps({"type": "response.audio.done"}))
+
+        vg.session_manager = Mock()
+        vg.session_manager.get_session.return_value.request.side_effect = fake_request
+        with patch("models.voice_generator.create_stretcher", return_value=None):
+            first = vg.generate_voice("system", "acting", "text")
+            take = vg.generate_voice("system", "acting", "text")
+
+        # 一時ファイルは名前の予約だけで、音声は書き込まない
+        assert os.path.getsize(take) == 0
+        # 前回の未保存のテイクはメモリと一時ファイルから破棄される
+        assert first not in vg.takes_in_memory
+        assert not os.path.exists(first)
+        np.testing.assert_array_equal(vg.take_samples(), np.frombuffer(pcm, dtype=np.int16))
+
+        with patch("models.voice_generator.sf.read") as mock_read:
+            vg.play_audio()
+        mock_read.assert_not_called()
+        assert mock_play.call_args[0][1] == 24000
+        np.testing.assert_array_equal(mock_play.call_args[0][0], np.frombuffer(pcm, dtype=np.int16))
+
+        saved = vg.save_voice("テスト演者1")
+        assert vg.takes_in_memory == {}
+        assert not os.path.exists(take)
+        assert vg.temp_file is None
+        data, samplerate = sf.read(saved, dtype="int16")
+        assert (samplerate, sf.info(saved).subtype) == (24000, "PCM_16")
+        np.testing.assert_array_equal(data, np.frombuffer(pcm, dtype=np.int16))
+
+    @pytest.mark.unit
+    def test_memory_takes_cache(self, mock_env_vars, mock_prompts_file, temp_dir):
+        """メモリに保持したテイクもキャッシュに登録され、キャッシュからはメモリに読み込むことを確認"""
+        with patch("models.voice_generator.ROOT_DIR", str(temp_dir)):
+            vg = VoiceGenerator(reuse_sessions=True, use_cache=True, memory_takes=True)
+        vg.performer_configs = {"テスト演者1": {"voice": "ballad", "speed": 1.0}}
+        vg._get_temp_dir = lambda: str(temp_dir)
+        vg.set_actor("テスト演者1")
+
+        def fake_request(system_prompt, text, on_message, **kwargs):
+            on_message(None, json.dumps({"type": "response.audio.delta", "delta": "AQACAA=="}))
+            on_message(None, json.dumps({"type": "response.audio.done"}))
+
+        vg.session_manager = Mock()
+        vg.session_manager.get_session.return_value.request.side_effect = fake_request
+
+        first = vg.generate_voice("system", "acting", "text")
+        second = vg.generate_voice("system", "acting", "text")
+
+        assert vg.cache.hits == 1
+        assert second != first
+        assert list(vg.takes_in_memory) == [second]
+        np.testing.assert_array_equal(vg.take_samples(second), [1, 2])
+        assert os.path.getsize(second) == 0
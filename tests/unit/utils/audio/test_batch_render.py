@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+台本一括生成のユニットテスト
+"""
+
+import asyncio
+import csv
+import pytest
+from unittest.mock import patch
+
+from utils.audio.batch_render import load_script, render_script
+
+
+class FakeAsyncVoiceGenerator:
+    """AsyncVoiceGeneratorのモック"""
+
+    def __init__(self, max_concurrency=4, use_cache=False):
+        self.max_concurrency = max_concurrency
+        self.performer_configs = {"演者A": {"system_prompt": "プロンプトA", "voice": "sage"}}
+        self.calls = []
+        self.saved = []
+        self.active = 0
+        self.max_active = 0
+
+    async def generate_voice(self, system_prompt, acting_prompt, text, progress_callback=None, actor=None, force_fresh=False, timeout=None):
+        self.calls.append((system_prompt, acting_prompt, text, actor))
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        # 後の行ほど早く終わるようにして、保存順が台本順になることを確認する
+        await asyncio.sleep(0.01 * (5 - len(self.calls)))
+        self.active -= 1
+        if text == "失敗":
+            raise Exception("生成エラー")
+        return f"/tmp/{text}.wav"
+
+    def save_voice(self, actor, temp_file=None):
+        self.saved.append(temp_file)
+        return f"/saved/{actor}/{len(self.saved)}.wav"
+
+    def close(self):
+        pass
+
+
+class TestBatchRender:
+    """台本一括生成のテスト"""
+
+    @pytest.mark.unit
+    def test_load_script_csv_with_header(self, temp_dir):
+        """ヘッダー付きCSVの読み込みテスト"""
+        script = temp_dir / "script.csv"
+        script.write_text("actor,acting_prompt,text\n演者A,元気に,こんにちは\n演者B,,さようなら\n", encoding="utf-8")
+
+        rows = load_script(str(script))
+
+        assert rows == [(2, "演者A", "元気に", "こんにちは"), (3, "演者B", "", "さようなら")]
+
+    @pytest.mark.unit
+    def test_load_script_tsv_and_txt(self, temp_dir):
+        """TSV / TXT（2列、コメント、空行）の読み込みテスト"""
+        for name in ("script.tsv", "script.txt"):
+            script = temp_dir / name
+            script.write_text("# コメント\n演者A\tこんにちは\n\n演者B\t静かに\tさようなら\n", encoding="utf-8")
+
+            rows = load_script(str(script))
+
+            assert rows == [(2, "演者A", "", "こんにちは"), (4, "演者B", "静かに", "さようなら")]
+
+    @pytest.mark.unit
+    def test_load_script_invalid(self, temp_dir):
+        """不正な台本のテスト"""
+        script = temp_dir / "script.csv"
+        script.write_text("演者Aのみ\n", encoding="utf-8")
+        with pytest.raises(ValueError, match="1行目"):
+            load_script(str(script))
+
+        with pytest.raises(ValueError, match="対応していない"):
+            load_script(str(temp_dir / "script.json"))
+
+    @pytest.mark.unit
+    def test_render_script(self, temp_dir):
+        """並列生成・台本順の保存・マニフェスト出力のテスト"""
+        script = temp_dir / "script.csv"
+        script.write_text("演者A,,一\n演者A,,二\n演者B,,失敗\n演者A,,四\n", encoding="utf-8")
+        generator = FakeAsyncVoiceGenerator()
+
+        with patch("models.async_voice_generator.AsyncVoiceGenerator", return_value=generator):
+            summary = render_script(str(script), jobs=2)
+
+        assert summary["ok"] == 3
+        assert summary["error"] == 1
+        assert generator.max_active == 2
+        # 台本順に保存されることを確認
+        assert generator.saved == ["/tmp/一.wav", "/tmp/二.wav", "/tmp/四.wav"]
+        # 演者のシステムプロンプトが使用されることを確認
+        assert generator.calls[0] == ("プロンプトA", "", "一", "演者A")
+        assert generator.calls[2][0] == ""
+
+        with open(summary["manifest"], "r", encoding="utf-8") as f:
+            manifest = list(csv.DictReader(f))
+        assert [row["status"] for row in manifest] == ["ok", "ok", "error", "ok"]
+        assert manifest[2]["error"] == "生成エラー"
+        assert manifest[0]["file"] == "/saved/演者A/1.wav"
+        assert float(manifest[0]["elapsed_sec"]) >= 0
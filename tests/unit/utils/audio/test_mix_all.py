@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+複数の演者・日付の一括結合のユニットテスト
+"""
+
+import pytest
+import numpy as np
+import soundfile as sf
+from unittest.mock import patch
+
+from utils.audio.mix_all import find_mix_groups, format_summary, mix_all, mix_groups
+
+
+class TestMixAll:
+    """一括結合のテスト"""
+
+    @pytest.fixture
+    def root(self, temp_dir):
+        with patch("utils.audio.mix_audio.ROOT_DIR", str(temp_dir)):
+            yield temp_dir
+
+    def write_take(self, root, performer, date, index, samples=2400):
+        performer_dir = root / performer
+        performer_dir.mkdir(exist_ok=True)
+        path = performer_dir / f"{performer}_{date}_{index:03d}.wav"
+        sf.write(path, np.full(samples, 1000, dtype=np.int16), 24000, subtype="PCM_16")
+        return path
+
+    @pytest.mark.unit
+    def test_find_mix_groups_filters(self, root):
+        """演者と日付の範囲で絞り込めることを確認"""
+        self.write_take(root, "演者A", "0101", 0)
+        self.write_take(root, "演者A", "0101", 1)
+        self.write_take(root, "演者A", "0315", 0)
+        self.write_take(root, "演者B", "0201", 0)
+        (root / "演者B" / "memo.txt").write_text("x")
+
+        assert find_mix_groups() == [("演者A", "0101"), ("演者A", "0315"), ("演者B", "0201")]
+        assert find_mix_groups(["演者B"]) == [("演者B", "0201")]
+        assert find_mix_groups(date_from="0201", date_to="0301") == [("演者B", "0201")]
+        assert find_mix_groups(["演者A", "存在しない演者"], date_from="0201") == [("演者A", "0315")]
+
+    @pytest.mark.unit
+    def test_find_mix_groups_uses_index(self, root):
+        """インデックスがある場合はフォルダを走査せず、scanを指定した場合は登録されていないテイクも含めることを確認"""
+        from utils.audio.take_index import TakeIndex
+
+        indexed = self.write_take(root, "演者A", "0101", 0)
+        TakeIndex.for_root(str(root)).add(str(indexed), "演者A", date="0101")
+        self.write_take(root, "演者A", "0102", 0)
+
+        with patch("utils.audio.mix_all.scan_takes") as mock_scan:
+            assert find_mix_groups() == [("演者A", "0101")]
+        mock_scan.assert_not_called()
+        assert find_mix_groups(scan=True) == [("演者A", "0101"), ("演者A", "0102")]
+
+    @pytest.mark.unit
+    def test_find_mix_groups_wraps_year(self, root):
+        """開始日が終了日より後の場合は年をまたぐ範囲になることを確認"""
+        for date in ("1230", "0102", "0601"):
+            self.write_take(root, "演者A", date, 0)
+
+        assert find_mix_groups(date_from="1201", date_to="0131") == [("演者A", "0102"), ("演者A", "1230")]
+
+    @pytest.mark.unit
+    def test_mix_groups_inline(self, root):
+        """並列数1では同じプロセスで順に結合し、長さと出力を返すことを確認"""
+        self.write_take(root, "演者A", "0101", 0)
+        self.write_take(root, "演者A", "0101", 1)
+        self.write_take(root, "演者B", "0101", 0)
+
+        results = mix_groups([("演者A", "0101"), ("演者B", "0101")], jobs=1)
+
+        assert [(r["performer"], r["date"]) for r in results] == [("演者A", "0101"), ("演者B", "0101")]
+        assert results[0]["output"].endswith("演者A_0101-mixed.wav")
+        # 2テイク（0.1秒ずつ）と間の無音（0.5秒）
+        assert results[0]["duration_sec"] == pytest.approx(0.7)
+        assert results[1]["duration_sec"] == pytest.approx(0.1)
+        assert all(r["elapsed_sec"] >= 0 for r in results)
+
+    @pytest.mark.unit
+    def test_mix_groups_failure_is_reported(self, root):
+        """失敗した組み合わせも結果に含まれることを確認"""
+        self.write_take(root, "演者A", "0101", 0)
+
+        with patch("utils.audio.mix_audio.process_audio", side_effect=[None, RuntimeError("boom")]):
+            results = mix_groups([("演者A", "0101"), ("演者A", "0102")], jobs=1)
+
+        assert [r["output"] for r in results] == [None, None]
+
+    @pytest.mark.unit
+    def test_mix_all_process_pool(self, root):
+        """プロセスプールで結合した結果が元の順序で返ることを確認"""
+        for performer in ("演者A", "演者B", "演者C"):
+            self.write_take(root, performer, "0101", 0)
+
+        results, elapsed = mix_all(jobs=2)
+
+        assert [r["performer"] for r in results] == ["演者A", "演者B", "演者C"]
+        for result in results:
+            assert (root / "output" / result["performer"] / "0101-mixed").is_dir()
+            assert result["duration_sec"] == pytest.approx(0.1)
+        assert elapsed >= 0
+
+    @pytest.mark.unit
+    def test_format_summary(self):
+        """一覧表に出力・長さ・処理時間と集計が含まれることを確認"""
+        results = [
+            {"performer": "演者A", "date": "0101", "output": "/out/a.wav", "duration_sec": 12.34, "elapsed_sec": 0.5},
+            {"performer": "演者B", "date": "0102", "output": None, "duration_sec": None, "elapsed_sec": None},
+        ]
+
+        lines = format_summary(results, elapsed_sec=1.25).splitlines()
+
+        assert lines[0].split() == ["演者", "日付", "長さ", "処理時間", "出力"]
+        assert lines[1].split() == ["演者A", "0101", "12.3秒", "0.5秒", "/out/a.wav"]
+        assert lines[2].split() == ["演者B", "0102", "-", "-", "失敗"]
+        assert lines[-1] == "成功: 1, 失敗: 1, 所要時間: 1.2秒"
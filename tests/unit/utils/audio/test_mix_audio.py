@@ -7,9 +7,14 @@
 import pytest
 import numpy as np
 import xml.etree.ElementTree as ET
-from unittest.mock import patch
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
 
-from utils.audio.mix_audio import generate_premiere_xml, process_audio
+from utils.audio.mix_audio import generate_premiere_xml, join_with_gaps, process_audio
+
+
+# モックしたファイルのフォーマット情報
+PCM16_INFO = SimpleNamespace(subtype="PCM_16", format="WAV", samplerate=44100, channels=1)
 
 
 class TestMixAudio:
@@ -97,6 +102,7 @@ class TestMixAudio:
                 output_xml.chmod(0o755)
 
     @pytest.mark.unit
+    @patch("utils.audio.mix_audio.sf.info", new=Mock(return_value=PCM16_INFO))
     @patch("utils.audio.mix_audio.glob.glob")
     @patch("utils.audio.mix_audio.sf.read")
     @patch("utils.audio.mix_audio.sf.write")
@@ -125,7 +131,7 @@ class TestMixAudio:
         with patch("utils.audio.mix_audio.ROOT_DIR", str(temp_dir)), \
              patch("utils.audio.mix_audio.os.path.exists", return_value=True):
             
-            result = process_audio(performer, date)
+            result = process_audio(performer, date, streaming=False)
             
             # 結果を確認
             assert result is not None
@@ -163,6 +169,7 @@ class TestMixAudio:
             assert result is None
 
     @pytest.mark.unit
+    @patch("utils.audio.mix_audio.sf.info", new=Mock(return_value=PCM16_INFO))
     @patch("utils.audio.mix_audio.datetime")
     @patch("utils.audio.mix_audio.glob.glob")
     @patch("utils.audio.mix_audio.sf.read")
@@ -182,13 +189,14 @@ class TestMixAudio:
              patch("utils.audio.mix_audio.generate_premiere_xml", return_value="/path/test.xml"):
             
             # 日付を指定しない場合
-            result = process_audio(performer)
+            result = process_audio(performer, streaming=False)
             
             # 現在日付が使用されることを確認
             mock_datetime.now.return_value.strftime.assert_called_with("%m%d")
             assert result is not None
 
     @pytest.mark.unit
+    @patch("utils.audio.mix_audio.sf.info", new=Mock(return_value=PCM16_INFO))
     @patch("utils.audio.mix_audio.sf.read")
     @patch("utils.audio.mix_audio.sf.write")
     @patch("utils.audio.mix_audio.glob.glob")
@@ -209,7 +217,7 @@ class TestMixAudio:
              patch("utils.audio.mix_audio.os.path.exists", return_value=True), \
              patch("utils.audio.mix_audio.generate_premiere_xml", return_value="/path/test.xml"):
             
-            result = process_audio(performer, date)
+            result = process_audio(performer, date, streaming=False)
             
             # 結果を確認
             assert result is not None
@@ -236,12 +244,13 @@ class TestMixAudio:
              patch("utils.audio.mix_audio.os.path.exists", return_value=True), \
              patch("utils.audio.mix_audio.glob.glob", return_value=["/path/test.wav"]):
             
-            result = process_audio("テスト演者", "0615")
+            result = process_audio("テスト演者", "0615", streaming=False)
             
             # エラーの場合はNoneが返されることを確認
             assert result is None
 
     @pytest.mark.unit
+    @patch("utils.audio.mix_audio.sf.info", new=Mock(return_value=PCM16_INFO))
     @patch("utils.audio.mix_audio.sf.read")
     @patch("utils.audio.mix_audio.sf.write")
     @patch("utils.audio.mix_audio.glob.glob")
@@ -262,7 +271,7 @@ class TestMixAudio:
              patch("utils.audio.mix_audio.os.path.exists", return_value=True), \
              patch("utils.audio.mix_audio.generate_premiere_xml", return_value="/path/test.xml"):
             
-            result = process_audio(performer, date)
+            result = process_audio(performer, date, streaming=False)
             
             assert result is not None
             
@@ -301,4 +310,315 @@ class TestMixAudio:
                 result = process_audio(performer, date)
                 
                 # ディレクトリ作成が呼ばれることを確認
-                mock_makedirs.assert_called()
\ No newline at end of file
+                mock_makedirs.assert_called()
+
+    @pytest.mark.unit
+    def test_process_audio_trim(self, temp_dir):
+        """trim=Trueの場合、各ファイルの前後の無音を除去して結合することを確認"""
+        import soundfile as sf
+
+        performer = "テスト演者"
+        date = "0615"
+        sample_rate = 24000
+        performer_dir = temp_dir / performer
+        performer_dir.mkdir()
+        voice = (8000 * np.sin(np.arange(sample_rate // 2) * 0.05)).astype(np.int16)
+        silence = np.zeros(sample_rate, dtype=np.int16)
+        for i in range(2):
+            sf.write(performer_dir / f"{performer}_{date}_00{i}.wav", np.concatenate((silence, voice, silence)), sample_rate)
+
+        with patch("utils.audio.mix_audio.ROOT_DIR", str(temp_dir)):
+            result = process_audio(performer, date, trim=True, padding_ms=0)
+
+        mixed, _ = sf.read(result, dtype="int16")
+        gap = int(0.5 * sample_rate)
+        assert len(mixed) == pytest.approx(len(voice) * 2 + gap, abs=sample_rate * 0.02)
+
+    @pytest.mark.unit
+    def test_join_with_gaps(self):
+        """無音を挟んで1回で結合されることを確認"""
+        takes = [np.full(3, i + 1, dtype=np.int16) for i in range(3)]
+
+        combined = join_with_gaps(takes, 2)
+
+        assert combined.dtype == np.int16
+        assert combined.tolist() == [1, 1, 1, 0, 0, 2, 2, 2, 0, 0, 3, 3, 3]
+        assert join_with_gaps([], 2) is None
+
+    @pytest.mark.unit
+    def test_join_with_gaps_stereo(self):
+        """多チャンネルでも無音の形状が揃うことを確認"""
+        takes = [np.ones((4, 2)), np.ones((5, 2))]
+
+        combined = join_with_gaps(takes, 3)
+
+        assert combined.shape == (12, 2)
+        assert not combined[4:7].any()
+
+    @pytest.mark.unit
+    def test_streaming_matches_in_memory(self, temp_dir):
+        """ストリーミング結合の結果がメモリ上での結合と一致することを確認"""
+        import soundfile as sf
+
+        performer = "テスト演者"
+        date = "0615"
+        performer_dir = temp_dir / performer
+        performer_dir.mkdir()
+        rng = np.random.default_rng(0)
+        for i in range(3):
+            take = rng.integers(-8000, 8000, 24000 + i * 1000).astype(np.int16)
+            sf.write(performer_dir / f"{performer}_{date}_00{i}.wav", take, 24000)
+
+        with patch("utils.audio.mix_audio.ROOT_DIR", str(temp_dir)), \
+             patch("utils.audio.mix_audio.BLOCK_FRAMES", 4096):
+            streamed, _ = sf.read(process_audio(performer, date), dtype="int16")
+            in_memory, _ = sf.read(process_audio(performer, date, streaming=False), dtype="int16")
+
+        assert len(streamed) == 24000 * 3 + 3000 + 2 * 12000
+        np.testing.assert_array_equal(streamed, in_memory)
+
+    @pytest.mark.unit
+    def test_streaming_memory_is_constant(self, temp_dir):
+        """ストリーミング結合の使用メモリが結合する長さによらず小さいことを確認"""
+        import tracemalloc
+        import soundfile as sf
+
+        performer = "テスト演者"
+        date = "0615"
+        performer_dir = temp_dir / performer
+        performer_dir.mkdir()
+        take = (8000 * np.sin(np.arange(24000 * 5) * 0.05)).astype(np.int16)
+        for i in range(40):
+            sf.write(performer_dir / f"{performer}_{date}_{i:03d}.wav", take, 24000)
+
+        with patch("utils.audio.mix_audio.ROOT_DIR", str(temp_dir)):
+            tracemalloc.start()
+            try:
+                result = process_audio(performer, date)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+        # メモリ上で結合すると約40MB（float64で200秒分）になる
+        assert result is not None
+        assert peak < 4 * 1024 * 1024
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("streaming", [True, False])
+    def test_process_audio_is_bit_exact_pcm16(self, temp_dir, streaming):
+        """PCM16のまま読み書きし、結合結果が入力と一致することを確認"""
+        import soundfile as sf
+
+        performer = "テスト演者"
+        date = "0615"
+        performer_dir = temp_dir / performer
+        performer_dir.mkdir()
+        rng = np.random.default_rng(1)
+        takes = [rng.integers(-32768, 32767, 5000 + i, dtype=np.int16) for i in range(3)]
+        for i, take in enumerate(takes):
+            sf.write(performer_dir / f"{performer}_{date}_00{i}.wav", take, 24000, subtype="PCM_16")
+
+        with patch("utils.audio.mix_audio.ROOT_DIR", str(temp_dir)), \
+             patch("utils.audio.mix_audio.sf.blocks", wraps=sf.blocks) as mock_blocks, \
+             patch("utils.audio.mix_audio.sf.read", wraps=sf.read) as mock_read:
+            result = process_audio(performer, date, streaming=streaming)
+
+        reads = mock_blocks.call_args_list if streaming else mock_read.call_args_list
+        assert reads and all(call.kwargs["dtype"] == "int16" for call in reads)
+        assert sf.info(result).subtype == "PCM_16"
+        mixed, _ = sf.read(result, dtype="int16")
+        gap = np.zeros(12000, dtype=np.int16)
+        np.testing.assert_array_equal(mixed, np.concatenate([takes[0], gap, takes[1], gap, takes[2]]))
+
+    @pytest.mark.unit
+    def test_process_audio_keeps_float_subtype(self, temp_dir):
+        """float32のファイルはfloat32のまま結合されることを確認"""
+        import soundfile as sf
+
+        performer = "テスト演者"
+        date = "0615"
+        performer_dir = temp_dir / performer
+        performer_dir.mkdir()
+        take = np.linspace(-0.5, 0.5, 1000, dtype=np.float32)
+        for i in range(2):
+            sf.write(performer_dir / f"{performer}_{date}_00{i}.wav", take, 24000, subtype="FLOAT")
+
+        with patch("utils.audio.mix_audio.ROOT_DIR", str(temp_dir)):
+            result = process_audio(performer, date)
+
+        assert sf.info(result).subtype == "FLOAT"
+        mixed, _ = sf.read(result, dtype="float32")
+        np.testing.assert_array_equal(mixed[:1000], take)
+
+
+class TestIncrementalMix:
+    """追記による結合の更新のテスト"""
+
+    performer = "テスト演者"
+    date = "0615"
+
+    @pytest.fixture
+    def performer_dir(self, temp_dir):
+        path = temp_dir / self.performer
+        path.mkdir()
+        with patch("utils.audio.mix_audio.ROOT_DIR", str(temp_dir)):
+            yield path
+
+    def write_take(self, performer_dir, index, value):
+        import soundfile as sf
+
+        path = performer_dir / f"{self.performer}_{self.date}_{index:03d}.wav"
+        sf.write(path, np.full(1000 + index, value, dtype=np.int16), 24000, subtype="PCM_16")
+        return path
+
+    def read_mix(self, path):
+        import soundfile as sf
+
+        return sf.read(path, dtype="int16")[0]
+
+    @pytest.mark.unit
+    def test_appends_only_new_takes(self, performer_dir):
+        """追加されたテイクだけを読み込んで追記することを確認"""
+        import soundfile as sf
+
+        self.write_take(performer_dir, 0, 100)
+        self.write_take(performer_dir, 1, 200)
+        first = process_audio(self.performer, self.date)
+        new_take = self.write_take(performer_dir, 2, 300)
+
+        with patch("utils.audio.mix_audio.sf.blocks", wraps=sf.blocks) as mock_blocks:
+            result = process_audio(self.performer, self.date)
+
+        assert result == first
+        assert [call.args[0] for call in mock_blocks.call_args_list] == [str(new_take)]
+        gap = np.zeros(12000, dtype=np.int16)
+        expected = np.concatenate([
+            np.full(1000, 100, dtype=np.int16), gap,
+            np.full(1001, 200, dtype=np.int16), gap,
+            np.full(1002, 300, dtype=np.int16),
+        ])
+        np.testing.assert_array_equal(self.read_mix(result), expected)
+        # ヘッダーのフレーム数も更新されていることを確認
+        assert sf.info(result).frames == len(expected)
+
+    @pytest.mark.unit
+    def test_unchanged_does_not_rewrite(self, performer_dir):
+        """変更がない場合は結合ファイルを書き直さないことを確認"""
+        self.write_take(performer_dir, 0, 100)
+        result = process_audio(self.performer, self.date)
+
+        with patch("utils.audio.mix_audio.write_streaming") as mock_write:
+            assert process_audio(self.performer, self.date) == result
+
+        mock_write.assert_not_called()
+
+    @pytest.mark.unit
+    def test_changed_earlier_take_rebuilds(self, performer_dir):
+        """以前のテイクが変更された場合は作り直すことを確認"""
+        self.write_take(performer_dir, 0, 100)
+        self.write_take(performer_dir, 1, 200)
+        process_audio(self.performer, self.date)
+
+        take = performer_dir / f"{self.performer}_{self.date}_000.wav"
+        take.unlink()
+        self.write_take(performer_dir, 2, 300)
+        result = process_audio(self.performer, self.date)
+
+        mixed = self.read_mix(result)
+        assert len(mixed) == 1001 + 12000 + 1002
+        assert mixed[0] == 200
+
+    @pytest.mark.unit
+    def test_modified_mix_or_settings_rebuilds(self, performer_dir):
+        """結合ファイルが変更された場合や設定が変わった場合は作り直すことを確認"""
+        self.write_take(performer_dir, 0, 100)
+        result = process_audio(self.performer, self.date)
+
+        with open(result, "ab") as f:
+            f.write(b"\0\0")
+        with patch("utils.audio.mix_audio.write_streaming") as mock_write:
+            process_audio(self.performer, self.date)
+        assert mock_write.call_args.kwargs.get("append") is None
+
+        with patch("utils.audio.mix_audio.write_streaming") as mock_write:
+            process_audio(self.performer, self.date, trim=True)
+        assert mock_write.call_args.kwargs.get("append") is None
+
+    @pytest.mark.unit
+    def test_uses_take_index(self, performer_dir, temp_dir):
+        """テイクのインデックスがある場合はディレクトリを検索せずに登録されたテイクを結合することを確認"""
+        from utils.audio.take_index import TakeIndex
+
+        first = self.write_take(performer_dir, 0, 100)
+        TakeIndex.for_root(str(temp_dir)).add(str(first), self.performer, date=self.date)
+        # インデックスに登録されていないテイク
+        self.write_take(performer_dir, 1, 200)
+
+        with patch("utils.audio.mix_audio.glob.glob") as mock_glob:
+            result = process_audio(self.performer, self.date)
+
+        mock_glob.assert_not_called()
+        np.testing.assert_array_equal(self.read_mix(result), np.full(1000, 100, dtype=np.int16))
+
+    @pytest.mark.unit
+    def test_scan_includes_unindexed_takes(self, performer_dir, temp_dir):
+        """scanを指定すると、インデックスに登録されたテイクと登録されていないテイクの両方を保存順に結合することを確認"""
+        from utils.audio.take_index import TakeIndex
+
+        first = self.write_take(performer_dir, 0, 100)
+        index = TakeIndex.for_root(str(temp_dir))
+        index.add(str(first), self.performer, date=self.date)
+        # インデックスへの登録に失敗したテイク
+        self.write_take(performer_dir, 1, 200)
+        # 演者ディレクトリの外に保存されたテイク
+        fallback_dir = temp_dir / "fallback"
+        fallback_dir.mkdir()
+        outside = self.write_take(fallback_dir, 2, 300)
+        index.add(str(outside), self.performer, date=self.date)
+
+        result = process_audio(self.performer, self.date, scan=True)
+
+        expected = np.concatenate([
+            np.full(1000, 100, dtype=np.int16),
+            np.full(1001, 200, dtype=np.int16),
+            np.full(1002, 300, dtype=np.int16),
+        ])
+        # テイク間の無音を除いて比較する
+        mixed = self.read_mix(result)
+        np.testing.assert_array_equal(mixed[mixed != 0], expected)
+
+    @pytest.mark.unit
+    def test_reads_compressed_takes(self, performer_dir):
+        """FLAC・Opusに変換したテイクも結合し、出力はWAVになることを確認"""
+        import soundfile as sf
+
+        first = self.write_take(performer_dir, 0, 100)
+        data, sr = sf.read(first, dtype="int16")
+        sf.write(first.with_suffix(".flac"), data, sr, format="FLAC", subtype="PCM_16")
+        first.unlink()
+        second = self.write_take(performer_dir, 1, 200)
+        data, sr = sf.read(second, dtype="int16")
+        sf.write(second.with_suffix(".opus"), data, sr, format="OGG", subtype="OPUS")
+        second.unlink()
+
+        for streaming in (True, False):
+            result = process_audio(self.performer, self.date, streaming=streaming)
+
+            info = sf.info(result)
+            assert (info.format, info.subtype) == ("WAV", "PCM_16")
+            assert info.frames == 1000 + 12000 + 1001
+            np.testing.assert_array_equal(self.read_mix(result)[:1000], np.full(1000, 100, dtype=np.int16))
+
+    @pytest.mark.unit
+    def test_take_being_encoded_is_mixed_once(self, performer_dir):
+        """変換中でWAVとFLACが両方あるテイクは1回だけ結合することを確認"""
+        import soundfile as sf
+
+        first = self.write_take(performer_dir, 0, 100)
+        data, sr = sf.read(first, dtype="int16")
+        sf.write(first.with_suffix(".flac"), data, sr, format="FLAC", subtype="PCM_16")
+        self.write_take(performer_dir, 1, 200)
+
+        result = process_audio(self.performer, self.date)
+
+        assert sf.info(result).frames == 1000 + 12000 + 1001
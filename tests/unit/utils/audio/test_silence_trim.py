@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+前後の無音除去のユニットテスト
+"""
+
+import numpy as np
+import pytest
+import soundfile as sf
+from unittest.mock import patch
+
+from utils.audio.silence_trim import find_voiced_range, find_voiced_range_in_file, trim_file, trim_silence
+
+SAMPLE_RATE = 24000
+
+
+def take(lead_sec=1.0, voice_sec=0.5, tail_sec=2.0, noise=0):
+    """前後に無音がある音声データを作成"""
+    rng = np.random.default_rng(0)
+    voice = (8000 * np.sin(2 * np.pi * 220 * np.arange(int(SAMPLE_RATE * voice_sec)) / SAMPLE_RATE))
+    samples = np.concatenate((
+        np.zeros(int(SAMPLE_RATE * lead_sec)),
+        voice,
+        np.zeros(int(SAMPLE_RATE * tail_sec)),
+    ))
+    if noise:
+        samples += rng.normal(0, noise, len(samples))
+    return samples.astype(np.int16)
+
+
+class TestSilenceTrim:
+    """無音除去のテスト"""
+
+    @pytest.mark.unit
+    def test_find_voiced_range_with_padding(self):
+        """声の範囲の前後に余白が付くことを確認"""
+        start, end = find_voiced_range(take(), SAMPLE_RATE, padding_ms=100)
+
+        assert start == pytest.approx(SAMPLE_RATE * 0.9, abs=SAMPLE_RATE * 0.01)
+        assert end == pytest.approx(SAMPLE_RATE * 1.6, abs=SAMPLE_RATE * 0.01)
+
+    @pytest.mark.unit
+    def test_threshold_ignores_low_noise(self):
+        """閾値以下の小さなノイズは無音として扱われることを確認"""
+        samples = take(noise=5)  # 約-76dBFS
+
+        start, end = find_voiced_range(samples, SAMPLE_RATE, threshold_db=-45, padding_ms=0)
+
+        assert start == pytest.approx(SAMPLE_RATE * 1.0, abs=SAMPLE_RATE * 0.01)
+        assert end == pytest.approx(SAMPLE_RATE * 1.5, abs=SAMPLE_RATE * 0.01)
+
+    @pytest.mark.unit
+    def test_trim_silence_is_a_view(self):
+        """切り出した結果が元のデータと一致することを確認"""
+        samples = take()
+
+        trimmed = trim_silence(samples, SAMPLE_RATE, padding_ms=0)
+
+        assert np.shares_memory(trimmed, samples)
+        assert len(trimmed) == pytest.approx(SAMPLE_RATE * 0.5, abs=SAMPLE_RATE * 0.01)
+
+    @pytest.mark.unit
+    def test_all_silent_is_unchanged(self):
+        """全体が無音の場合はそのまま返すことを確認"""
+        samples = np.zeros(SAMPLE_RATE, dtype=np.int16)
+
+        assert find_voiced_range(samples, SAMPLE_RATE) is None
+        assert trim_silence(samples, SAMPLE_RATE) is samples
+        assert find_voiced_range(samples[:0], SAMPLE_RATE) is None
+
+    @pytest.mark.unit
+    def test_stereo(self):
+        """多チャンネルの音声も処理できることを確認"""
+        mono = take()
+        stereo = np.stack((mono, np.zeros_like(mono)), axis=1)
+
+        assert find_voiced_range(stereo, SAMPLE_RATE) == find_voiced_range(mono, SAMPLE_RATE)
+
+    @pytest.mark.unit
+    def test_trim_file_is_bit_exact(self, temp_dir):
+        """PCM16のファイルを変換せずに切り出すことを確認"""
+        samples = take()
+        source = temp_dir / "take.wav"
+        output = temp_dir / "trimmed.wav"
+        sf.write(source, samples, SAMPLE_RATE, subtype="PCM_16")
+
+        removed = trim_file(str(source), str(output), padding_ms=100)
+
+        trimmed, sr = sf.read(output, dtype="int16")
+        start, end = find_voiced_range(samples, SAMPLE_RATE, padding_ms=100)
+        assert sr == SAMPLE_RATE
+        assert sf.info(output).subtype == "PCM_16"
+        assert removed == len(samples) - (end - start)
+        np.testing.assert_array_equal(trimmed, samples[start:end])
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("lead_sec, tail_sec", [(1.0, 2.0), (0.0, 0.0), (0.123, 0.457), (3.0, 0.0)])
+    def test_find_voiced_range_in_file_matches(self, temp_dir, lead_sec, tail_sec):
+        """ファイルからブロックごとに探した範囲が、全体を読み込んだ場合と一致することを確認"""
+        samples = take(lead_sec=lead_sec, tail_sec=tail_sec)
+        path = temp_dir / "take.wav"
+        sf.write(path, samples, SAMPLE_RATE, subtype="PCM_16")
+
+        # ブロックの境界をまたぐよう小さなブロックで読み込む
+        with patch("utils.audio.silence_trim.BLOCK_MS", 70):
+            start, end, length = find_voiced_range_in_file(str(path), padding_ms=100)
+
+        assert (start, end) == find_voiced_range(samples, SAMPLE_RATE, padding_ms=100)
+        assert length == len(samples)
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("lead_sec, voice_sec", [(0.05, 0.45), (0.3, 0.2), (0.0, 0.99)])
+    def test_find_voiced_range_in_file_voice_within_one_block(self, temp_dir, lead_sec, voice_sec):
+        """声全体が1つのブロックに収まる場合も、声の終わりまでを範囲とすることを確認"""
+        samples = take(lead_sec=lead_sec, voice_sec=voice_sec, tail_sec=2.5)
+        path = temp_dir / "take.wav"
+        sf.write(path, samples, SAMPLE_RATE, subtype="PCM_16")
+
+        start, end, length = find_voiced_range_in_file(str(path), padding_ms=100)
+
+        assert (start, end) == find_voiced_range(samples, SAMPLE_RATE, padding_ms=100)
+
+    @pytest.mark.unit
+    def test_find_voiced_range_in_file_reads_only_edges(self, temp_dir):
+        """声が見つかった後はファイルの中央を読み込まないことを確認"""
+        samples = take(lead_sec=0.2, voice_sec=20.0, tail_sec=0.2)
+        path = temp_dir / "take.wav"
+        sf.write(path, samples, SAMPLE_RATE, subtype="PCM_16")
+
+        with patch("utils.audio.silence_trim.sf.SoundFile.read", autospec=True, side_effect=sf.SoundFile.read) as mock_read:
+            find_voiced_range_in_file(str(path))
+
+        assert sum(call.args[1] for call in mock_read.call_args_list) < len(samples) / 4
+
+    @pytest.mark.unit
+    def test_find_voiced_range_in_file_all_silent(self, temp_dir):
+        """全体が無音のファイルではNoneを返し、ファイルを変更しないことを確認"""
+        path = temp_dir / "silent.wav"
+        sf.write(path, np.zeros(SAMPLE_RATE, dtype=np.int16), SAMPLE_RATE, subtype="PCM_16")
+
+        assert find_voiced_range_in_file(str(path)) is None
+        assert trim_file(str(path)) == 0
+        assert sf.info(path).frames == SAMPLE_RATE
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+ストリーミング再生のユニットテスト
+"""
+
+import numpy as np
+import pytest
+import sounddevice as sd
+from unittest.mock import MagicMock, patch
+
+from utils.audio.stream_player import PcmRingBuffer, StreamingPlayer
+
+
+def pcm(values):
+    return np.array(values, dtype=np.int16).tobytes()
+
+
+class TestPcmRingBuffer:
+    """PcmRingBufferのテスト"""
+
+    @pytest.mark.unit
+    def test_wraparound(self):
+        """末尾をまたぐ読み書きのテスト"""
+        ring = PcmRingBuffer(4)
+        ring.write(np.array([1, 2, 3], dtype=np.int16))
+        out = np.zeros(2, dtype=np.int16)
+        assert ring.read_into(out) == 2
+        ring.write(np.array([4, 5, 6], dtype=np.int16))
+
+        out = np.zeros(4, dtype=np.int16)
+        assert ring.read_into(out) == 4
+        assert out.tolist() == [3, 4, 5, 6]
+        assert len(ring) == 0
+
+    @pytest.mark.unit
+    def test_grow(self):
+        """容量不足時に拡張されることを確認"""
+        ring = PcmRingBuffer(2)
+        ring.write(np.array([1], dtype=np.int16))
+        ring.write(np.array([2, 3, 4, 5], dtype=np.int16))
+
+        assert ring.capacity >= 5
+        out = np.zeros(5, dtype=np.int16)
+        ring.read_into(out)
+        assert out.tolist() == [1, 2, 3, 4, 5]
+
+
+class TestStreamingPlayer:
+    """StreamingPlayerのテスト"""
+
+    @pytest.fixture
+    def mock_stream(self):
+        with patch("utils.audio.stream_player.sd.OutputStream") as mock_stream_class:
+            mock_stream_class.return_value = MagicMock()
+            yield mock_stream_class
+
+    @pytest.mark.unit
+    def test_starts_after_prebuffer(self, mock_stream):
+        """プリバッファ分たまってから再生を開始することを確認"""
+        player = StreamingPlayer(samplerate=1000, prebuffer_ms=10)
+
+        player.feed(pcm(range(5)))
+        mock_stream.assert_not_called()
+
+        player.feed(pcm(range(5, 10)))
+        mock_stream.assert_called_once()
+        assert mock_stream.call_args.kwargs["dtype"] == "int16"
+        mock_stream.return_value.start.assert_called_once()
+
+    @pytest.mark.unit
+    def test_callback_plays_in_order(self, mock_stream):
+        """コールバックで受信順に出力されることを確認"""
+        player = StreamingPlayer(samplerate=1000, prebuffer_ms=2)
+        player.feed(pcm([1, 2, 3]))
+
+        outdata = np.zeros((2, 1), dtype=np.int16)
+        player._callback(outdata, 2, None, None)
+        assert outdata[:, 0].tolist() == [1, 2]
+
+    @pytest.mark.unit
+    def test_underrun_rebuffers(self, mock_stream):
+        """バッファ切れ時は無音を出して再度プリバッファすることを確認"""
+        player = StreamingPlayer(samplerate=1000, prebuffer_ms=2)
+        player.feed(pcm([1, 2]))
+
+        outdata = np.full((4, 1), 99, dtype=np.int16)
+        player._callback(outdata, 4, None, None)
+        assert outdata[:, 0].tolist() == [1, 2, 0, 0]
+        assert player.underruns == 1
+
+        # プリバッファに満たない間は無音
+        player.feed(pcm([3]))
+        outdata = np.full((2, 1), 99, dtype=np.int16)
+        player._callback(outdata, 2, None, None)
+        assert outdata[:, 0].tolist() == [0, 0]
+        assert player.underruns == 1
+
+    @pytest.mark.unit
+    def test_finish_stops_after_drain(self, mock_stream):
+        """受信完了後はバッファを再生し終えると停止することを確認"""
+        player = StreamingPlayer(samplerate=1000, prebuffer_ms=100)
+        player.feed(pcm([1, 2, 3]))
+        mock_stream.assert_not_called()
+
+        # 短い音声でも受信完了で再生を開始する
+        player.finish()
+        mock_stream.assert_called_once()
+
+        outdata = np.zeros((4, 1), dtype=np.int16)
+        with pytest.raises(sd.CallbackStop):
+            player._callback(outdata, 4, None, None)
+        assert outdata[:, 0].tolist() == [1, 2, 3, 0]
+
+    @pytest.mark.unit
+    def test_odd_byte_chunks(self, mock_stream):
+        """奇数バイトに分割されたチャンクを正しく扱うことを確認"""
+        player = StreamingPlayer(samplerate=1000, prebuffer_ms=2)
+        data = pcm([256, 513])
+        player.feed(data[:3])
+        player.feed(data[3:])
+
+        outdata = np.zeros((2, 1), dtype=np.int16)
+        player._callback(outdata, 2, None, None)
+        assert outdata[:, 0].tolist() == [256, 513]
+
+    @pytest.mark.unit
+    def test_finish_without_audio(self, mock_stream):
+        """音声がないまま完了した場合は再生しないことを確認"""
+        player = StreamingPlayer()
+        player.finish()
+
+        mock_stream.assert_not_called()
+        assert player.wait(0)
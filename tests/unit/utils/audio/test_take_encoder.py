@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+保存したテイクの圧縮形式への変換のユニットテスト
+"""
+
+import os
+import threading
+import pytest
+import numpy as np
+import soundfile as sf
+from unittest.mock import patch
+
+from utils.audio.take_encoder import TakeEncoder, encode_take
+
+
+def write_take(path, samples=24000):
+    data = (np.sin(np.arange(samples) * 0.05) * 8000).astype(np.int16)
+    sf.write(path, data, 24000, subtype="PCM_16")
+    return data
+
+
+class TestTakeEncoder:
+    """テイクの変換のテスト"""
+
+    @pytest.mark.unit
+    def test_encode_flac_is_lossless(self, temp_dir):
+        """FLACに変換したテイクが元のデータと一致することを確認"""
+        source = temp_dir / "演者_0101_120000.wav"
+        data = write_take(source, samples=100000)
+
+        output = encode_take(str(source), "flac")
+
+        assert output == str(temp_dir / "演者_0101_120000.flac")
+        assert sf.info(output).format == "FLAC"
+        np.testing.assert_array_equal(sf.read(output, dtype="int16")[0], data)
+        # 元のファイルはencode_takeでは削除しない
+        assert source.exists()
+        assert [p.name for p in temp_dir.iterdir() if p.suffix == ".part"] == []
+
+    @pytest.mark.unit
+    def test_encoded_file_uses_default_mode(self, temp_dir):
+        """変換したファイルが一時ファイルの権限ではなく、通常のファイルと同じ権限になることを確認"""
+        source = temp_dir / "演者_0101_120000.wav"
+        write_take(source)
+        umask = os.umask(0o022)
+        try:
+            output = encode_take(str(source), "flac")
+        finally:
+            os.umask(umask)
+
+        assert os.stat(output).st_mode & 0o777 == 0o644
+
+    @pytest.mark.unit
+    def test_encode_opus(self, temp_dir):
+        """Opusに変換したテイクの長さが変わらないことを確認"""
+        source = temp_dir / "演者_0101_120000.wav"
+        write_take(source)
+
+        output = encode_take(str(source), "opus")
+
+        info = sf.info(output)
+        assert (info.format, info.subtype) == ("OGG", "OPUS")
+        assert info.frames == 24000
+        assert os.path.getsize(output) < os.path.getsize(source)
+
+    @pytest.mark.unit
+    def test_background_encoding(self, temp_dir):
+        """バックグラウンドで変換し、コールバックの後に元のWAVを削除することを確認"""
+        source = temp_dir / "演者_0101_120000.wav"
+        write_take(source)
+        calls = []
+        release = threading.Event()
+        encoder = TakeEncoder()
+
+        def on_encoded(old_path, new_path):
+            release.wait(5)
+            calls.append((old_path, new_path, os.path.exists(old_path)))
+
+        future = encoder.submit(str(source), "flac", on_encoded)
+        # 依頼した時点では待たずに戻る
+        assert not future.done()
+        release.set()
+        encoder.shutdown(wait=True)
+
+        output = str(temp_dir / "演者_0101_120000.flac")
+        assert future.result() == output
+        assert calls == [(str(source), output, True)]
+        assert not source.exists()
+
+    @pytest.mark.unit
+    def test_wav_that_cannot_be_removed_is_kept(self, temp_dir):
+        """元のWAVを削除できなくても変換は成功とし、変換後のパスを返すことを確認"""
+        source = temp_dir / "演者_0101_120000.wav"
+        write_take(source)
+        encoder = TakeEncoder()
+
+        with patch("utils.audio.take_encoder.os.remove", side_effect=PermissionError("denied")):
+            result = encoder.submit(str(source), "flac").result()
+        encoder.shutdown()
+
+        assert result == str(temp_dir / "演者_0101_120000.flac")
+        assert source.exists()
+        assert sf.info(result).format == "FLAC"
+
+    @pytest.mark.unit
+    def test_failed_encoding_keeps_wav(self, temp_dir):
+        """変換に失敗した場合はWAVと一時ファイルを残さないことを確認"""
+        source = temp_dir / "演者_0101_120000.wav"
+        write_take(source)
+        encoder = TakeEncoder()
+
+        with patch("utils.audio.take_encoder.sf.blocks", side_effect=RuntimeError("boom")):
+            assert encoder.submit(str(source), "flac").result() is None
+        encoder.shutdown()
+
+        assert sorted(p.name for p in temp_dir.iterdir()) == ["演者_0101_120000.wav"]
+        with pytest.raises(ValueError):
+            encoder.submit(str(source), "mp3")
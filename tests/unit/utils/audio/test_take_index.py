@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+テイクのインデックスのユニットテスト
+"""
+
+import os
+import pytest
+import numpy as np
+import soundfile as sf
+from datetime import datetime
+
+from utils.audio.take_index import TakeIndex, scan_takes, unique_takes
+
+
+class TestTakeIndex:
+    """テイクのインデックスのテスト"""
+
+    @pytest.fixture
+    def index(self, temp_dir):
+        return TakeIndex.for_root(str(temp_dir))
+
+    def write_take(self, root, actor, name, samples=24000):
+        actor_dir = root / actor
+        actor_dir.mkdir(exist_ok=True)
+        path = actor_dir / f"{actor}_{name}.wav"
+        sf.write(path, np.zeros(samples, dtype=np.int16), 24000, subtype="PCM_16")
+        return str(path)
+
+    @pytest.mark.unit
+    def test_add_and_find(self, index, temp_dir):
+        """登録したテイクを条件で検索できることを確認"""
+        first = self.write_take(temp_dir, "演者A", "0101_120000", samples=24000)
+        second = self.write_take(temp_dir, "演者A", "0102_120000", samples=72000)
+        third = self.write_take(temp_dir, "演者B", "0101_130000", samples=48000)
+        index.add(first, "演者A", datetime(2026, 1, 1, 12), text="おはよう", acting_prompt="元気に")
+        index.add(second, "演者A", datetime(2026, 1, 2, 12), text="こんにちは")
+        index.add(third, "演者B", datetime(2026, 1, 1, 13), text="100%_テスト")
+
+        assert index.exists()
+        assert index.count() == 3
+        take = index.find(actor="演者A", date="0101")[0]
+        assert take["path"] == first
+        assert take["duration"] == pytest.approx(1.0)
+        assert take["samplerate"] == 24000
+        assert take["recorded_at"] == "2026-01-01T12:00:00"
+        assert take["acting_prompt"] == "元気に"
+
+        assert [t["path"] for t in index.find(text="こんにち")] == [second]
+        assert [t["path"] for t in index.find(text="元気")] == [first]
+        # LIKEの特殊文字はそのまま検索する
+        assert [t["path"] for t in index.find(text="%_")] == [third]
+        assert [t["path"] for t in index.find(min_duration=1.5)] == [second, third]
+        assert [t["path"] for t in index.find(date_from="0102")] == [second]
+        assert index.groups() == [("演者A", "0101"), ("演者A", "0102"), ("演者B", "0101")]
+        assert index.groups(["演者B"]) == [("演者B", "0101")]
+        assert index.groups(date_from="1201", date_to="0101") == [("演者A", "0101"), ("演者B", "0101")]
+
+    @pytest.mark.unit
+    def test_paths_are_relative_and_skip_missing(self, index, temp_dir):
+        """パスは保存先からの相対パスで記録し、存在しないファイルは結合対象に含めないことを確認"""
+        kept = self.write_take(temp_dir, "演者A", "0101_120000")
+        deleted = self.write_take(temp_dir, "演者A", "0101_120001")
+        index.add(kept, "演者A", datetime(2026, 1, 1, 12))
+        index.add(deleted, "演者A", datetime(2026, 1, 1, 12))
+        os.remove(deleted)
+
+        assert index.paths("演者A", "0101") == [kept]
+
+        moved = temp_dir / "moved"
+        os.rename(temp_dir / "演者A", temp_dir / "tmp")
+        moved.mkdir()
+        os.rename(temp_dir / "tmp", moved / "演者A")
+        os.rename(index.db_path, moved / "takes.sqlite3")
+        assert TakeIndex.for_root(str(moved)).paths("演者A", "0101") == [str(moved / "演者A" / "演者A_0101_120000.wav")]
+
+    @pytest.mark.unit
+    def test_rebuild(self, index, temp_dir):
+        """ディスク上のファイルから作り直し、登録済みのセリフは残すことを確認"""
+        known = self.write_take(temp_dir, "演者A", "0101_120000")
+        index.add(known, "演者A", datetime(2026, 1, 1, 12), text="残るセリフ")
+        gone = self.write_take(temp_dir, "演者A", "0101_120001")
+        index.add(gone, "演者A")
+        os.remove(gone)
+        new = self.write_take(temp_dir, "演者B", "0315_090000", samples=12000)
+        (temp_dir / "演者B" / "メモ.txt").write_text("x")
+
+        result = index.rebuild()
+
+        assert result == {"added": 1, "updated": 1, "removed": 1, "total": 2}
+        assert index.find(actor="演者A")[0]["text"] == "残るセリフ"
+        take = index.find(actor="演者B")[0]
+        assert take["path"] == new
+        assert take["date"] == "0315"
+        assert take["duration"] == pytest.approx(0.5)
+
+    @pytest.mark.unit
+    def test_new_index_registers_existing_takes(self, index, temp_dir):
+        """インデックスを新しく作成した場合、それまでに保存されていたテイクも登録されることを確認"""
+        existing = self.write_take(temp_dir, "演者A", "0101_120000")
+        saved = self.write_take(temp_dir, "演者A", "0101_120001")
+
+        index.add(saved, "演者A", datetime(2026, 1, 1, 12), text="新しいセリフ")
+
+        assert [t["path"] for t in index.find(actor="演者A")] == [existing, saved]
+        assert index.find(text="新しい")[0]["path"] == saved
+
+    @pytest.mark.unit
+    def test_scan_takes(self, temp_dir):
+        """演者名と日付がファイル名と一致するファイルだけを返すことを確認"""
+        path = self.write_take(temp_dir, "演者A", "0101_120000")
+        self.write_take(temp_dir, "演者A", "other")
+        (temp_dir / "output").mkdir()
+
+        assert list(scan_takes(str(temp_dir))) == [("演者A", "0101", path)]
+        assert list(scan_takes(str(temp_dir), ["存在しない演者"])) == []
+
+    @pytest.mark.unit
+    def test_scan_takes_prefers_encoded_file(self, temp_dir):
+        """変換中でWAVとFLACが両方あるテイクはFLACだけを返すことを確認"""
+        path = self.write_take(temp_dir, "演者A", "0101_120000")
+        encoded = os.path.splitext(path)[0] + ".flac"
+        sf.write(encoded, np.zeros(24000, dtype=np.int16), 24000, format="FLAC", subtype="PCM_16")
+
+        assert list(scan_takes(str(temp_dir))) == [("演者A", "0101", encoded)]
+        assert unique_takes([path, encoded, path]) == [encoded]
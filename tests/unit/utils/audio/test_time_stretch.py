@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+音程を保った速度変更（WSOLA）のユニットテスト
+"""
+
+import numpy as np
+import pytest
+
+from utils.audio.time_stretch import SAMPLE_RATE, WsolaStretcher, create_stretcher, time_stretch
+
+
+def sine(freq=440.0, seconds=2.0, amplitude=8000):
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * freq * t)).astype("<i2").tobytes()
+
+
+def dominant_frequency(pcm):
+    samples = np.frombuffer(pcm, dtype="<i2").astype(np.float64)
+    spectrum = np.abs(np.fft.rfft(samples * np.hanning(len(samples))))
+    return np.argmax(spectrum) * SAMPLE_RATE / len(samples)
+
+
+class TestTimeStretch:
+    """WsolaStretcherのテスト"""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("speed", [0.8, 1.2, 1.3, 1.5])
+    def test_length_follows_speed(self, speed):
+        """出力の長さが入力の長さ/速度になることを確認"""
+        pcm = sine(seconds=2.0)
+        result = time_stretch(pcm, speed)
+
+        assert len(result) // 2 == round(len(pcm) // 2 / speed)
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("speed", [0.8, 1.3])
+    def test_pitch_is_preserved(self, speed):
+        """速度を変えても音程が変わらないことを確認"""
+        result = time_stretch(sine(440.0), speed)
+
+        assert dominant_frequency(result) == pytest.approx(440.0, abs=3.0)
+
+    @pytest.mark.unit
+    def test_no_discontinuities(self):
+        """フレームのつなぎ目で波形が途切れないことを確認"""
+        pcm = sine(440.0)
+        result = np.frombuffer(time_stretch(pcm, 1.3), dtype="<i2").astype(np.float64)
+        original_step = np.abs(np.diff(np.frombuffer(pcm, dtype="<i2").astype(np.float64))).max()
+
+        assert np.abs(np.diff(result)).max() <= original_step * 1.05
+
+    @pytest.mark.unit
+    def test_chunked_matches_whole(self):
+        """任意の長さ（奇数バイトを含む）に分割して渡しても結果が同じことを確認"""
+        pcm = sine(220.0, seconds=1.0) + sine(330.0, seconds=1.0)
+        stretcher = WsolaStretcher(1.3)
+        rng = np.random.default_rng(0)
+        chunks = []
+        position = 0
+        while position < len(pcm):
+            size = int(rng.integers(1, 6000))
+            chunks.append(stretcher.process(pcm[position:position + size]))
+            position += size
+        chunks.append(stretcher.flush())
+
+        assert b"".join(chunks) == time_stretch(pcm, 1.3)
+
+    @pytest.mark.unit
+    def test_create_stretcher(self):
+        """等速や不正な設定ではストレッチャーを作らないことを確認"""
+        assert create_stretcher(1.0) is None
+        assert create_stretcher(None) is None
+        assert create_stretcher("fast") is None
+        assert create_stretcher(0) is None
+        assert create_stretcher(1.3).speed == 1.3
+        assert time_stretch(b"\x01\x00", 1.0) == b"\x01\x00"
@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+モックRealtimeサーバーのユニットテスト
+"""
+
+import base64
+import wave
+import pytest
+from unittest.mock import Mock, patch
+
+from models.cancellation import CancelToken, GenerationCancelled
+from models.voice_generator import VoiceGenerator
+from utils.dev.mock_realtime_server import (
+    MockRealtimeServer,
+    load_recording,
+    save_recording,
+    synthetic_pcm,
+)
+
+
+class TestMockRealtimeServer:
+    """MockRealtimeServerのテスト"""
+
+    @pytest.fixture
+    def make_generator(self, mock_env_vars, mock_prompts_file, temp_dir):
+        generators = []
+
+        def factory(server, reuse_sessions=True):
+            with patch("models.voice_generator.ROOT_DIR", str(mock_prompts_file.parent.parent)):
+                vg = VoiceGenerator(reuse_sessions=reuse_sessions)
+            vg._get_temp_dir = lambda: str(temp_dir)
+            vg.ws_url = server.url
+            vg.set_actor("テスト演者1")
+            generators.append(vg)
+            return vg
+
+        yield factory
+        for vg in generators:
+            vg.close()
+
+    def _read_pcm(self, path):
+        with wave.open(path, "rb") as wav_file:
+            return wav_file.readframes(wav_file.getnframes())
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("reuse_sessions", [True, False])
+    def test_generate_voice(self, make_generator, reuse_sessions):
+        """VoiceGeneratorがモックサーバーから音声を生成できることを確認"""
+        audio = synthetic_pcm(0.5)
+        with MockRealtimeServer(audio=audio, chunk_bytes=1000) as server:
+            vg = make_generator(server, reuse_sessions)
+            for i in range(2):
+                result = vg.generate_voice("system", "acting", f"text {i}")
+                assert self._read_pcm(result) == audio
+
+        assert server.connections == (1 if reuse_sessions else 2)
+        sent_types = [event["type"] for event in server.received]
+        assert "session.update" in sent_types
+        assert sent_types.count("response.create") == 2
+
+    @pytest.mark.unit
+    def test_ws_url_updates_session_manager(self, make_generator):
+        """ws_urlの変更が維持しているセッションに反映されることを確認"""
+        with MockRealtimeServer() as server:
+            vg = make_generator(server)
+            assert vg.session_manager.url == server.url
+
+    @pytest.mark.unit
+    def test_disconnect_is_retried(self, make_generator):
+        """音声受信前の切断は再接続してやり直すことを確認"""
+        audio = synthetic_pcm(0.1)
+        with MockRealtimeServer(audio=audio, fail_mode="disconnect", fail_times=1) as server:
+            vg = make_generator(server)
+            result = vg.generate_voice("system", "acting", "text")
+            assert self._read_pcm(result) == audio
+
+        assert server.connections == 2
+
+    @pytest.mark.unit
+    def test_error_event(self, make_generator):
+        """errorイベントで生成が失敗することを確認"""
+        with MockRealtimeServer(fail_mode="error") as server:
+            vg = make_generator(server)
+            with pytest.raises(ConnectionError):
+                vg.generate_voice("system", "acting", "text")
+            assert vg.wav_writer is None
+
+    @pytest.mark.unit
+    def test_replay_recording(self, make_generator, temp_dir):
+        """記録したイベントを再生できることを確認"""
+        pcm = b"\x01\x00\x02\x00\x03\x00"
+        recording = temp_dir / "recording.jsonl"
+        save_recording([
+            {"type": "response.audio.delta", "delta": base64.b64encode(pcm[:2]).decode()},
+            {"type": "response.audio.delta", "delta": base64.b64encode(pcm[2:]).decode()},
+            {"type": "response.audio.done"},
+            {"type": "response.done"},
+        ], str(recording))
+
+        with MockRealtimeServer(events=load_recording(str(recording))) as server:
+            vg = make_generator(server, reuse_sessions=False)
+            result = vg.generate_voice("system", "acting", "text")
+            assert self._read_pcm(result) == pcm
+
+    @pytest.mark.unit
+    def test_invalid_fail_mode(self):
+        """不明な失敗の種類はエラーになることを確認"""
+        with pytest.raises(ValueError):
+            MockRealtimeServer(fail_mode="unknown")
+
+    @pytest.mark.unit
+    def test_generation_timeline(self, make_generator):
+        """モックサーバーでの生成で各段階の時刻が記録されることを確認"""
+        audio = synthetic_pcm(0.5)
+        with MockRealtimeServer(audio=audio, chunk_bytes=4800, ttfb_ms=20) as server:
+            vg = make_generator(server)
+            vg.generate_voice("system", "acting", "text")
+
+        record = vg.metrics.latest
+        marks = record["marks_ms"]
+        assert list(marks) == ["start", "connect", "open", "first_delta", "last_delta", "audio_done", "wav_written", "end"]
+        assert record["server_ttfb_ms"] >= 20
+        assert record["bytes_received"] == len(audio)
+        assert record["chunks"] == 5
+        assert record["reused_session"] is False
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("reuse_sessions", [True, False])
+    def test_timeout_on_stall(self, make_generator, temp_dir, reuse_sessions):
+        """応答が止まった場合にタイムアウトし、途中の音声が残らないことを確認"""
+        with MockRealtimeServer(fail_mode="stall", fail_after_chunks=2, chunk_bytes=480) as server:
+            vg = make_generator(server, reuse_sessions)
+            with pytest.raises(TimeoutError):
+                vg.generate_voice("system", "acting", "text", timeout=0.3)
+
+        assert vg.wav_writer is None
+        assert not list(temp_dir.glob("*.wav"))
+
+    @pytest.mark.unit
+    def test_cancel_recycles_session(self, make_generator, temp_dir):
+        """中止するとresponse.cancelが送られ、同じ接続で次の生成ができることを確認"""
+        audio = synthetic_pcm(0.1)
+        with MockRealtimeServer(audio=audio, chunk_bytes=480, fail_mode="stall", fail_after_chunks=2, fail_times=1) as server:
+            vg = make_generator(server)
+            token = CancelToken()
+            on_wait = Mock(side_effect=lambda: server.responses and token.cancel())
+            with pytest.raises(GenerationCancelled):
+                vg.generate_voice("system", "acting", "text", cancel_token=token, on_wait=on_wait)
+            assert not list(temp_dir.glob("*.wav"))
+            assert "response.cancel" in [event["type"] for event in server.received]
+
+            result = vg.generate_voice("system", "acting", "text")
+            assert self._read_pcm(result) == audio
+
+        assert server.connections == 1
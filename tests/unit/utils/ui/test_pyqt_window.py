@@ -8,8 +8,12 @@ import pytest
 import sys
 import os
 import json
+import threading
+import time
 from unittest.mock import Mock, patch
 
+from models.cancellation import GenerationCancelled
+
 try:
     from PyQt6.QtWidgets import QApplication, QTextEdit
     from PyQt6.QtCore import Qt
@@ -25,6 +29,12 @@ if PYQT_AVAILABLE:
     from utils.ui.pyqt_window import FocusTextEdit, VoiceGeneratorGUI
 
 
+def wait_for_workers(qtbot, window):
+    """ワーカースレッドでの生成と、完了後に始まる再生が終わるまで待つ"""
+    qtbot.waitUntil(lambda: not window.is_busy(), timeout=5000)
+    window.thread_pool.waitForDone(5000)
+
+
 @pytest.mark.skipif(not PYQT_AVAILABLE, reason="PyQt6が利用できません")
 class TestFocusTextEdit:
     """FocusTextEditクラスのテスト"""
@@ -89,6 +99,7 @@ class TestVoiceGeneratorGUI:
         mock_vg.generate_voice = Mock(return_value="/tmp/test.wav")
         mock_vg.save_voice = Mock(return_value="/saved/test.wav")
         mock_vg.play_audio = Mock()
+        mock_vg.metrics.latest = None
         return mock_vg
 
     @pytest.fixture
@@ -169,6 +180,28 @@ class TestVoiceGeneratorGUI:
         expected_prompt = test_prompts["テスト演者1"]["system_prompt"]
         assert gui_window.system_prompt.toPlainText() == expected_prompt
 
+    @pytest.mark.unit
+    @pytest.mark.gui
+    def test_actor_change_prewarms_session(self, gui_window, mock_voice_generator):
+        """演者を選択するとセッションが事前準備されることを確認"""
+        mock_voice_generator.prewarm.reset_mock()
+
+        gui_window.on_actor_changed("テスト演者2")
+
+        mock_voice_generator.prewarm.assert_called_once_with(
+            gui_window.prompts["テスト演者2"]["system_prompt"]
+        )
+
+    @pytest.mark.unit
+    @pytest.mark.gui
+    def test_text_focus_prewarms_session(self, gui_window, mock_voice_generator):
+        """セリフ欄にフォーカスが移るとセッションが事前準備されることを確認"""
+        mock_voice_generator.prewarm.reset_mock()
+
+        gui_window.text_input.focused.emit()
+
+        mock_voice_generator.prewarm.assert_called_once_with(gui_window.system_prompt.toPlainText())
+
     @pytest.mark.unit
     @pytest.mark.gui
     def test_generate_voice_empty_script(self, gui_window):
@@ -184,19 +217,167 @@ class TestVoiceGeneratorGUI:
 
     @pytest.mark.unit
     @pytest.mark.gui
-    def test_generate_voice_success(self, gui_window, mock_voice_generator):
+    def test_generate_voice_success(self, gui_window, mock_voice_generator, qtbot):
         """音声生成成功のテスト"""
         # テストデータを設定
         gui_window.text_input.setPlainText("テスト用スクリプト")
         gui_window.actor_combo.setCurrentText("テスト演者1")
+        # 受信しながら再生しない場合は生成後に再生する
+        gui_window.stream_checkbox.setChecked(False)
         
         # 音声生成を実行
         gui_window.generate_voice()
+        wait_for_workers(qtbot, gui_window)
         
         # VoiceGeneratorのメソッドが正しく呼ばれることを確認
         mock_voice_generator.generate_voice.assert_called_once()
         args = mock_voice_generator.generate_voice.call_args[0]
         assert "テスト用スクリプト" in args[2]  # テキスト引数
+        # 生成後はワーカースレッドで再生される
+        mock_voice_generator.play_audio.assert_called_once()
+        assert "音声生成完了" in gui_window.status_label.text()
+        assert gui_window.generate_btn.isEnabled()
+
+    @pytest.mark.unit
+    @pytest.mark.gui
+    def test_generate_voice_runs_on_worker(self, gui_window, mock_voice_generator, qtbot):
+        """生成はワーカースレッドで行い、進行状況がシグナルでステータスに表示されることを確認"""
+        progressed = threading.Event()
+        release = threading.Event()
+        threads = []
+
+        def generate(*args, progress_callback=None, **kwargs):
+            threads.append(threading.current_thread())
+            progress_callback("🎵 音声データを受信中...")
+            progressed.set()
+            release.wait(5)
+            return "/tmp/test.wav"
+
+        mock_voice_generator.generate_voice.side_effect = generate
+        gui_window.text_input.setPlainText("テスト用スクリプト")
+
+        # 生成の完了を待たずに戻る
+        gui_window.generate_voice()
+        assert gui_window.is_busy()
+        assert not gui_window.generate_btn.isEnabled()
+        assert progressed.wait(5)
+        qtbot.waitUntil(lambda: gui_window.status_label.text() == "🎵 音声データを受信中...", timeout=5000)
+
+        release.set()
+        wait_for_workers(qtbot, gui_window)
+        assert threads[0] is not threading.main_thread()
+        assert "音声生成完了" in gui_window.status_label.text()
+
+    @pytest.mark.unit
+    @pytest.mark.gui
+    def test_actor_and_settings_locked_while_busy(self, gui_window, mock_voice_generator, qtbot):
+        """生成中は演者の切り替えと設定画面を受け付けず、完了後に戻ることを確認"""
+        release = threading.Event()
+        mock_voice_generator.generate_voice.side_effect = lambda *args, **kwargs: release.wait(5) and "/tmp/test.wav"
+        gui_window.text_input.setPlainText("テスト用スクリプト")
+        mock_voice_generator.set_actor.reset_mock()
+
+        gui_window.generate_voice()
+        assert not gui_window.actor_combo.isEnabled()
+        assert not gui_window.settings_btn.isEnabled()
+        gui_window.on_actor_changed("テスト演者2")
+        mock_voice_generator.set_actor.assert_not_called()
+        with patch("utils.ui.performer_settings_dialog.PerformerSettingsDialog") as mock_dialog_class:
+            gui_window.open_settings()
+        mock_dialog_class.assert_not_called()
+
+        release.set()
+        wait_for_workers(qtbot, gui_window)
+        assert gui_window.actor_combo.isEnabled()
+        assert gui_window.settings_btn.isEnabled()
+
+    @pytest.mark.unit
+    @pytest.mark.gui
+    def test_generate_voice_shows_metrics(self, gui_window, mock_voice_generator, qtbot):
+        """生成後に直近のTTFB・合計時間がステータスバーに表示されることを確認"""
+        mock_voice_generator.metrics.latest = {"ttfb_ms": 412.3, "total_ms": 1830.0, "audio_sec": 2.1}
+        gui_window.text_input.setPlainText("テスト用スクリプト")
+
+        gui_window.generate_voice()
+        wait_for_workers(qtbot, gui_window)
+
+        message = gui_window.statusBar().currentMessage()
+        assert "TTFB 412ms" in message
+        assert "合計 1830ms" in message
+
+    @pytest.mark.unit
+    @pytest.mark.gui
+    def test_stop_generation(self, gui_window, mock_voice_generator, qtbot):
+        """停止ボタンで生成が中止されることを確認"""
+        started = threading.Event()
+
+        def generate(*args, cancel_token=None, **kwargs):
+            # 停止ボタンが押されるまで受信を続けている場合を模擬
+            started.set()
+            deadline = time.monotonic() + 5
+            while time.monotonic() < deadline:
+                if cancel_token.is_cancelled:
+                    raise GenerationCancelled("生成が中止されました")
+                time.sleep(0.01)
+            return "/tmp/test.wav"
+
+        mock_voice_generator.generate_voice.side_effect = generate
+        gui_window.text_input.setPlainText("テスト用スクリプト")
+
+        gui_window.generate_voice()
+        assert started.wait(5)
+        # 生成中もGUIスレッドは停止ボタンの操作を受け付ける
+        assert gui_window.stop_btn.isEnabled()
+        gui_window.stop_btn.click()
+        wait_for_workers(qtbot, gui_window)
+
+        mock_voice_generator.cancel.assert_called_once()
+        mock_voice_generator.stop_playback.assert_called()
+        assert "中止" in gui_window.status_label.text()
+        assert not gui_window.stop_btn.isEnabled()
+        assert gui_window.generate_btn.isEnabled()
+
+    @pytest.mark.unit
+    @pytest.mark.gui
+    def test_generate_multiple_takes(self, gui_window, mock_voice_generator, qtbot):
+        """テイク数を指定すると同時に生成され、テイクごとに再生・保存できることを確認"""
+        take_generator = Mock()
+        take_generator.generate_takes_sync.return_value = ["/tmp/take1.wav", "/tmp/take2.wav", "/tmp/take3.wav"]
+        gui_window.text_input.setPlainText("テスト用スクリプト")
+        gui_window.takes_spin.setValue(3)
+
+        with patch("utils.ui.pyqt_window.AsyncVoiceGenerator", return_value=take_generator):
+            gui_window.generate_voice()
+            wait_for_workers(qtbot, gui_window)
+
+        args = take_generator.generate_takes_sync.call_args
+        assert args[0][2] == "テスト用スクリプト"
+        assert args[0][3] == 3
+        mock_voice_generator.generate_voice.assert_not_called()
+        assert gui_window.take_combo.count() == 3
+        assert "3テイク" in gui_window.status_label.text()
+
+        gui_window.take_combo.setCurrentIndex(1)
+        gui_window.play_voice()
+        wait_for_workers(qtbot, gui_window)
+        # テイクはメモリに保持されているため、生成した側で再生する
+        take_generator.play_audio.assert_called_with("/tmp/take2.wav")
+        mock_voice_generator.play_audio.assert_not_called()
+
+        gui_window.actor_combo.setCurrentText("テスト演者1")
+        gui_window.save_voice()
+        take_generator.save_voice.assert_called_with("テスト演者1", "/tmp/take2.wav")
+        assert "保存済み" in gui_window.take_combo.itemText(1)
+
+    @pytest.mark.unit
+    @pytest.mark.gui
+    def test_stop_generation_cancels_takes(self, gui_window, mock_voice_generator):
+        """停止ボタンで複数テイクの生成も中止されることを確認"""
+        gui_window.take_generator = Mock()
+
+        gui_window.stop_generation()
+
+        gui_window.take_generator.cancel.assert_called_once()
 
     @pytest.mark.unit
     @pytest.mark.gui
@@ -213,10 +394,11 @@ class TestVoiceGeneratorGUI:
 
     @pytest.mark.unit
     @pytest.mark.gui
-    def test_play_voice(self, gui_window, mock_voice_generator):
+    def test_play_voice(self, gui_window, mock_voice_generator, qtbot):
         """音声再生のテスト"""
-        # 音声再生を実行
+        # 音声再生を実行（ワーカースレッドで再生する）
         gui_window.play_voice()
+        wait_for_workers(qtbot, gui_window)
         
         # VoiceGeneratorのplay_audioが呼ばれることを確認
         mock_voice_generator.play_audio.assert_called_once()
@@ -285,7 +467,7 @@ class TestVoiceGeneratorGUI:
 
     @pytest.mark.unit
     @pytest.mark.gui
-    def test_error_handling_in_generate_voice(self, gui_window, mock_voice_generator):
+    def test_error_handling_in_generate_voice(self, gui_window, mock_voice_generator, qtbot):
         """音声生成エラーハンドリングのテスト"""
         # VoiceGeneratorでエラーを発生させる
         mock_voice_generator.generate_voice.side_effect = Exception("テストエラー")
@@ -296,8 +478,10 @@ class TestVoiceGeneratorGUI:
         # 音声生成を実行（エラーが発生するがクラッシュしないことを確認）
         try:
             gui_window.generate_voice()
+            wait_for_workers(qtbot, gui_window)
         except Exception:
             pytest.fail("UIでのエラーハンドリングが適切に行われていません")
+        assert "テストエラー" in gui_window.status_label.text()
 
     @pytest.mark.unit
     @pytest.mark.gui
@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import csv
+import time
+import asyncio
+from utils.logger import get_logger
+
+# ロガーの取得
+logger = get_logger()
+
+# 台本のヘッダー行として扱う列名
+HEADER_NAMES = {"actor", "演者"}
+
+# 1行あたりのタイムアウト（秒）
+DEFAULT_TIMEOUT = 120
+
+# マニフェストの列
+MANIFEST_FIELDS = ["line", "actor", "acting_prompt", "text", "status", "file", "elapsed_sec", "error"]
+
+
+def load_script(script_path):
+    """台本ファイルを読み込む関数
+
+    CSV / TSV / TXT に対応する。各行は「演者, 演技指導, セリフ」の3列、
+    または演技指導を省略した「演者, セリフ」の2列とする。
+    TXTはタブ区切りとして扱い、空行と # で始まる行は無視する。
+
+    Args:
+        script_path (str): 台本ファイルのパス
+
+    Returns:
+        list: (行番号, 演者, 演技指導, セリフ) のリスト
+    """
+    ext = os.path.splitext(script_path)[1].lower()
+    if ext not in (".csv", ".tsv", ".txt"):
+        raise ValueError(f"対応していない台本形式です: {ext}")
+    delimiter = "," if ext == ".csv" else "\t"
+
+    rows = []
+    with open(script_path, "r", encoding="utf-8-sig", newline="") as f:
+        for line_no, columns in enumerate(csv.reader(f, delimiter=delimiter), start=1):
+            columns = [c.strip() for c in columns]
+            if not any(columns) or columns[0].startswith("#"):
+                continue
+            if line_no == 1 and columns[0].lower() in HEADER_NAMES:
+                continue
+
+            if len(columns) >= 3:
+                actor, acting_prompt, text = columns[0], columns[1], delimiter.join(columns[2:])
+            elif len(columns) == 2:
+                actor, acting_prompt, text = columns[0], "", columns[1]
+            else:
+                raise ValueError(f"{line_no}行目: 演者とセリフが必要です")
+
+            if not actor or not text:
+                raise ValueError(f"{line_no}行目: 演者とセリフが必要です")
+            rows.append((line_no, actor, acting_prompt, text))
+
+    return rows
+
+
+async def _render_row(generator, semaphore, row, force_fresh=False, timeout=None):
+    """1行分の音声を生成する"""
+    line_no, actor, acting_prompt, text = row
+    system_prompt = generator.performer_configs.get(actor, {}).get("system_prompt", "")
+
+    async with semaphore:
+        started = time.monotonic()
+        try:
+            temp_file = await generator.generate_voice(
+                system_prompt, acting_prompt, text, actor=actor, force_fresh=force_fresh, timeout=timeout
+            )
+            return temp_file, time.monotonic() - started, None
+        except Exception as e:
+            return None, time.monotonic() - started, e
+
+
+async def _render_all(generator, rows, jobs, writer, force_fresh=False, timeout=None):
+    """すべての行を並列に生成し、台本の順番で保存する"""
+    semaphore = asyncio.Semaphore(jobs)
+    tasks = [asyncio.create_task(_render_row(generator, semaphore, row, force_fresh, timeout)) for row in rows]
+    summary = {"ok": 0, "error": 0}
+
+    # 保存は台本順に行い、ファイル名の並びと台本の順番を一致させる
+    for i, (row, task) in enumerate(zip(rows, tasks)):
+        line_no, actor, acting_prompt, text = row
+        temp_file, elapsed, error = await task
+        saved_path = None
+        if error is None:
+            try:
+                saved_path = generator.save_voice(actor, temp_file=temp_file)
+                if not saved_path:
+                    error = Exception("保存するファイルがありません")
+            except Exception as e:
+                error = e
+
+        status = "ok" if error is None else "error"
+        summary[status] += 1
+        writer.writerow({
+            "line": line_no,
+            "actor": actor,
+            "acting_prompt": acting_prompt,
+            "text": text,
+            "status": status,
+            "file": saved_path or "",
+            "elapsed_sec": f"{elapsed:.3f}",
+            "error": str(error) if error else "",
+        })
+
+        if error is None:
+            logger.info(f"バッチ生成({i + 1}/{len(rows)}): {os.path.basename(saved_path)} ({elapsed:.2f}秒)")
+        else:
+            logger.error(f"バッチ生成({i + 1}/{len(rows)}) {line_no}行目でエラー: {error}")
+
+    return summary
+
+
+def render_script(script_path, manifest_path=None, jobs=4, force_fresh=False, timeout=DEFAULT_TIMEOUT):
+    """台本を一括で音声生成する関数
+
+    Args:
+        script_path (str): 台本ファイルのパス（.csv / .tsv / .txt）
+        manifest_path (str, optional): マニフェストの出力パス。デフォルトは台本と同じ場所
+        jobs (int, optional): 同時に生成する行数（Realtime API接続数）
+        force_fresh (bool, optional): Trueの場合はキャッシュを使わずにすべての行を生成する
+        timeout (float, optional): 1行あたりのタイムアウト秒数（超えた行はエラーとして記録する）
+
+    Returns:
+        dict: 結果の集計（manifest, ok, error, elapsed_sec）
+    """
+    from models.async_voice_generator import AsyncVoiceGenerator
+
+    rows = load_script(script_path)
+    logger.info(f"バッチ生成開始: {script_path} ({len(rows)}行, 並列数={jobs})")
+
+    if not manifest_path:
+        manifest_path = os.path.splitext(script_path)[0] + "_manifest.csv"
+
+    generator = AsyncVoiceGenerator(max_concurrency=jobs, use_cache=True)
+    started = time.monotonic()
+    try:
+        with open(manifest_path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=MANIFEST_FIELDS)
+            writer.writeheader()
+            summary = asyncio.run(_render_all(generator, rows, jobs, writer, force_fresh, timeout))
+    finally:
+        generator.close()
+
+    summary["manifest"] = manifest_path
+    summary["elapsed_sec"] = time.monotonic() - started
+    logger.info(
+        f"バッチ生成完了: 成功={summary['ok']}, 失敗={summary['error']}, "
+        f"所要時間={summary['elapsed_sec']:.1f}秒, マニフェスト={manifest_path}"
+    )
+    return summary
+
+
+def main():
+    """コマンドラインから実行するためのメイン関数"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="台本から音声を一括生成します")
+    parser.add_argument("script", help="台本ファイル（.csv / .tsv / .txt）")
+    parser.add_argument("--jobs", "-j", type=int, default=4, help="並列数")
+    parser.add_argument("--manifest", help="マニフェストの出力パス")
+    parser.add_argument("--fresh", action="store_true", help="キャッシュを使わずにすべて生成し直す")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="1行あたりのタイムアウト秒数")
+
+    args = parser.parse_args()
+
+    summary = render_script(args.script, args.manifest, args.jobs, args.fresh, args.timeout)
+    print(f"処理が完了しました: 成功={summary['ok']}, 失敗={summary['error']}")
+    print(f"マニフェスト: {summary['manifest']}")
+    sys.exit(0 if summary["error"] == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
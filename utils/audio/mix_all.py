@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import soundfile as sf
+from utils.audio import mix_audio
+from utils.audio.take_index import TakeIndex, scan_takes
+from utils.logger import get_logger
+
+# ロガーの取得
+logger = get_logger()
+
+
+def _in_range(date, date_from=None, date_to=None):
+    """日付（MMDD）が範囲内かどうか（date_fromがdate_toより後の場合は年をまたぐ範囲とする）"""
+    if date_from and date_to and date_from > date_to:
+        return date >= date_from or date <= date_to
+    if date_from and date < date_from:
+        return False
+    if date_to and date > date_to:
+        return False
+    return True
+
+
+def find_mix_groups(performers=None, date_from=None, date_to=None, root_dir=None, scan=False):
+    """結合対象の（演者, 日付）の組み合わせを探す関数
+
+    テイクのインデックスがある場合はインデックスから検索し、
+    ない場合は演者フォルダを走査する。
+
+    Args:
+        performers (list, optional): 対象の演者名。省略時は保存済みの音声がある全演者
+        date_from (str, optional): 開始日（MMDD形式、この日を含む）
+        date_to (str, optional): 終了日（MMDD形式、この日を含む）
+        root_dir (str, optional): 演者フォルダのあるディレクトリ。省略時はmix_audio.ROOT_DIR
+        scan (bool, optional): Trueの場合、インデックスがあっても演者フォルダを走査し、
+            インデックスに登録されていないテイクも対象とする
+
+    Returns:
+        list: (演者名, 日付) のリスト（演者名・日付順）
+    """
+    root_dir = root_dir or mix_audio.ROOT_DIR
+    index = TakeIndex.for_root(root_dir)
+    if index.exists() and not scan:
+        return index.groups(performers, date_from, date_to)
+
+    groups = set()
+    for performer, date, _ in scan_takes(root_dir, performers):
+        if _in_range(date, date_from, date_to):
+            groups.add((performer, date))
+    # インデックスには演者フォルダの外に保存されたテイクも登録されている
+    if index.exists():
+        groups.update(index.groups(performers, date_from, date_to))
+    return sorted(groups)
+
+
+def _mix_group(root_dir, performer, date, options):
+    """1つの（演者, 日付）を結合する（プロセスプールのワーカーで実行）"""
+    # 起動方式（spawn）によってはワーカーで設定が引き継がれないため明示的に設定する
+    mix_audio.ROOT_DIR = root_dir
+    started = time.monotonic()
+    output_path = mix_audio.process_audio(performer, date, **options)
+    duration = sf.info(output_path).duration if output_path else None
+    return {
+        "performer": performer,
+        "date": date,
+        "output": output_path,
+        "duration_sec": duration,
+        "elapsed_sec": time.monotonic() - started,
+    }
+
+
+def _failed(performer, date):
+    """結合に失敗した組み合わせの結果"""
+    return {"performer": performer, "date": date, "output": None, "duration_sec": None, "elapsed_sec": None}
+
+
+def mix_groups(groups, jobs=None, **options):
+    """複数の（演者, 日付）をプロセスプールで並列に結合する関数
+
+    Args:
+        groups (list): (演者名, 日付) のリスト
+        jobs (int, optional): 同時に実行するプロセス数。省略時はCPU数
+        **options: process_audioに渡す引数（trimなど）
+
+    Returns:
+        list: 組み合わせごとの結果（groupsと同じ順）
+    """
+    root_dir = mix_audio.ROOT_DIR
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(groups) or 1))
+    logger.info(f"一括結合開始: {len(groups)}件, 並列数={jobs}")
+
+    results = {}
+    if jobs == 1:
+        for performer, date in groups:
+            try:
+                results[(performer, date)] = _mix_group(root_dir, performer, date, options)
+            except Exception as e:
+                logger.error(f"結合に失敗しました: 演者={performer}, 日付={date}: {e}", exc_info=True)
+                results[(performer, date)] = _failed(performer, date)
+        return [results[group] for group in groups]
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {
+            executor.submit(_mix_group, root_dir, performer, date, options): (performer, date)
+            for performer, date in groups
+        }
+        for future in as_completed(futures):
+            performer, date = futures[future]
+            try:
+                results[(performer, date)] = future.result()
+            except Exception as e:
+                logger.error(f"結合に失敗しました: 演者={performer}, 日付={date}: {e}", exc_info=True)
+                results[(performer, date)] = _failed(performer, date)
+    return [results[group] for group in groups]
+
+
+def format_summary(results, elapsed_sec=None):
+    """結合結果の一覧表を作成する関数"""
+    header = ("演者", "日付", "長さ", "処理時間", "出力")
+    rows = []
+    for result in results:
+        duration = result["duration_sec"]
+        elapsed = result["elapsed_sec"]
+        rows.append((
+            result["performer"],
+            result["date"],
+            "-" if duration is None else f"{duration:.1f}秒",
+            "-" if elapsed is None else f"{elapsed:.1f}秒",
+            result["output"] or "失敗",
+        ))
+
+    widths = [max(len(row[i]) for row in rows + [header]) for i in range(len(header) - 1)]
+    lines = []
+    for row in [header] + rows:
+        lines.append("  ".join(cell.ljust(width) for cell, width in zip(row, widths)) + "  " + row[-1])
+    ok = sum(1 for result in results if result["output"])
+    footer = f"成功: {ok}, 失敗: {len(results) - ok}"
+    if elapsed_sec is not None:
+        footer += f", 所要時間: {elapsed_sec:.1f}秒"
+    lines.append(footer)
+    return "\n".join(lines)
+
+
+def mix_all(performers=None, date_from=None, date_to=None, jobs=None, scan=False, **options):
+    """条件に合うすべての（演者, 日付）を結合し、結果と所要時間を返す関数
+
+    scanがTrueの場合はインデックスに登録されていないテイクも演者フォルダから探して結合する。
+    """
+    started = time.monotonic()
+    groups = find_mix_groups(performers, date_from, date_to, scan=scan)
+    if not groups:
+        logger.warning("結合対象の音声ファイルが見つかりません")
+        return [], time.monotonic() - started
+    results = mix_groups(groups, jobs, scan=scan, **options)
+    return results, time.monotonic() - started
+
+
+def main():
+    """コマンドラインから実行するためのメイン関数"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="複数の演者・日付の音声をまとめて結合します")
+    parser.add_argument("--performers", help="演者名（カンマ区切り）。省略時は全演者")
+    parser.add_argument("--from", dest="date_from", help="開始日（MMDD形式）")
+    parser.add_argument("--to", dest="date_to", help="終了日（MMDD形式）")
+    parser.add_argument("--jobs", "-j", type=int, help="並列数（省略時はCPU数）")
+    parser.add_argument("--trim", action="store_true", help="各ファイルの前後の無音を除去してから結合する")
+    parser.add_argument(
+        "--scan", action="store_true", help="インデックスに登録されていないテイクも演者フォルダから探して結合する"
+    )
+    args = parser.parse_args()
+
+    performers = [p.strip() for p in args.performers.split(",") if p.strip()] if args.performers else None
+    results, elapsed = mix_all(performers, args.date_from, args.date_to, args.jobs, scan=args.scan, trim=args.trim)
+    if not results:
+        print("結合対象の音声ファイルが見つかりません")
+        sys.exit(1)
+    print(format_summary(results, elapsed))
+    sys.exit(0 if all(result["output"] for result in results) else 1)
+
+
+if __name__ == "__main__":
+    main()
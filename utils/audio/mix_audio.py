@@ -4,11 +4,15 @@
 import os
 import sys
 import glob
+import json
+import tempfile
 from datetime import datetime
 import soundfile as sf
 import numpy as np
 import xml.etree.ElementTree as ET
 from xml.dom import minidom
+from utils.audio.silence_trim import DEFAULT_PADDING_MS, DEFAULT_THRESHOLD_DB, trim_silence
+from utils.audio.take_index import TAKE_EXTENSIONS, TakeIndex, unique_takes
 from utils.logger import get_logger
 
 # ロガーの取得
@@ -17,6 +21,44 @@ logger = get_logger()
 # アプリケーションのルートディレクトリを取得
 ROOT_DIR = os.path.abspath(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
+# ファイルの間に挟む無音の長さ（秒）
+GAP_SECONDS = 0.5
+
+# ストリーミング結合で1回に読み書きするフレーム数
+BLOCK_FRAMES = 65536
+
+# サブタイプごとに変換せずに読み書きできるdtype（その他はfloat32で扱う）
+NATIVE_DTYPES = {
+    "PCM_16": "int16",
+    "PCM_32": "int32",
+    "FLOAT": "float32",
+    "DOUBLE": "float64",
+}
+
+
+# 結合ファイルには書き込まない圧縮形式（WAVに展開して結合する）
+COMPRESSED_FORMATS = ("FLAC", "OGG")
+
+# 結合済みファイルのマニフェストの形式
+MANIFEST_VERSION = 1
+
+
+def native_dtype(subtype):
+    """サブタイプに対応するdtypeを返す関数（PCM16ならint16）"""
+    return NATIVE_DTYPES.get(subtype, "float32")
+
+
+def mix_format(info):
+    """結合ファイルのフォーマットとサブタイプを返す関数
+
+    圧縮形式（FLAC・Opus）のファイルはWAVに展開して結合する。
+    WAVで扱えないサブタイプ（Opusなど）はPCM16とする。
+    """
+    if info.format not in COMPRESSED_FORMATS:
+        return info.format, info.subtype
+    subtype = info.subtype if sf.check_format("WAV", info.subtype) else "PCM_16"
+    return "WAV", subtype
+
 
 def generate_premiere_xml(input_file, output_xml):
     """Premiere Pro用のXMLファイルを生成する関数
@@ -78,12 +120,169 @@ def generate_premiere_xml(input_file, output_xml):
         return None
 
 
-def process_audio(performer, date=None):
+def join_with_gaps(takes, gap_samples):
+    """音声データの間に無音を挟んで1つにつなげる関数
+
+    出力はまとめて1回だけ確保し、各サンプルのコピーは1回で済ませる。
+    無音は1つだけ作成して使い回す。
+
+    Args:
+        takes (list): 音声データ（np.ndarray）のリスト
+        gap_samples (int): 間に挟む無音のサンプル数
+
+    Returns:
+        np.ndarray: つなげた音声データ
+    """
+    if not takes:
+        return None
+    first = takes[0]
+    silence = np.zeros((gap_samples,) + first.shape[1:], dtype=first.dtype)
+    pieces = [first]
+    for audio_data in takes[1:]:
+        pieces.append(silence)
+        pieces.append(audio_data)
+    return np.concatenate(pieces)
+
+
+def write_streaming(
+    files,
+    output_path,
+    trim=False,
+    threshold_db=DEFAULT_THRESHOLD_DB,
+    padding_ms=DEFAULT_PADDING_MS,
+    append=False,
+):
+    """ファイルを一定サイズのブロックごとに出力ファイルへコピーして結合する関数
+
+    出力ファイルは1回だけ開き、ファイルの間には無音を書き込む。
+    append=Trueの場合は既存の出力ファイルの末尾に無音を挟んで追記し、ヘッダーのサイズを更新する。
+    メモリに保持するのは1ブロック分（無音の除去を行う場合は1テイク分）だけのため、
+    結合する音声の長さによらず使用メモリは一定になる。
+    読み込み・無音・書き込みはすべて最初のファイルのサブタイプ（PCM16ならint16）のまま行う。
+    FLAC・Opusのファイルも読み込めるが、出力はWAVに展開する（mix_format）。
+
+    Args:
+        files (list): 結合するファイルのリスト
+        output_path (str): 出力ファイルのパス
+        trim (bool, optional): Trueの場合、各ファイルの前後の無音を除去する
+        threshold_db (float, optional): 無音と判定する音量（dBFS）
+        padding_ms (int, optional): 声の前後に残す余白（ミリ秒）
+        append (bool, optional): Trueの場合、既存の出力ファイルに追記する
+
+    Returns:
+        int: 出力ファイル全体のフレーム数
+    """
+    first = sf.info(output_path if append else files[0])
+    sample_rate, channels = first.samplerate, first.channels
+    output_format, subtype = mix_format(first)
+    dtype = native_dtype(subtype)
+    gap_shape = (int(GAP_SECONDS * sample_rate),) if channels == 1 else (int(GAP_SECONDS * sample_rate), channels)
+    silence = np.zeros(gap_shape, dtype=dtype)
+
+    if append:
+        output_file = sf.SoundFile(output_path, "r+")
+        output_file.seek(0, sf.SEEK_END)
+    else:
+        output_file = sf.SoundFile(
+            output_path, "w", samplerate=sample_rate, channels=channels, subtype=subtype, format=output_format
+        )
+    with output_file as output:
+        for i, file in enumerate(files):
+            if i > 0 or append:
+                output.write(silence)
+            if trim:
+                # 無音の範囲を求めるため、1テイク分だけ読み込む
+                audio_data, sr = sf.read(file, dtype=dtype)
+                output.write(trim_silence(audio_data, sr, threshold_db, padding_ms))
+            else:
+                for block in sf.blocks(file, blocksize=BLOCK_FRAMES, dtype=dtype):
+                    output.write(block)
+            logger.info(f"ファイル結合({i + 1}/{len(files)}): {os.path.basename(file)}")
+        return output.frames
+
+
+def _file_entry(path):
+    """マニフェストに記録するファイルの情報（名前・サイズ・更新日時）"""
+    stat = os.stat(path)
+    return {"name": os.path.basename(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def load_mix_manifest(manifest_path):
+    """結合済みファイルのマニフェストを読み込む関数（存在しない・読めない場合はNone）"""
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def save_mix_manifest(manifest_path, output_path, files, settings):
+    """結合済みファイルのマニフェストを保存する関数"""
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "settings": settings,
+        "output": _file_entry(output_path),
+        "files": [_file_entry(file) for file in files],
+    }
+    # 書き込み途中のマニフェストを読まないよう、一時ファイルに書いてから置き換える
+    fd, temp_path = tempfile.mkstemp(suffix=".json", dir=os.path.dirname(manifest_path))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, manifest_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def _mixed_count(manifest, files, settings, output_path):
+    """既存の結合ファイルに含まれているファイル数を返す関数
+
+    結合ファイルが現在のファイル一覧の先頭部分だけから作られていて、
+    その後変更されていない場合に限り、追記で更新できる。
+
+    Returns:
+        int: 結合済みのファイル数。作り直しが必要な場合はNone
+    """
+    if not manifest or manifest.get("settings") != settings:
+        return None
+    if not os.path.exists(output_path) or manifest.get("output") != _file_entry(output_path):
+        return None
+    mixed = manifest.get("files") or []
+    if len(mixed) > len(files):
+        return None
+    if [_file_entry(file) for file in files[:len(mixed)]] != mixed:
+        return None
+    return len(mixed)
+
+
+def process_audio(
+    performer,
+    date=None,
+    trim=False,
+    threshold_db=DEFAULT_THRESHOLD_DB,
+    padding_ms=DEFAULT_PADDING_MS,
+    streaming=True,
+    scan=False,
+):
     """音声ファイルを処理する関数
 
     Args:
         performer (str): 演者名（フォルダ名）
         date (str, optional): 日付（MMDD形式、例: 0330）。デフォルトは現在の日付。
+        trim (bool, optional): Trueの場合、各ファイルの前後の無音を除去してから結合する
+        threshold_db (float, optional): 無音と判定する音量（dBFS）
+        padding_ms (int, optional): 声の前後に残す余白（ミリ秒）
+        streaming (bool, optional): Trueの場合、ブロックごとに読み書きして使用メモリを一定に保つ。
+            結合ファイルの横にマニフェスト（結合したファイルのサイズ・更新日時）を保存し、
+            前回からファイルが追加されただけの場合は新しいファイルだけを追記する。
+            Falseの場合はすべてのファイルをメモリに読み込んでから結合する
+        scan (bool, optional): Trueの場合、テイクのインデックスがあっても演者ディレクトリを検索し、
+            インデックスに登録されていないファイルも結合する
 
     Returns:
         str: 結合された音声ファイルのパス。失敗した場合はNone。
@@ -113,9 +312,16 @@ def process_audio(performer, date=None):
             logger.error(f"演者ディレクトリが見つかりません: {performer_dir}")
             return None
 
-        # 指定した日付のファイルを検索
-        pattern = os.path.join(performer_dir, f"{performer}_{date}_*.wav")
-        files = sorted(glob.glob(pattern))
+        # 指定した日付のファイルをテイクのインデックスから検索
+        # （インデックスがない・登録がない場合とscanを指定した場合は演者ディレクトリも検索する）
+        pattern = os.path.join(performer_dir, f"{performer}_{date}_*")
+        index = TakeIndex.for_root(ROOT_DIR)
+        files = index.paths(performer, date) if index.exists() else []
+        if scan or not files:
+            files += [os.path.normpath(file) for file in glob.glob(pattern) if file.endswith(TAKE_EXTENSIONS)]
+        # 圧縮形式へ変換中のテイクはWAVと変換後のファイルの両方が見つかるため、1つにまとめる
+        # ファイル名（<演者名>_<MMDD>_<時刻>）の順が保存順になる
+        files = sorted(unique_takes(files), key=lambda file: (os.path.basename(file), file))
 
         if not files:
             logger.error(f"結合対象のファイルが見つかりません: {pattern}")
@@ -132,39 +338,46 @@ def process_audio(performer, date=None):
         output_filename = f"{performer}_{date}-mixed.wav"
         output_path = os.path.join(output_dir, output_filename)
 
-        # すべてのファイルを結合
-        combined = None
-        sample_rate = None
-
-        for i, file in enumerate(files):
-            # 音声ファイルを読み込む
-            audio_data, sr = sf.read(file)
-
-            # 最初のファイルの場合
-            if combined is None:
-                combined = audio_data
-                sample_rate = sr
-                logger.info(
-                    f"ファイル読み込み({i + 1}/{len(files)}): {os.path.basename(file)}"
-                )
-                continue
-
-            # 無音を生成（形状を合わせる）
-            silence_duration = 0.5  # 0.5秒の無音
-            silence_samples = int(silence_duration * sample_rate)
-
-            # 音声データの形状を取得
-            if len(audio_data.shape) == 1:  # モノラル
-                silence = np.zeros(silence_samples)
-            else:  # ステレオまたはマルチチャンネル
-                silence = np.zeros((silence_samples, audio_data.shape[1]))
-
-            # 無音と音声を結合
-            combined = np.concatenate([combined, silence, audio_data])
-            logger.info(f"ファイル結合({i + 1}/{len(files)}): {os.path.basename(file)}")
-
-        # 結合したファイルを保存
-        sf.write(output_path, combined, sample_rate)
+        if streaming:
+            manifest_path = os.path.splitext(output_path)[0] + ".json"
+            settings = {
+                "trim": trim,
+                "threshold_db": threshold_db,
+                "padding_ms": padding_ms,
+                "gap_seconds": GAP_SECONDS,
+            }
+            mixed_count = _mixed_count(load_mix_manifest(manifest_path), files, settings, output_path)
+            if mixed_count is None:
+                write_streaming(files, output_path, trim, threshold_db, padding_ms)
+            elif mixed_count < len(files):
+                logger.info(f"前回の結合以降に追加された{len(files) - mixed_count}ファイルを追記します")
+                write_streaming(files[mixed_count:], output_path, trim, threshold_db, padding_ms, append=True)
+            else:
+                logger.info("前回の結合から変更はありません")
+            save_mix_manifest(manifest_path, output_path, files, settings)
+        else:
+            # すべてのファイルを読み込んでから、最後に1回だけ結合する
+            # （最初のファイルのサブタイプのまま読み書きし、float64へ変換しない）
+            output_format, subtype = mix_format(sf.info(files[0]))
+            dtype = native_dtype(subtype)
+            takes = []
+            sample_rate = None
+
+            for i, file in enumerate(files):
+                # 音声ファイルを読み込む
+                audio_data, sr = sf.read(file, dtype=dtype)
+                if trim:
+                    audio_data = trim_silence(audio_data, sr, threshold_db, padding_ms)
+                if sample_rate is None:
+                    sample_rate = sr
+                takes.append(audio_data)
+                logger.info(f"ファイル読み込み({i + 1}/{len(files)}): {os.path.basename(file)}")
+
+            # ファイルの間に0.5秒の無音を挟んで結合
+            combined = join_with_gaps(takes, int(GAP_SECONDS * sample_rate))
+
+            # 結合したファイルを保存
+            sf.write(output_path, combined, sample_rate, subtype=subtype, format=output_format)
         logger.info(f"結合ファイルを保存しました: {output_path}")
 
         # XMLファイルを生成
@@ -190,11 +403,32 @@ def main():
     parser = argparse.ArgumentParser(description="音声ファイルを結合して処理します")
     parser.add_argument("performer", help="演者名（フォルダ名）")
     parser.add_argument("--date", "-d", help="日付（MMDD形式、例: 0330）")
+    parser.add_argument("--trim", action="store_true", help="各ファイルの前後の無音を除去してから結合する")
+    parser.add_argument(
+        "--in-memory", action="store_true", help="すべてのファイルをメモリに読み込んでから結合する（従来の方法）"
+    )
+    parser.add_argument(
+        "--silence-threshold", type=float, default=DEFAULT_THRESHOLD_DB, help="無音と判定する音量（dBFS）"
+    )
+    parser.add_argument(
+        "--silence-padding", type=int, default=DEFAULT_PADDING_MS, help="声の前後に残す余白（ミリ秒）"
+    )
+    parser.add_argument(
+        "--scan", action="store_true", help="インデックスに登録されていないファイルも演者フォルダから探して結合する"
+    )
 
     args = parser.parse_args()
 
     # 音声処理を実行
-    output_file = process_audio(args.performer, args.date)
+    output_file = process_audio(
+        args.performer,
+        args.date,
+        args.trim,
+        args.silence_threshold,
+        args.silence_padding,
+        streaming=not args.in_memory,
+        scan=args.scan,
+    )
 
     if output_file:
         print(f"処理が完了しました: {output_file}")
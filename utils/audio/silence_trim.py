@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import numpy as np
+import soundfile as sf
+from utils.logger import get_logger
+
+# ロガーの取得
+logger = get_logger()
+
+# 無音と判定する音量（dBFS）。フレームのRMSがこれ以下なら無音とする
+DEFAULT_THRESHOLD_DB = -45.0
+# 声の前後に残す余白（ミリ秒）
+DEFAULT_PADDING_MS = 100
+# RMSを計算するフレームの長さ（ミリ秒）
+FRAME_MS = 10
+# ファイルから声の範囲を探すときに1回に読み込む長さ（ミリ秒、FRAME_MSの倍数）
+BLOCK_MS = 1000
+
+
+def _frame_energy(data, frame):
+    """フレームごとの平均二乗値を返す（dataは-1.0〜1.0に正規化した2次元配列）
+
+    端数のフレームは末尾を0で埋めて同じ長さで扱う。
+    """
+    length = len(data)
+    n_frames = -(-length // frame)
+    padded = np.zeros((n_frames * frame, data.shape[1]), dtype=np.float32)
+    padded[:length] = data
+    return np.einsum("ij,ij->i", padded, padded).reshape(n_frames, frame).mean(axis=1) / data.shape[1]
+
+
+def find_voiced_range(samples, samplerate, threshold_db=DEFAULT_THRESHOLD_DB, padding_ms=DEFAULT_PADDING_MS):
+    """声が入っている範囲（前後の余白を含む）をサンプル位置で返す
+
+    フレームごとのRMSをまとめて計算し、閾値を超える最初と最後のフレームを探す。
+
+    Args:
+        samples (np.ndarray): 音声データ（int16またはfloat、モノラルまたは多チャンネル）
+        samplerate (int): サンプルレート
+        threshold_db (float): 無音と判定する音量（dBFS）
+        padding_ms (int): 声の前後に残す余白（ミリ秒）
+
+    Returns:
+        tuple: (開始位置, 終了位置)。全体が無音の場合はNone
+    """
+    length = len(samples)
+    if length == 0:
+        return None
+    frame = max(1, int(samplerate * FRAME_MS / 1000))
+
+    data = samples.reshape(length, -1)
+    if np.issubdtype(samples.dtype, np.integer):
+        data = data.astype(np.float32) / 32768.0
+    mean_square = _frame_energy(data, frame)
+
+    threshold = 10 ** (threshold_db / 10)
+    voiced = np.flatnonzero(mean_square > threshold)
+    if len(voiced) == 0:
+        return None
+
+    padding = int(samplerate * padding_ms / 1000)
+    start = max(0, voiced[0] * frame - padding)
+    end = min(length, (voiced[-1] + 1) * frame + padding)
+    return start, end
+
+
+def trim_silence(samples, samplerate, threshold_db=DEFAULT_THRESHOLD_DB, padding_ms=DEFAULT_PADDING_MS):
+    """前後の無音を取り除いた音声データ（コピーせずに範囲を切り出す）を返す
+
+    全体が無音の場合は元のデータをそのまま返す。
+    """
+    voiced_range = find_voiced_range(samples, samplerate, threshold_db, padding_ms)
+    if voiced_range is None:
+        return samples
+    start, end = voiced_range
+    return samples[start:end]
+
+
+def find_voiced_range_in_file(path, threshold_db=DEFAULT_THRESHOLD_DB, padding_ms=DEFAULT_PADDING_MS):
+    """音声ファイルの声が入っている範囲をサンプル位置で返す（find_voiced_rangeと同じ結果）
+
+    ファイル全体は読み込まず、先頭から声が見つかるまで、末尾から声が見つかるまでを
+    一定の長さのブロックごとに読み込む。
+
+    Returns:
+        tuple: (開始位置, 終了位置, 全体のフレーム数)。全体が無音の場合はNone
+    """
+    threshold = 10 ** (threshold_db / 10)
+    with sf.SoundFile(path) as f:
+        samplerate, length = f.samplerate, f.frames
+        frame = max(1, int(samplerate * FRAME_MS / 1000))
+        # ブロックの境界をフレームの境界に揃える
+        block = frame * max(1, BLOCK_MS // FRAME_MS)
+
+        def voiced_frames(start):
+            f.seek(start)
+            data = f.read(min(block, length - start), dtype="float32", always_2d=True)
+            return np.flatnonzero(_frame_energy(data, frame) > threshold)
+
+        first = None
+        for start in range(0, length, block):
+            voiced = voiced_frames(start)
+            if len(voiced):
+                first = start // frame + voiced[0]
+                break
+        if first is None:
+            return None
+
+        last = first
+        # 声の終わりが最初の声と同じブロックにある場合もあるため、そのブロックまで探す
+        for start in range((length - 1) // block * block, first * frame // block * block - 1, -block):
+            voiced = voiced_frames(start)
+            if len(voiced):
+                last = start // frame + voiced[-1]
+                break
+
+    padding = int(samplerate * padding_ms / 1000)
+    start = max(0, first * frame - padding)
+    end = min(length, (last + 1) * frame + padding)
+    return start, end, length
+
+
+def copy_range(input_path, output_path, start, end, block_frames=65536):
+    """音声ファイルの一部（start〜endのサンプル）を同じ形式で書き出す
+
+    一定サイズのブロックごとに読み書きし、PCM16のファイルは変換せずにそのまま書き出す。
+    """
+    with sf.SoundFile(input_path) as src:
+        dtype = "int16" if src.subtype == "PCM_16" else "float32"
+        with sf.SoundFile(
+            output_path,
+            "w",
+            samplerate=src.samplerate,
+            channels=src.channels,
+            subtype=src.subtype,
+            format=src.format,
+        ) as dst:
+            src.seek(start)
+            remaining = end - start
+            while remaining > 0:
+                block = src.read(min(block_frames, remaining), dtype=dtype)
+                if len(block) == 0:
+                    break
+                dst.write(block)
+                remaining -= len(block)
+
+
+def trim_file(input_path, output_path=None, threshold_db=DEFAULT_THRESHOLD_DB, padding_ms=DEFAULT_PADDING_MS):
+    """音声ファイルの前後の無音を取り除く
+
+    声の範囲はブロックごとに探し、その範囲だけを書き出す。
+    PCM16のファイルは変換せずにそのまま切り出すため、残った部分は元のデータと一致する。
+
+    Args:
+        input_path (str): 入力ファイル
+        output_path (str, optional): 出力ファイル。省略時は入力ファイルを上書きする
+        threshold_db (float): 無音と判定する音量（dBFS）
+        padding_ms (int): 声の前後に残す余白（ミリ秒）
+
+    Returns:
+        int: 取り除いたサンプル数
+    """
+    output_path = output_path or input_path
+    voiced_range = find_voiced_range_in_file(input_path, threshold_db, padding_ms)
+    if voiced_range is None:
+        start, end = 0, sf.info(input_path).frames
+        removed = 0
+    else:
+        start, end, length = voiced_range
+        removed = length - (end - start)
+    if removed == 0 and output_path == input_path:
+        return 0
+    if output_path == input_path:
+        # 読み込み中のファイルには書き込めないため、別のファイルに書き出してから置き換える
+        temp_path = output_path + ".trim"
+        try:
+            copy_range(input_path, temp_path, start, end)
+            os.replace(temp_path, output_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+    else:
+        copy_range(input_path, output_path, start, end)
+    if removed:
+        logger.info(f"前後の無音を除去しました: {removed / sf.info(output_path).samplerate:.2f}秒 ({output_path})")
+    return removed
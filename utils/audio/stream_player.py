@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import threading
+import numpy as np
+import sounddevice as sd
+from utils.logger import get_logger
+
+# ロガーの取得
+logger = get_logger()
+
+
+class PcmRingBuffer:
+    """PCM16サンプルを保持するリングバッファ
+
+    受信は再生より速いことが多いため、容量が足りない場合は拡張する。
+    """
+
+    def __init__(self, capacity):
+        self._buffer = np.zeros(capacity, dtype=np.int16)
+        self._read_pos = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def capacity(self):
+        return len(self._buffer)
+
+    def write(self, samples):
+        """サンプルを書き込む"""
+        n = len(samples)
+        if self._size + n > self.capacity:
+            self._grow(self._size + n)
+
+        capacity = self.capacity
+        write_pos = (self._read_pos + self._size) % capacity
+        first = min(n, capacity - write_pos)
+        self._buffer[write_pos:write_pos + first] = samples[:first]
+        self._buffer[:n - first] = samples[first:]
+        self._size += n
+
+    def read_into(self, out):
+        """outにサンプルを読み出し、読み出したサンプル数を返す"""
+        n = min(len(out), self._size)
+        capacity = self.capacity
+        first = min(n, capacity - self._read_pos)
+        out[:first] = self._buffer[self._read_pos:self._read_pos + first]
+        out[first:n] = self._buffer[:n - first]
+        self._read_pos = (self._read_pos + n) % capacity
+        self._size -= n
+        return n
+
+    def _grow(self, needed):
+        new_buffer = np.zeros(max(needed, self.capacity * 2), dtype=np.int16)
+        size = self._size
+        self.read_into(new_buffer[:size])
+        self._buffer = new_buffer
+        self._read_pos = 0
+        self._size = size
+
+
+class StreamingPlayer:
+    """受信中の音声をリングバッファ経由で再生するプレイヤー
+
+    最初の音声を受信してからprebuffer_ms分たまった時点で再生を開始する。
+    再生中にバッファが空になった場合は、再びprebuffer_ms分たまるまで無音を出力する。
+    """
+
+    def __init__(self, samplerate=24000, prebuffer_ms=200, on_start=None):
+        self.samplerate = samplerate
+        self.on_start = on_start
+        self.prebuffer_samples = int(samplerate * prebuffer_ms / 1000)
+        self.underruns = 0
+        self._ring = PcmRingBuffer(samplerate * 10)
+        self._lock = threading.Lock()
+        self._carry = b""
+        self._buffering = True
+        self._finished = False
+        self._stopped = False
+        self._stream = None
+        self._drained = threading.Event()
+
+    @property
+    def is_playing(self):
+        """再生中かどうか"""
+        return self._stream is not None and not self._drained.is_set()
+
+    def feed(self, pcm: bytes):
+        """受信したPCM16データを追加する"""
+        if self._stopped:
+            return
+        # 奇数バイトで分割された場合は次のチャンクに持ち越す
+        if self._carry:
+            pcm = self._carry + pcm
+            self._carry = b""
+        if len(pcm) % 2:
+            pcm, self._carry = pcm[:-1], pcm[-1:]
+
+        with self._lock:
+            self._ring.write(np.frombuffer(pcm, dtype=np.int16))
+            if self._buffering and len(self._ring) >= self.prebuffer_samples:
+                self._buffering = False
+            ready = not self._buffering
+
+        if ready and self._stream is None:
+            self._start_stream()
+
+    def finish(self):
+        """受信完了を通知する（残りのバッファを再生し終えると停止する）"""
+        with self._lock:
+            self._finished = True
+            self._buffering = False
+            has_audio = len(self._ring) > 0
+
+        if self._stream is None:
+            if has_audio and not self._stopped:
+                self._start_stream()
+            else:
+                self._drained.set()
+
+    def wait(self, timeout=None):
+        """再生が終わるまで待機する"""
+        return self._drained.wait(timeout)
+
+    def stop(self):
+        """再生を中断する"""
+        self._stopped = True
+        stream = self._stream
+        if stream is not None:
+            try:
+                stream.stop()
+                stream.close()
+            except Exception as e:
+                logger.warning(f"ストリーミング再生の停止に失敗: {e}")
+        self._drained.set()
+
+    def _start_stream(self):
+        logger.info("ストリーミング再生を開始します")
+        self._stream = sd.OutputStream(
+            samplerate=self.samplerate,
+            channels=1,
+            dtype="int16",
+            callback=self._callback,
+            finished_callback=self._drained.set,
+        )
+        self._stream.start()
+        if self.on_start:
+            self.on_start()
+
+    def _callback(self, outdata, frames, time_info, status):
+        out = outdata[:, 0]
+        with self._lock:
+            n = 0 if self._buffering else self._ring.read_into(out)
+            if n < frames:
+                out[n:] = 0
+                if self._finished:
+                    raise sd.CallbackStop
+                # バッファ切れ（ジッター）の場合は再度プリバッファする
+                if not self._buffering:
+                    self.underruns += 1
+                    self._buffering = True
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import soundfile as sf
+from utils.logger import get_logger
+
+# ロガーの取得
+logger = get_logger()
+
+# 保存形式ごとのフォーマット・サブタイプ・拡張子（wavはエンコードしない）
+ENCODINGS = {
+    "flac": {"format": "FLAC", "subtype": "PCM_16", "extension": ".flac"},
+    "opus": {"format": "OGG", "subtype": "OPUS", "extension": ".opus"},
+}
+OUTPUT_FORMATS = ("wav",) + tuple(ENCODINGS)
+
+# 1回に読み込んでエンコードするフレーム数
+BLOCK_FRAMES = 65536
+
+
+def encoded_path(path: str, encoding: str) -> str:
+    """変換後のファイルのパス"""
+    return os.path.splitext(path)[0] + ENCODINGS[encoding]["extension"]
+
+
+def encode_take(path: str, encoding: str) -> str:
+    """WAVファイルを圧縮形式に変換する（元のファイルは残す）
+
+    一定サイズのブロックごとに読み書きし、書き込み途中のファイルを
+    読まれないよう一時ファイルに書いてから置き換える。
+    一時ファイルは通常のファイルと同じ権限（umaskに従う）で作成する。
+
+    Args:
+        path (str): 変換するWAVファイル
+        encoding (str): 保存形式（flac / opus）
+
+    Returns:
+        str: 変換したファイルのパス
+    """
+    spec = ENCODINGS[encoding]
+    info = sf.info(path)
+    output_path = encoded_path(path, encoding)
+    # 結合・インデックスの対象にならない名前で書き込む（プロセス・スレッドごとに別の名前にする）
+    temp_path = f"{output_path}.{os.getpid()}-{threading.get_ident()}.part"
+    try:
+        with sf.SoundFile(
+            temp_path,
+            "w",
+            samplerate=info.samplerate,
+            channels=info.channels,
+            format=spec["format"],
+            subtype=spec["subtype"],
+        ) as output:
+            for block in sf.blocks(path, blocksize=BLOCK_FRAMES, dtype="int16"):
+                output.write(block)
+        os.replace(temp_path, output_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return output_path
+
+
+class TakeEncoder:
+    """保存したテイクをバックグラウンドで圧縮形式に変換するワーカープール
+
+    変換が終わると on_encoded(元のパス, 変換後のパス) を呼び出してから元のWAVを削除する。
+    変換に失敗した場合はWAVのまま残す（WAVを削除できなかった場合も変換は成功とする）。
+    """
+
+    def __init__(self, max_workers: int = 2):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="take-encoder")
+
+    def submit(self, path: str, encoding: str, on_encoded=None):
+        """変換を依頼する（変換の完了は待たない）
+
+        Args:
+            path (str): 変換するWAVファイル
+            encoding (str): 保存形式（flac / opus）
+            on_encoded (callable, optional): 元のWAVを削除する前に呼び出すコールバック
+
+        Returns:
+            concurrent.futures.Future: 変換後のパス（失敗した場合はNone）を返すFuture
+        """
+        if encoding not in ENCODINGS:
+            raise ValueError(f"対応していない保存形式です: {encoding}")
+        return self._executor.submit(self._encode, path, encoding, on_encoded)
+
+    def _encode(self, path: str, encoding: str, on_encoded=None):
+        try:
+            output_path = encode_take(path, encoding)
+        except Exception as e:
+            logger.error(f"テイクの変換に失敗したため、WAVのまま残します: {path}: {e}", exc_info=True)
+            return None
+        try:
+            if on_encoded:
+                on_encoded(path, output_path)
+        except Exception as e:
+            logger.warning(f"変換後の処理に失敗しました: {e}")
+        try:
+            os.remove(path)
+        except OSError as e:
+            # 残ったWAVは結合・インデックスの走査で変換後のファイルと同じテイクとして扱う
+            logger.warning(f"変換前のWAVを削除できませんでした: {path}: {e}")
+        logger.info(f"テイクを{encoding}に変換しました: {output_path}")
+        return output_path
+
+    def shutdown(self, wait: bool = True):
+        """ワーカーを終了する（wait=Trueの場合は依頼済みの変換が終わるまで待つ）"""
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,400 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import re
+import sqlite3
+import contextlib
+from datetime import datetime
+import soundfile as sf
+from utils.logger import get_logger
+
+# ロガーの取得
+logger = get_logger()
+
+# 保存先ディレクトリ（演者フォルダの親）に作成するインデックスのファイル名
+INDEX_FILENAME = "takes.sqlite3"
+
+# 保存した音声ファイルの拡張子（WAVと、バックグラウンドで変換した圧縮形式）
+TAKE_EXTENSIONS = (".wav", ".flac", ".opus")
+
+# 保存した音声ファイル名（<演者名>_<MMDD>_<時刻>.<拡張子>）から日付を取り出すパターン
+TAKE_PATTERN = r"_(\d{4})_.+\.(?:wav|flac|opus)$"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS takes (
+    path TEXT PRIMARY KEY,
+    actor TEXT NOT NULL,
+    date TEXT NOT NULL,
+    recorded_at TEXT NOT NULL,
+    duration REAL,
+    samplerate INTEGER,
+    system_prompt TEXT NOT NULL DEFAULT '',
+    acting_prompt TEXT NOT NULL DEFAULT '',
+    text TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS takes_actor_date ON takes (actor, date);
+CREATE INDEX IF NOT EXISTS takes_recorded_at ON takes (recorded_at);
+"""
+
+
+def unique_takes(paths):
+    """同じテイク（拡張子を除いたパスが同じ）のファイルを1つにまとめる
+
+    圧縮形式への変換中は元のWAVと変換後のファイルが両方存在するため、
+    まもなく削除されるWAVではなく変換後のファイルを残す。
+
+    Args:
+        paths (iterable): 音声ファイルのパス
+
+    Returns:
+        list: テイクごとに1つにまとめたパス（最初に現れた順）
+    """
+    takes = {}
+    for path in paths:
+        stem = os.path.splitext(path)[0]
+        if stem not in takes or takes[stem].endswith(".wav"):
+            takes[stem] = path
+    return list(takes.values())
+
+
+def scan_takes(root_dir, performers=None):
+    """演者フォルダを走査し、保存済みの音声ファイルを返す
+
+    同じテイクのWAVと変換後のファイルが両方ある場合は変換後のファイルだけを返す。
+
+    Args:
+        root_dir (str): 演者フォルダのあるディレクトリ
+        performers (list, optional): 対象の演者名。省略時はすべての演者フォルダ
+
+    Yields:
+        tuple: (演者名, 日付（MMDD）, ファイルパス)
+    """
+    if performers is None:
+        with os.scandir(root_dir) as entries:
+            performers = [entry.name for entry in entries if entry.is_dir() and not entry.name.startswith(".")]
+
+    for performer in performers:
+        performer_dir = os.path.join(root_dir, performer)
+        if not os.path.isdir(performer_dir):
+            logger.warning(f"演者ディレクトリが見つかりません: {performer_dir}")
+            continue
+        pattern = re.compile(re.escape(performer) + TAKE_PATTERN)
+        dates = {}
+        with os.scandir(performer_dir) as entries:
+            for entry in entries:
+                match = pattern.match(entry.name)
+                if match and entry.is_file():
+                    dates[entry.path] = match.group(1)
+        for path in unique_takes(dates):
+            yield performer, dates[path], path
+
+
+def date_condition(date_from=None, date_to=None):
+    """日付（MMDD）の範囲のSQL条件と引数を返す（date_fromがdate_toより後の場合は年をまたぐ範囲とする）"""
+    if date_from and date_to and date_from > date_to:
+        return "(date >= ? OR date <= ?)", [date_from, date_to]
+    conditions, params = [], []
+    if date_from:
+        conditions.append("date >= ?")
+        params.append(date_from)
+    if date_to:
+        conditions.append("date <= ?")
+        params.append(date_to)
+    return " AND ".join(conditions), params
+
+
+class TakeIndex:
+    """保存したテイクを記録するSQLiteのインデックス
+
+    パスは保存先ディレクトリ（インデックスと同じ場所）からの相対パスで記録し、
+    フォルダごと移動してもそのまま使えるようにする。
+    接続は操作ごとに開き直すため、複数のスレッド・プロセスから使用できる。
+    インデックスのファイルを新しく作成した場合は、それまでに保存されていたテイクを走査して登録する。
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.root_dir = os.path.dirname(os.path.abspath(db_path))
+        self._initialized = False
+
+    @classmethod
+    def for_root(cls, root_dir: str):
+        """保存先ディレクトリのインデックス"""
+        return cls(os.path.join(root_dir, INDEX_FILENAME))
+
+    def exists(self) -> bool:
+        """インデックスのファイルが作成済みかどうか"""
+        return os.path.exists(self.db_path)
+
+    @contextlib.contextmanager
+    def _connect(self):
+        """接続を開き、ブロックを抜けるときにコミットして閉じる"""
+        if not self._initialized:
+            self._initialize()
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _initialize(self):
+        """テーブルを作成する（インデックスを新しく作成した場合は既存のテイクを登録する）"""
+        created = not self.exists()
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            # 書き込み中も結合処理などから読み込めるようにする
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+        self._initialized = True
+        if created:
+            logger.info(f"テイクのインデックスを作成しました。保存済みのテイクを登録します: {self.db_path}")
+            self.rebuild()
+
+    def _key(self, path: str) -> str:
+        path = os.path.abspath(path)
+        relative = os.path.relpath(path, self.root_dir)
+        if relative.startswith(os.pardir):
+            # 保存先ディレクトリの外のファイル（権限エラー時の保存先など）は絶対パスで記録する
+            return path
+        return relative
+
+    def _path(self, key: str) -> str:
+        return os.path.normpath(os.path.join(self.root_dir, key))
+
+    def _row(self, row) -> dict:
+        take = dict(row)
+        take["path"] = self._path(take["path"])
+        return take
+
+    def add(
+        self,
+        path: str,
+        actor: str,
+        recorded_at: datetime = None,
+        date: str = None,
+        duration: float = None,
+        samplerate: int = None,
+        system_prompt: str = "",
+        acting_prompt: str = "",
+        text: str = "",
+    ):
+        """テイクを登録する（同じパスが登録済みの場合は上書きする）
+
+        Args:
+            path (str): 音声ファイルのパス
+            actor (str): 演者名
+            recorded_at (datetime, optional): 保存日時。省略時は現在時刻
+            date (str, optional): 結合に使う日付（MMDD形式）。省略時はrecorded_atの日付
+            duration (float, optional): 長さ（秒）。省略時はファイルから取得
+            samplerate (int, optional): サンプルレート。省略時はファイルから取得
+            system_prompt (str): システムプロンプト
+            acting_prompt (str): 演技指導
+            text (str): セリフ
+        """
+        recorded_at = recorded_at or datetime.now()
+        if duration is None or samplerate is None:
+            info = sf.info(path)
+            duration, samplerate = info.duration, info.samplerate
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO takes "
+                "(path, actor, date, recorded_at, duration, samplerate, system_prompt, acting_prompt, text) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self._key(path),
+                    actor,
+                    date or recorded_at.strftime("%m%d"),
+                    recorded_at.isoformat(timespec="seconds"),
+                    duration,
+                    samplerate,
+                    system_prompt or "",
+                    acting_prompt or "",
+                    text or "",
+                ),
+            )
+
+    def move(self, old_path: str, new_path: str):
+        """登録済みのテイクのパスを変更する（圧縮形式に変換した場合など）"""
+        with self._connect() as conn:
+            conn.execute("UPDATE takes SET path = ? WHERE path = ?", (self._key(new_path), self._key(old_path)))
+
+    def remove(self, path: str):
+        """テイクの登録を削除する"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM takes WHERE path = ?", (self._key(path),))
+
+    def find(
+        self,
+        actor: str = None,
+        date: str = None,
+        date_from: str = None,
+        date_to: str = None,
+        text: str = None,
+        min_duration: float = None,
+        max_duration: float = None,
+        limit: int = None,
+    ) -> list:
+        """条件に合うテイクをファイル名順（保存順）に返す
+
+        textはセリフ・演技指導の部分一致で検索する。
+
+        Returns:
+            list: テイクの情報（path, actor, date, recorded_at, duration, samplerate,
+                system_prompt, acting_prompt, text）の辞書のリスト
+        """
+        conditions, params = [], []
+        if actor:
+            conditions.append("actor = ?")
+            params.append(actor)
+        if date:
+            conditions.append("date = ?")
+            params.append(date)
+        range_condition, range_params = date_condition(date_from, date_to)
+        if range_condition:
+            conditions.append(range_condition)
+            params.extend(range_params)
+        if text:
+            escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            conditions.append("(text LIKE ? ESCAPE '\\' OR acting_prompt LIKE ? ESCAPE '\\')")
+            params.extend([f"%{escaped}%"] * 2)
+        if min_duration is not None:
+            conditions.append("duration >= ?")
+            params.append(min_duration)
+        if max_duration is not None:
+            conditions.append("duration <= ?")
+            params.append(max_duration)
+
+        query = "SELECT * FROM takes"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY path"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._connect() as conn:
+            return [self._row(row) for row in conn.execute(query, params)]
+
+    def paths(self, actor: str, date: str) -> list:
+        """演者・日付のテイクのうち、ファイルが存在するもののパスを保存順に返す"""
+        paths = []
+        for take in self.find(actor=actor, date=date):
+            if os.path.exists(take["path"]):
+                paths.append(take["path"])
+            else:
+                logger.warning(f"インデックスに登録されたファイルが見つかりません: {take['path']}")
+        return paths
+
+    def groups(self, actors: list = None, date_from: str = None, date_to: str = None) -> list:
+        """テイクのある（演者, 日付）の組み合わせを演者名・日付順に返す"""
+        conditions, params = [], []
+        if actors is not None:
+            conditions.append(f"actor IN ({', '.join('?' * len(actors))})")
+            params.extend(actors)
+        range_condition, range_params = date_condition(date_from, date_to)
+        if range_condition:
+            conditions.append(range_condition)
+            params.extend(range_params)
+        query = "SELECT DISTINCT actor, date FROM takes"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY actor, date"
+        with self._connect() as conn:
+            return [(row["actor"], row["date"]) for row in conn.execute(query, params)]
+
+    def count(self) -> int:
+        """登録されているテイクの数"""
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM takes").fetchone()[0]
+
+    def rebuild(self) -> dict:
+        """保存先ディレクトリを走査してインデックスを作り直す
+
+        ディスク上のファイルを登録し直し、存在しないファイルの登録を削除する。
+        登録済みのテイクのプロンプト・セリフと保存日時はそのまま残す。
+
+        Returns:
+            dict: 追加・更新・削除した件数と登録数（added, updated, removed, total）
+        """
+        with self._connect() as conn:
+            known = {row["path"] for row in conn.execute("SELECT path FROM takes")}
+
+        added = updated = 0
+        found = set()
+        rows = []
+        for actor, date, path in scan_takes(self.root_dir):
+            try:
+                info = sf.info(path)
+            except Exception as e:
+                logger.warning(f"音声ファイルを読み込めないため登録しません: {path}: {e}")
+                continue
+            key = self._key(path)
+            found.add(key)
+            recorded_at = datetime.fromtimestamp(os.path.getmtime(path)).isoformat(timespec="seconds")
+            rows.append((key, actor, date, recorded_at, info.duration, info.samplerate))
+            if key in known:
+                updated += 1
+            else:
+                added += 1
+
+        removed = known - found
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT INTO takes (path, actor, date, recorded_at, duration, samplerate) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (path) DO UPDATE SET "
+                "actor = excluded.actor, date = excluded.date, "
+                "duration = excluded.duration, samplerate = excluded.samplerate",
+                rows,
+            )
+            conn.executemany("DELETE FROM takes WHERE path = ?", [(key,) for key in removed])
+        total = self.count()
+        logger.info(f"テイクのインデックスを再構築しました: 追加={added}, 更新={updated}, 削除={len(removed)}, 登録数={total}")
+        return {"added": added, "updated": updated, "removed": len(removed), "total": total}
+
+
+def main():
+    """コマンドラインから実行するためのメイン関数"""
+    import argparse
+    from utils.audio import mix_audio
+
+    parser = argparse.ArgumentParser(description="保存したテイクのインデックスを操作します")
+    parser.add_argument("--root", default=mix_audio.ROOT_DIR, help="演者フォルダのあるディレクトリ")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("rebuild", help="ディスク上のファイルからインデックスを作り直す")
+    search = subparsers.add_parser("search", help="テイクを検索する")
+    search.add_argument("--actor", help="演者名")
+    search.add_argument("--from", dest="date_from", help="開始日（MMDD形式）")
+    search.add_argument("--to", dest="date_to", help="終了日（MMDD形式）")
+    search.add_argument("--text", help="セリフ・演技指導に含まれる文字列")
+    search.add_argument("--min-duration", type=float, help="最短の長さ（秒）")
+    search.add_argument("--max-duration", type=float, help="最長の長さ（秒）")
+    search.add_argument("--limit", type=int, help="表示する件数")
+    args = parser.parse_args()
+
+    index = TakeIndex.for_root(args.root)
+    if args.command == "rebuild":
+        result = index.rebuild()
+        print(f"追加: {result['added']}, 更新: {result['updated']}, 削除: {result['removed']}, 登録数: {result['total']}")
+        return
+
+    takes = index.find(
+        actor=args.actor,
+        date_from=args.date_from,
+        date_to=args.date_to,
+        text=args.text,
+        min_duration=args.min_duration,
+        max_duration=args.max_duration,
+        limit=args.limit,
+    )
+    for take in takes:
+        print(f"{take['recorded_at']}  {take['actor']}  {take['duration']:.1f}秒  {take['text']}  {take['path']}")
+    print(f"{len(takes)}件")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+from utils.logger import get_logger
+
+# ロガーの取得
+logger = get_logger()
+
+# Realtime APIの出力音声フォーマット（PCM16 / 24kHz / モノラル）
+SAMPLE_RATE = 24000
+
+# WSOLAのパラメーター
+FRAME_MS = 40  # 1フレームの長さ
+SEARCH_MS = 10  # 波形が最もよく重なる位置を探す範囲（前後）
+
+
+class WsolaStretcher:
+    """WSOLA（波形相似重畳加算法）で音程を保ったまま再生速度を変える
+
+    受信したPCM16データをチャンクごとに渡すと、処理できた分だけ変換後のデータを返す。
+    チャンクの分け方によらず、まとめて処理した場合と同じ結果になる。
+
+    各フレームは、前のフレームの自然な続きと最もよく重なる位置を
+    探索範囲内の相互相関（np.correlate）で求めてから重ね合わせる。
+    """
+
+    def __init__(self, speed: float, samplerate: int = SAMPLE_RATE, frame_ms: int = FRAME_MS, search_ms: int = SEARCH_MS):
+        """
+        Args:
+            speed (float): 再生速度（1.3で30%速く、0.8で20%遅く）
+            samplerate (int): サンプルレート
+            frame_ms (int): フレームの長さ（ミリ秒）
+            search_ms (int): 重なる位置を探す範囲（ミリ秒）
+        """
+        if speed <= 0:
+            raise ValueError(f"speedは0より大きい値を指定してください: {speed}")
+        self.speed = speed
+        self.frame = int(samplerate * frame_ms / 1000) // 2 * 2
+        self.synthesis_hop = self.frame // 2
+        self.analysis_hop = self.synthesis_hop * speed
+        self.tolerance = int(samplerate * search_ms / 1000)
+        # 50%重なりで合計が1になる窓（周期的なハン窓）
+        n = np.arange(self.frame)
+        self._window = (0.5 - 0.5 * np.cos(2 * np.pi * n / self.frame)).astype(np.float32)
+
+        hop = self.synthesis_hop
+        # 先頭のフェードインを避けるため、半フレーム分の無音を前に置いて処理し、その分の出力を捨てる
+        self._input = np.zeros(hop, dtype=np.float32)
+        self._offset = 0  # self._input[0]の絶対位置
+        self._frame_index = 0
+        self._prev_pos = None
+        self._overlap = np.zeros(self.frame, dtype=np.float32)
+        self._skip = hop
+        self._carry = b""
+        self._samples_in = 0
+        self._samples_out = 0
+
+    def process(self, pcm: bytes) -> bytes:
+        """PCM16データを追加し、変換できた分のPCM16データを返す"""
+        pcm = self._carry + pcm
+        if len(pcm) % 2:
+            # サンプルの途中で分割された場合は次のチャンクと結合する
+            self._carry = pcm[-1:]
+            pcm = pcm[:-1]
+        else:
+            self._carry = b""
+        samples = np.frombuffer(pcm, dtype="<i2").astype(np.float32)
+        self._samples_in += len(samples)
+        self._input = np.concatenate((self._input, samples))
+        return self._to_pcm(self._run())
+
+    def flush(self) -> bytes:
+        """残りのデータを変換して返す（入力の終わりに1回だけ呼び出す）"""
+        # 最後のフレームまで処理できるよう無音を追加する
+        self._input = np.concatenate((self._input, np.zeros(self.frame + 2 * self.tolerance, dtype=np.float32)))
+        output = self._run()
+        tail = np.concatenate((output, self._overlap))
+        # 出力の長さを入力の長さ/速度に揃える
+        expected = int(round(self._samples_in / self.speed))
+        remaining = max(0, expected - self._samples_out)
+        if len(tail) < remaining:
+            tail = np.concatenate((tail, np.zeros(remaining - len(tail), dtype=np.float32)))
+        tail = tail[:remaining]
+        self._overlap = np.zeros(self.frame, dtype=np.float32)
+        return self._to_pcm(tail)
+
+    def _run(self) -> np.ndarray:
+        """入力が揃っているフレームを処理し、確定した出力を返す"""
+        frame, hop, tolerance = self.frame, self.synthesis_hop, self.tolerance
+        overlap_len = frame - hop
+        input_end = self._offset + len(self._input)
+        outputs = []
+
+        while True:
+            nominal = int(round(self._frame_index * self.analysis_hop))
+            if self._prev_pos is None:
+                needed = nominal + frame
+            else:
+                needed = max(nominal + tolerance + frame, self._prev_pos + hop + frame)
+            if needed > input_end:
+                break
+
+            if self._prev_pos is None:
+                pos = nominal
+            else:
+                # 前のフレームの自然な続きと最もよく重なる位置を探す
+                natural = self._prev_pos + hop - self._offset
+                template = self._input[natural:natural + overlap_len]
+                start = max(nominal - tolerance, self._offset)
+                region = self._input[start - self._offset:nominal + tolerance + overlap_len - self._offset]
+                pos = start + int(np.argmax(np.correlate(region, template, "valid")))
+
+            local = pos - self._offset
+            self._overlap += self._window * self._input[local:local + frame]
+            outputs.append(self._overlap[:hop].copy())
+            self._overlap = np.concatenate((self._overlap[hop:], np.zeros(hop, dtype=np.float32)))
+            self._prev_pos = pos
+            self._frame_index += 1
+
+        # 以降のフレームで参照しない入力を捨てる
+        if self._prev_pos is not None:
+            next_nominal = int(round(self._frame_index * self.analysis_hop))
+            keep_from = min(next_nominal - tolerance, self._prev_pos + hop)
+            drop = max(0, keep_from - self._offset)
+            if drop:
+                self._input = self._input[drop:]
+                self._offset += drop
+
+        if not outputs:
+            return np.zeros(0, dtype=np.float32)
+        output = np.concatenate(outputs)
+        if self._skip:
+            skipped = min(self._skip, len(output))
+            output = output[skipped:]
+            self._skip -= skipped
+        return output
+
+    def _to_pcm(self, samples: np.ndarray) -> bytes:
+        self._samples_out += len(samples)
+        return np.clip(np.rint(samples), -32768, 32767).astype("<i2").tobytes()
+
+
+def create_stretcher(speed, samplerate: int = SAMPLE_RATE):
+    """演者の速度設定に応じたストレッチャーを作成する（等速の場合はNone）"""
+    try:
+        speed = float(speed)
+    except (TypeError, ValueError):
+        logger.warning(f"速度の設定が不正です: {speed}")
+        return None
+    if speed <= 0 or abs(speed - 1.0) < 1e-3:
+        return None
+    return WsolaStretcher(speed, samplerate)
+
+
+def time_stretch(pcm: bytes, speed: float, samplerate: int = SAMPLE_RATE) -> bytes:
+    """PCM16データ全体の再生速度を変える"""
+    stretcher = create_stretcher(speed, samplerate)
+    if stretcher is None:
+        return pcm
+    return stretcher.process(pcm) + stretcher.flush()
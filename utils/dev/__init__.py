@@ -0,0 +1 @@
+# utils.dev パッケージ
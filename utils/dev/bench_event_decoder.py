@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import time
+import base64
+from models.event_decoder import JSON_BACKEND, decode_event
+from utils.dev.mock_realtime_server import synthetic_pcm
+
+
+def make_delta_messages(count=2000, chunk_bytes=4800):
+    """ベンチマーク用のresponse.audio.deltaメッセージを作成する関数"""
+    pcm = synthetic_pcm(chunk_bytes / 2 / 24000)
+    delta = base64.b64encode(pcm).decode("ascii")
+    return [
+        json.dumps({
+            "type": "response.audio.delta",
+            "event_id": f"event_{i:06d}",
+            "response_id": "resp_bench",
+            "item_id": "item_bench",
+            "output_index": 0,
+            "content_index": 0,
+            "delta": delta,
+        }, separators=(",", ":"))
+        for i in range(count)
+    ], len(pcm)
+
+
+def _decode_with_json(message):
+    data = json.loads(message)
+    if data["type"] == "response.audio.delta":
+        return base64.b64decode(data["delta"])
+    return None
+
+
+def _decode_with_decoder(message):
+    event = decode_event(message)
+    if event.type == "response.audio.delta":
+        return event.audio
+    return None
+
+
+def run_benchmark(count=2000, chunk_bytes=4800, repeat=5):
+    """従来の方法（json.loads + b64decode）とデコーダーの処理速度を比較する関数
+
+    Returns:
+        dict: 方式ごとのevents/sとMB/s（PCM換算）
+    """
+    messages, pcm_bytes = make_delta_messages(count, chunk_bytes)
+    results = {}
+    for name, decode in (("json+b64decode", _decode_with_json), ("event_decoder", _decode_with_decoder)):
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for message in messages:
+                decode(message)
+            best = min(best, time.perf_counter() - started)
+        results[name] = {
+            "events_per_sec": count / best,
+            "pcm_mb_per_sec": count * pcm_bytes / best / 1e6,
+        }
+    return results
+
+
+def main():
+    """コマンドラインから実行するためのメイン関数"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="音声イベントのデコード速度を計測します")
+    parser.add_argument("--count", type=int, default=2000, help="イベント数")
+    parser.add_argument("--chunk-bytes", type=int, default=4800, help="1イベントあたりのPCMバイト数")
+    parser.add_argument("--repeat", type=int, default=5, help="繰り返し回数（最速値を採用）")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.count, args.chunk_bytes, args.repeat)
+    print(f"JSONバックエンド: {JSON_BACKEND}, イベント数: {args.count}, チャンク: {args.chunk_bytes}バイト")
+    for name, result in results.items():
+        print(f"{name:>16}: {result['events_per_sec']:>10.0f} events/s, {result['pcm_mb_per_sec']:>8.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import time
+import tempfile
+import tracemalloc
+import numpy as np
+import soundfile as sf
+from utils.audio import mix_audio
+from utils.audio.mix_audio import GAP_SECONDS, join_with_gaps
+from utils.dev.mock_realtime_server import synthetic_pcm
+
+SAMPLE_RATE = 24000
+
+
+def make_takes(count=500, seconds=1.0):
+    """ベンチマーク用のテイク（sf.readと同じfloat64）を作成する関数"""
+    base = np.frombuffer(synthetic_pcm(seconds), dtype="<i2").astype(np.float64) / 32768
+    return [base.copy() for _ in range(count)]
+
+
+def quadratic_join(takes, gap_samples):
+    """比較用の結合（1ファイルごとに全体をコピーし直す従来の方法）"""
+    combined = takes[0]
+    for audio_data in takes[1:]:
+        silence = np.zeros(gap_samples)
+        combined = np.concatenate([combined, silence, audio_data])
+    return combined
+
+
+def _measure(func, *args, **kwargs):
+    """処理時間とピークメモリ（tracemalloc）を計測する"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        result = func(*args, **kwargs)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, {"elapsed_sec": elapsed, "peak_mb": peak / 1e6}
+
+
+def run_benchmark(count=500, seconds=1.0, with_files=True):
+    """従来の結合とjoin_with_gaps、ファイルからのprocess_audio全体の処理時間を計測する関数
+
+    process_audioはストリーミング結合とメモリ上での結合の両方を計測する。
+
+    Returns:
+        dict: 方式ごとの処理時間（秒）とピークメモリ（MB）
+    """
+    takes = make_takes(count, seconds)
+    gap = int(GAP_SECONDS * SAMPLE_RATE)
+    results = {}
+
+    expected, results["quadratic_concat"] = _measure(quadratic_join, takes, gap)
+    combined, results["join_with_gaps"] = _measure(join_with_gaps, takes, gap)
+    assert np.array_equal(expected, combined)
+    del expected, combined
+
+    if with_files:
+        performer, date = "bench", "0101"
+        with tempfile.TemporaryDirectory() as root:
+            performer_dir = os.path.join(root, performer)
+            os.makedirs(performer_dir)
+            for i, take in enumerate(takes):
+                sf.write(os.path.join(performer_dir, f"{performer}_{date}_{i:04d}.wav"), take, SAMPLE_RATE, subtype="PCM_16")
+            original_root = mix_audio.ROOT_DIR
+            mix_audio.ROOT_DIR = root
+            try:
+                for name, streaming in (("process_audio_stream", True), ("process_audio_in_memory", False)):
+                    output, results[name] = _measure(mix_audio.process_audio, performer, date, streaming=streaming)
+                    if not output:
+                        raise RuntimeError("process_audioに失敗しました")
+            finally:
+                mix_audio.ROOT_DIR = original_root
+    return results
+
+
+def main():
+    """コマンドラインから実行するためのメイン関数"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="音声結合の処理時間を計測します")
+    parser.add_argument("--takes", type=int, default=500, help="テイク数")
+    parser.add_argument("--seconds", type=float, default=1.0, help="1テイクの長さ（秒）")
+    parser.add_argument("--no-files", action="store_true", help="ファイルからのprocess_audioを計測しない")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.takes, args.seconds, not args.no_files)
+    print(f"テイク数: {args.takes}, 1テイク: {args.seconds}秒")
+    for name, result in results.items():
+        print(f"{name:>24}: {result['elapsed_sec'] * 1000:>10.1f}ms, ピークメモリ {result['peak_mb']:>8.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
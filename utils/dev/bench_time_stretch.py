@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import time
+import numpy as np
+from utils.audio.time_stretch import SAMPLE_RATE, WsolaStretcher
+from utils.dev.mock_realtime_server import synthetic_pcm
+
+
+def reference_wsola(samples, speed, frame=960, tolerance=240):
+    """比較用のWSOLA（重なる位置の探索を候補ごとにループで行う素朴な実装）"""
+    hop = frame // 2
+    analysis_hop = hop * speed
+    window = 0.5 - 0.5 * np.cos(2 * np.pi * np.arange(frame) / frame)
+    padded = np.concatenate((np.zeros(hop), samples, np.zeros(frame + 2 * tolerance)))
+    output = np.zeros(int(len(padded) / speed) + frame)
+
+    prev_pos = 0
+    output[:frame] += window * padded[:frame]
+    k = 1
+    while True:
+        nominal = int(round(k * analysis_hop))
+        if nominal + tolerance + frame > len(padded) or k * hop + frame > len(output):
+            break
+        natural = padded[prev_pos + hop:prev_pos + 2 * hop]
+        best, best_score = nominal, -np.inf
+        for candidate in range(max(0, nominal - tolerance), nominal + tolerance + 1):
+            score = 0.0
+            segment = padded[candidate:candidate + hop]
+            for a, b in zip(segment, natural):
+                score += a * b
+            if score > best_score:
+                best, best_score = candidate, score
+        output[k * hop:k * hop + frame] += window * padded[best:best + frame]
+        prev_pos = best
+        k += 1
+
+    expected = int(round(len(samples) / speed))
+    return output[hop:hop + expected]
+
+
+def _run_streaming(pcm, speed, chunk_bytes):
+    stretcher = WsolaStretcher(speed)
+    for start in range(0, len(pcm), chunk_bytes):
+        stretcher.process(pcm[start:start + chunk_bytes])
+    stretcher.flush()
+
+
+def run_benchmark(seconds=10.0, speed=1.3, chunk_bytes=4800, reference_seconds=0.5):
+    """ストリーミング版WSOLAと素朴な実装の処理速度を比較する関数
+
+    素朴な実装は遅いため、reference_secondsの長さの音声で計測する。
+
+    Returns:
+        dict: 方式ごとの処理時間と実時間比（音声の秒数 / 処理時間）
+    """
+    pcm = synthetic_pcm(seconds)
+    reference_pcm = pcm[: int(SAMPLE_RATE * reference_seconds) * 2]
+    reference_samples = np.frombuffer(reference_pcm, dtype="<i2").astype(np.float64)
+
+    results = {}
+    started = time.perf_counter()
+    _run_streaming(pcm, speed, chunk_bytes)
+    elapsed = time.perf_counter() - started
+    results["wsola_stream"] = {"audio_sec": seconds, "elapsed_sec": elapsed, "x_realtime": seconds / elapsed}
+
+    started = time.perf_counter()
+    reference_wsola(reference_samples, speed)
+    elapsed = time.perf_counter() - started
+    results["reference_loop"] = {
+        "audio_sec": reference_seconds,
+        "elapsed_sec": elapsed,
+        "x_realtime": reference_seconds / elapsed,
+    }
+    return results
+
+
+def main():
+    """コマンドラインから実行するためのメイン関数"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="音程を保った速度変更（WSOLA）の処理速度を計測します")
+    parser.add_argument("--seconds", type=float, default=10.0, help="計測する音声の長さ（秒）")
+    parser.add_argument("--speed", type=float, default=1.3, help="再生速度")
+    parser.add_argument("--chunk-bytes", type=int, default=4800, help="1回に渡すPCMバイト数")
+    parser.add_argument("--reference-seconds", type=float, default=0.5, help="素朴な実装で計測する音声の長さ（秒）")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.seconds, args.speed, args.chunk_bytes, args.reference_seconds)
+    print(f"速度: {args.speed}, チャンク: {args.chunk_bytes}バイト")
+    for name, result in results.items():
+        print(
+            f"{name:>16}: 音声 {result['audio_sec']:.1f}秒を {result['elapsed_sec'] * 1000:.1f}ms"
+            f"（実時間の {result['x_realtime']:.1f} 倍速）"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,385 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+import time
+import base64
+import asyncio
+import threading
+import numpy as np
+from websockets.asyncio.server import serve
+from websockets.exceptions import ConnectionClosed
+from utils.logger import get_logger
+
+# ロガーの取得
+logger = get_logger()
+
+# Realtime APIの出力音声フォーマット（PCM16 / 24kHz / モノラル）
+SAMPLE_RATE = 24000
+
+# 失敗の種類
+#   error:      音声の代わりにerrorイベントを返す
+#   disconnect: fail_after_chunks個の音声を送った後に接続を切断する
+#   stall:      fail_after_chunks個の音声を送った後に応答を止める（タイムアウトの確認用）
+FAIL_MODES = ("error", "disconnect", "stall")
+
+
+def synthetic_pcm(duration_sec=2.0, frequency=440.0, samplerate=SAMPLE_RATE):
+    """テスト用のサイン波（PCM16）を作成する関数"""
+    t = np.arange(int(duration_sec * samplerate)) / samplerate
+    samples = 0.3 * np.sin(2 * np.pi * frequency * t)
+    return (samples * 32767).astype("<i2").tobytes()
+
+
+def load_recording(path):
+    """記録したサーバーイベント（1行1イベントのJSONL）を読み込む関数"""
+    events = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                events.append(json.loads(line))
+    return events
+
+
+def save_recording(events, path):
+    """サーバーイベントをJSONLとして保存する関数"""
+    with open(path, "w", encoding="utf-8") as f:
+        for event in events:
+            f.write(json.dumps(event, ensure_ascii=False) + "\n")
+
+
+class MockRealtimeServer:
+    """Realtime APIの一部を模擬するローカルWebSocketサーバー
+
+    session.update / conversation.item.create / conversation.item.delete /
+    response.create / response.cancel を受け付け、
+    音声（合成音または記録したイベント）を指定のチャンクサイズ・間隔で返す。
+    バックグラウンドスレッドで動作するため、同期コードからそのまま利用できる。
+
+    使用例:
+        with MockRealtimeServer(latency_ms=10) as server:
+            generator.ws_url = server.url
+            generator.generate_voice(...)
+    """
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=0,
+        audio=None,
+        events=None,
+        chunk_bytes=4800,
+        latency_ms=0.0,
+        ttfb_ms=0.0,
+        fail_mode=None,
+        fail_after_chunks=0,
+        fail_times=None,
+    ):
+        """
+        Args:
+            host (str): 待ち受けるホスト
+            port (int): 待ち受けるポート（0の場合は空いているポート）
+            audio (bytes, optional): 返す音声（PCM16）。省略時は2秒のサイン波
+            events (list, optional): 記録したサーバーイベント。指定時はaudioの代わりに再生する
+            chunk_bytes (int): audio.deltaあたりのバイト数
+            latency_ms (float): チャンク間の待ち時間
+            ttfb_ms (float): response.createから最初のチャンクまでの待ち時間
+            fail_mode (str, optional): 失敗の種類（FAIL_MODESのいずれか）
+            fail_after_chunks (int): disconnect / stall の前に送るチャンク数
+            fail_times (int, optional): 失敗させるレスポンス数（Noneの場合はすべて）
+        """
+        if fail_mode is not None and fail_mode not in FAIL_MODES:
+            raise ValueError(f"不明な失敗の種類です: {fail_mode}")
+
+        self.host = host
+        self.port = port
+        self.audio = synthetic_pcm() if audio is None else audio
+        self.events = events
+        self.chunk_bytes = chunk_bytes
+        self.latency_ms = latency_ms
+        self.ttfb_ms = ttfb_ms
+        self.fail_mode = fail_mode
+        self.fail_after_chunks = fail_after_chunks
+        self.fail_times = fail_times
+
+        # 統計情報
+        self.connections = 0
+        self.responses = 0
+        self.received = []
+
+        self._loop = None
+        self._thread = None
+        self._server = None
+        self._ids = 0
+
+    @property
+    def url(self):
+        """クライアントが接続するURL"""
+        return f"ws://{self.host}:{self.port}/v1/realtime"
+
+    def start(self):
+        """サーバーを起動する"""
+        if self._loop is not None:
+            return self.url
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start_server(), self._loop).result()
+        logger.info(f"モックRealtimeサーバーを起動: {self.url}")
+        return self.url
+
+    def stop(self):
+        """サーバーを停止する"""
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._stop_server(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop.close()
+        self._loop = None
+        self._thread = None
+        logger.info("モックRealtimeサーバーを停止しました")
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+        return False
+
+    async def _start_server(self):
+        self._server = await serve(self._handle, self.host, self.port, max_size=None, close_timeout=1)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def _stop_server(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    def _next_id(self, prefix):
+        self._ids += 1
+        return f"{prefix}_mock{self._ids:06d}"
+
+    async def _send(self, ws, event):
+        event.setdefault("event_id", self._next_id("event"))
+        await ws.send(json.dumps(event))
+
+    async def _handle(self, ws):
+        """1接続分のイベントを処理する"""
+        self.connections += 1
+        session = {"id": self._next_id("sess"), "voice": "alloy", "instructions": ""}
+        response_task = None
+        await self._send(ws, {"type": "session.created", "session": dict(session)})
+
+        try:
+            async for message in ws:
+                try:
+                    event = json.loads(message)
+                except ValueError:
+                    await self._send_error(ws, "invalid_json", "JSONを解析できません")
+                    continue
+                self.received.append(event)
+                event_type = event.get("type")
+
+                if event_type == "session.update":
+                    session.update(event.get("session", {}))
+                    await self._send(ws, {"type": "session.updated", "session": dict(session)})
+                elif event_type == "conversation.item.create":
+                    item = dict(event.get("item", {}))
+                    item["id"] = item.get("id") or self._next_id("item")
+                    await self._send(ws, {"type": "conversation.item.created", "item": item})
+                elif event_type == "conversation.item.delete":
+                    await self._send(ws, {"type": "conversation.item.deleted", "item_id": event.get("item_id")})
+                elif event_type == "response.create":
+                    if response_task and not response_task.done():
+                        await self._send_error(
+                            ws, "conversation_already_has_active_response", "生成中のレスポンスがあります"
+                        )
+                        continue
+                    response_task = asyncio.create_task(self._stream_response(ws))
+                elif event_type == "response.cancel":
+                    if response_task and not response_task.done():
+                        response_task.cancel()
+                        await self._send(ws, {
+                            "type": "response.done",
+                            "response": {"id": self._next_id("resp"), "status": "cancelled"},
+                        })
+                else:
+                    await self._send_error(ws, "unknown_event", f"未対応のイベントです: {event_type}")
+        except ConnectionClosed:
+            pass
+        finally:
+            if response_task and not response_task.done():
+                response_task.cancel()
+
+    async def _send_error(self, ws, code, message):
+        await self._send(ws, {
+            "type": "error",
+            "error": {"type": "invalid_request_error", "code": code, "message": message},
+        })
+
+    async def _stream_response(self, ws):
+        """1回分のレスポンスを返す"""
+        self.responses += 1
+        failing = self.fail_mode is not None and (
+            self.fail_times is None or self.responses <= self.fail_times
+        )
+        response_id = self._next_id("resp")
+        item_id = self._next_id("item")
+
+        try:
+            if failing and self.fail_mode == "error":
+                await self._send_error(ws, "server_error", "モックサーバーで失敗を発生させました")
+                return
+
+            await self._send(ws, {"type": "response.created", "response": {"id": response_id, "status": "in_progress"}})
+            if self.ttfb_ms:
+                await asyncio.sleep(self.ttfb_ms / 1000)
+
+            sent_chunks = 0
+            for event in self._response_events(response_id, item_id):
+                if event["type"] == "response.audio.delta":
+                    if failing and sent_chunks >= self.fail_after_chunks:
+                        await self._fail(ws)
+                        return
+                    if sent_chunks and self.latency_ms:
+                        await asyncio.sleep(self.latency_ms / 1000)
+                    sent_chunks += 1
+                await self._send(ws, event)
+        except ConnectionClosed:
+            pass
+
+    async def _fail(self, ws):
+        if self.fail_mode == "disconnect":
+            logger.info("モックサーバー: 接続を切断します")
+            # ネットワーク断を模擬するため、クローズ処理を行わずに切断する
+            ws.transport.abort()
+        else:
+            logger.info("モックサーバー: 応答を停止します")
+            await asyncio.Event().wait()
+
+    def _response_events(self, response_id, item_id):
+        """返すイベントを順に作成する"""
+        if self.events is not None:
+            # 記録したイベントをそのまま返す
+            for event in self.events:
+                yield dict(event)
+            return
+
+        for offset in range(0, len(self.audio), self.chunk_bytes):
+            chunk = self.audio[offset:offset + self.chunk_bytes]
+            yield {
+                "type": "response.audio.delta",
+                "response_id": response_id,
+                "item_id": item_id,
+                "output_index": 0,
+                "content_index": 0,
+                "delta": base64.b64encode(chunk).decode("ascii"),
+            }
+        yield {"type": "response.audio.done", "response_id": response_id, "item_id": item_id}
+        yield {"type": "response.done", "response": {"id": response_id, "status": "completed"}}
+
+
+def run_pipeline_benchmark(count=20, reuse_sessions=True, **server_kwargs):
+    """モックサーバーに対してVoiceGeneratorの生成を繰り返し、処理時間を計測する関数
+
+    Args:
+        count (int): 生成回数
+        reuse_sessions (bool): セッションを使い回すかどうか
+        **server_kwargs: MockRealtimeServerに渡す設定
+
+    Returns:
+        dict: 計測結果（合計時間、1回あたりの時間、音声の長さなど）
+    """
+    from models.voice_generator import VoiceGenerator
+
+    # モックサーバーはAPIキーを検証しない
+    os.environ.setdefault("OPENAI_API_KEY", "mock-key")
+
+    with MockRealtimeServer(**server_kwargs) as server:
+        generator = VoiceGenerator(reuse_sessions=reuse_sessions)
+        generator.ws_url = server.url
+        generator.set_actor(next(iter(generator.performer_configs), "ベンチマーク"))
+        try:
+            timings = []
+            for i in range(count):
+                started = time.perf_counter()
+                temp_file = generator.generate_voice("benchmark", "", f"テスト{i}")
+                timings.append(time.perf_counter() - started)
+                os.remove(temp_file)
+                generator.temp_file = None
+        finally:
+            generator.close()
+
+    total = sum(timings)
+    audio_sec = len(server.audio) / 2 / SAMPLE_RATE
+    return {
+        "count": count,
+        "total_sec": total,
+        "mean_ms": total / count * 1000,
+        "min_ms": min(timings) * 1000,
+        "max_ms": max(timings) * 1000,
+        "audio_sec_per_take": audio_sec,
+        "connections": server.connections,
+    }
+
+
+def main():
+    """コマンドラインから実行するためのメイン関数"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Realtime APIのモックサーバー")
+    parser.add_argument("--host", default="127.0.0.1", help="待ち受けるホスト")
+    parser.add_argument("--port", type=int, default=8765, help="待ち受けるポート")
+    parser.add_argument("--recording", help="再生するイベントの記録（JSONL）")
+    parser.add_argument("--duration", type=float, default=2.0, help="合成音の長さ（秒）")
+    parser.add_argument("--chunk-bytes", type=int, default=4800, help="audio.deltaあたりのバイト数")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="チャンク間の待ち時間")
+    parser.add_argument("--ttfb-ms", type=float, default=0.0, help="最初のチャンクまでの待ち時間")
+    parser.add_argument("--fail", choices=FAIL_MODES, help="失敗の種類")
+    parser.add_argument("--fail-after", type=int, default=0, help="失敗までに送るチャンク数")
+    parser.add_argument("--fail-times", type=int, help="失敗させるレスポンス数")
+    parser.add_argument("--bench", type=int, metavar="N", help="VoiceGeneratorでN回生成して計測する")
+    parser.add_argument("--no-reuse", action="store_true", help="計測時にセッションを使い回さない")
+
+    args = parser.parse_args()
+
+    server_kwargs = {
+        "host": args.host,
+        "audio": synthetic_pcm(args.duration),
+        "events": load_recording(args.recording) if args.recording else None,
+        "chunk_bytes": args.chunk_bytes,
+        "latency_ms": args.latency_ms,
+        "ttfb_ms": args.ttfb_ms,
+        "fail_mode": args.fail,
+        "fail_after_chunks": args.fail_after,
+        "fail_times": args.fail_times,
+    }
+
+    if args.bench:
+        result = run_pipeline_benchmark(args.bench, reuse_sessions=not args.no_reuse, **server_kwargs)
+        print(
+            f"{result['count']}回: 平均 {result['mean_ms']:.1f}ms "
+            f"(最小 {result['min_ms']:.1f}ms / 最大 {result['max_ms']:.1f}ms), "
+            f"音声 {result['audio_sec_per_take']:.1f}秒/回, 接続数 {result['connections']}"
+        )
+        return
+
+    server = MockRealtimeServer(port=args.port, **server_kwargs)
+    server.start()
+    print(f"モックRealtimeサーバー: {server.url} （Ctrl+Cで終了）")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
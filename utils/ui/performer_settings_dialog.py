@@ -8,6 +8,7 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt, pyqtSignal
 from utils.logger import get_logger
+from utils.audio.take_encoder import OUTPUT_FORMATS
 
 logger = get_logger()
 
@@ -179,6 +180,13 @@ APIキーの取得方法:
         self.speed_spin.valueChanged.connect(self.on_setting_changed)
         voice_layout.addWidget(self.speed_spin)
         
+        # 保存形式（flac / opusは保存後にバックグラウンドで変換）
+        voice_layout.addWidget(QLabel("保存形式:"))
+        self.format_combo = QComboBox()
+        self.format_combo.addItems(OUTPUT_FORMATS)
+        self.format_combo.currentTextChanged.connect(self.on_setting_changed)
+        voice_layout.addWidget(self.format_combo)
+        
         right_layout.addLayout(voice_layout)
         
         # 詳細情報を伸縮可能にするためのスペーサー
@@ -211,6 +219,7 @@ APIキーの取得方法:
         self.prompt_edit.setEnabled(enabled)
         self.voice_combo.setEnabled(enabled)
         self.speed_spin.setEnabled(enabled)
+        self.format_combo.setEnabled(enabled)
         
     def load_performers(self):
         """演者設定を読み込み"""
@@ -257,6 +266,7 @@ APIキーの取得方法:
             self.prompt_edit.blockSignals(True)
             self.voice_combo.blockSignals(True)
             self.speed_spin.blockSignals(True)
+            self.format_combo.blockSignals(True)
             
             self.name_edit.setText(performer_name)
             self.prompt_edit.setPlainText(performer_data.get('system_prompt', ''))
@@ -268,11 +278,15 @@ APIキーの取得方法:
                 
             self.speed_spin.setValue(performer_data.get('speed', 1.0))
             
+            index = self.format_combo.findText(performer_data.get('format', 'wav'))
+            self.format_combo.setCurrentIndex(max(index, 0))
+            
             # シグナルを再有効化
             self.name_edit.blockSignals(False)
             self.prompt_edit.blockSignals(False)
             self.voice_combo.blockSignals(False)
             self.speed_spin.blockSignals(False)
+            self.format_combo.blockSignals(False)
             
     def on_setting_changed(self):
         """設定が変更された時の処理"""
@@ -312,7 +326,8 @@ APIキーの取得方法:
             self.performers[self.current_performer].update({
                 'system_prompt': self.prompt_edit.toPlainText(),
                 'voice': self.voice_combo.currentText(),
-                'speed': self.speed_spin.value()
+                'speed': self.speed_spin.value(),
+                'format': self.format_combo.currentText()
             })
             
     def add_performer(self):
@@ -7,20 +7,29 @@ from PyQt6.QtWidgets import (
     QTextEdit,
     QPushButton,
     QMessageBox,
-    QApplication,
     QComboBox,
     QProgressBar,
+    QCheckBox,
+    QSpinBox,
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, Qt, pyqtSignal
 import json
 from datetime import datetime
 import os
 from models.voice_generator import VoiceGenerator
+from models.async_voice_generator import AsyncVoiceGenerator
+from models.cancellation import CancelToken, GenerationCancelled
 from utils.logger import get_logger
 
 # ロガーの取得
 logger = get_logger()
 
+# 1回の生成のタイムアウト（秒）。応答が止まった場合にGUIが固まり続けないようにする
+GENERATION_TIMEOUT = 120
+
+# 同時に生成できるテイク数の上限（テイクごとにWebSocket接続を1つ使う）
+MAX_TAKES = 4
+
 # アプリケーションのルートディレクトリを取得
 # PyInstaller で実行されている場合の対応
 import sys
@@ -33,10 +42,17 @@ else:
 
 
 class FocusTextEdit(QTextEdit):
+    # フォーカスを受け取った時に通知するシグナル
+    focused = pyqtSignal()
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setTabChangesFocus(True)  # Tabキーでフォーカス移動を有効化
 
+    def focusInEvent(self, event):
+        super().focusInEvent(event)
+        self.focused.emit()
+
     def keyPressEvent(self, event):
         if (
             event.key() == Qt.Key.Key_Return
@@ -51,6 +67,40 @@ class FocusTextEdit(QTextEdit):
             super().keyPressEvent(event)
 
 
+class WorkerSignals(QObject):
+    # 進行状況のメッセージ
+    progress = pyqtSignal(str)
+    # 処理結果（fnの戻り値）
+    result = pyqtSignal(object)
+    # 処理中に発生した例外
+    error = pyqtSignal(object)
+    # 成功・失敗にかかわらず処理の終了時に通知する
+    finished = pyqtSignal()
+
+
+class Worker(QRunnable):
+    """処理をQThreadPoolのスレッドで実行し、進行状況・結果・エラーをシグナルで通知する
+
+    fnは進行状況を通知するコールバックを1つ受け取る。
+    シグナルはGUIスレッドで作成したWorkerSignalsから送るため、接続したスロットはGUIスレッドで呼び出される。
+    """
+
+    def __init__(self, fn):
+        super().__init__()
+        self.fn = fn
+        self.signals = WorkerSignals()
+
+    def run(self):
+        try:
+            result = self.fn(self.signals.progress.emit)
+        except Exception as e:
+            self.signals.error.emit(e)
+        else:
+            self.signals.result.emit(result)
+        finally:
+            self.signals.finished.emit()
+
+
 class VoiceGeneratorGUI(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -58,6 +108,14 @@ class VoiceGeneratorGUI(QMainWindow):
         
         # VoiceGeneratorを初期化（APIキーエラーの場合は設定ダイアログを表示）
         self.voice_generator = None
+        # 複数テイクの同時生成用（必要になった時に作成する）
+        self.take_generator = None
+        self.takes = []
+        # 生成・再生・結合を実行するスレッド（GUIスレッドでは待たない）
+        self.thread_pool = QThreadPool()
+        self._worker = None
+        self._cancel_token = None
+        self._playback_workers = set()
         
         # プロンプトの初期値を設定（後でJSONから読み込まれる）
         self.prompts = {}
@@ -71,7 +129,14 @@ class VoiceGeneratorGUI(QMainWindow):
     def _initialize_voice_generator(self):
         """VoiceGeneratorを初期化（APIキーエラー時は設定ダイアログを表示）"""
         try:
-            self.voice_generator = VoiceGenerator()
+            # 再初期化の場合は維持している接続を閉じる
+            if self.voice_generator:
+                self.voice_generator.close()
+            self._close_take_generator()
+            # 演者ごとの接続を使い回して2回目以降の生成を高速化
+            # 同じ内容の生成はキャッシュから即座に返す
+            # 生成した音声は保存するまでメモリに保持し、ファイルを介さずに再生する
+            self.voice_generator = VoiceGenerator(reuse_sessions=True, use_cache=True, memory_takes=True)
             # 初期の演者を設定
             if self.prompts:
                 first_actor = list(self.prompts.keys())[0]
@@ -172,17 +237,22 @@ class VoiceGeneratorGUI(QMainWindow):
         layout.addWidget(QLabel("セリフ:"))
         self.text_input = FocusTextEdit()
         self.text_input.setPlaceholderText("セリフを入力してください")
+        # セリフの入力を始めた時点でセッションを準備しておく
+        self.text_input.focused.connect(self.prewarm_session)
         layout.addWidget(self.text_input)
 
         # ボタン
         button_layout = QHBoxLayout()
         self.generate_btn = QPushButton("生成")
+        self.stop_btn = QPushButton("停止")
+        self.stop_btn.setEnabled(False)  # 生成中のみ有効
         self.play_btn = QPushButton("再生")
         self.save_btn = QPushButton("保存")
         self.mix_btn = QPushButton("結合")
         self.settings_btn = QPushButton("設定")
 
         self.generate_btn.clicked.connect(self.generate_voice)
+        self.stop_btn.clicked.connect(self.stop_generation)
         self.play_btn.clicked.connect(self.play_voice)
         self.save_btn.clicked.connect(self.save_voice)
         self.mix_btn.clicked.connect(self.mix_audio)
@@ -192,9 +262,30 @@ class VoiceGeneratorGUI(QMainWindow):
         self.generate_btn.setShortcut("Ctrl+Return")  # Ctrl+Enterで生成
 
         button_layout.addWidget(self.generate_btn)
+        button_layout.addWidget(self.stop_btn)
         button_layout.addWidget(self.play_btn)
         button_layout.addWidget(self.save_btn)
         button_layout.addWidget(self.mix_btn)
+
+        # 受信しながら再生（最初の音声が届いてすぐに再生を始める）
+        self.stream_checkbox = QCheckBox("受信しながら再生")
+        self.stream_checkbox.setChecked(True)
+        button_layout.addWidget(self.stream_checkbox)
+        # 同じ内容でも別のテイクを録りたい場合はキャッシュを使わない
+        self.fresh_checkbox = QCheckBox("新しいテイク")
+        self.fresh_checkbox.setToolTip("チェックするとキャッシュを使わずに生成し直します")
+        button_layout.addWidget(self.fresh_checkbox)
+        # 同じセリフを複数テイク同時に生成して聴き比べる
+        button_layout.addWidget(QLabel("テイク数:"))
+        self.takes_spin = QSpinBox()
+        self.takes_spin.setRange(1, MAX_TAKES)
+        self.takes_spin.setValue(1)
+        self.takes_spin.setToolTip("2以上にすると、独立した接続で同時に生成します")
+        button_layout.addWidget(self.takes_spin)
+        self.take_combo = QComboBox()
+        self.take_combo.setToolTip("再生・保存するテイク")
+        self.take_combo.setVisible(False)  # 複数テイクを生成した時のみ表示
+        button_layout.addWidget(self.take_combo)
         button_layout.addStretch()  # 右寄せのためのスペーサー
         button_layout.addWidget(self.settings_btn)
         layout.addLayout(button_layout)
@@ -228,10 +319,44 @@ class VoiceGeneratorGUI(QMainWindow):
         
         layout.addLayout(progress_layout)
 
+    def closeEvent(self, event):
+        """ウィンドウを閉じる時に実行中の生成を中止し、接続を閉じる"""
+        if self.is_busy():
+            self.stop_generation()
+        self.thread_pool.waitForDone(5000)
+        if self.voice_generator:
+            self.voice_generator.close()
+        self._close_take_generator()
+        super().closeEvent(event)
+
+    def _close_take_generator(self):
+        """複数テイク用の接続とイベントループを閉じる"""
+        if self.take_generator:
+            self.take_generator.close()
+            self.take_generator = None
+        self._clear_takes()
+
+    def _clear_takes(self):
+        """テイクの選択肢をクリア（未保存のテイクは次の生成時に削除される）"""
+        self.takes = []
+        if hasattr(self, "take_combo"):
+            self.take_combo.clear()
+            self.take_combo.setVisible(False)
+
+    def selected_take(self):
+        """選択中のテイクの一時ファイル（未保存のもの）。テイクがなければNone"""
+        index = self.take_combo.currentIndex()
+        if 0 <= index < len(self.takes):
+            return self.takes[index]
+        return None
+
     def get_current_actor(self):
         return self.actor_combo.currentText() if hasattr(self, "actor_combo") else None
 
     def on_actor_changed(self, actor):
+        if self.is_busy():
+            # 生成中は演者を切り替えない（選択欄は無効にしている）
+            return
         if actor and hasattr(self, "prompts") and actor in self.prompts:
             # システムプロンプトを更新
             self.system_prompt.setText(self.prompts[actor]["system_prompt"])
@@ -239,79 +364,232 @@ class VoiceGeneratorGUI(QMainWindow):
             if hasattr(self, 'voice_generator') and self.voice_generator:
                 self.voice_generator.set_actor(actor)
                 logger.info(f"演者を切り替え: {actor}")
+                # 生成ボタンを押す前に接続とセッション設定を済ませておく
+                self.prewarm_session()
 
-    def generate_voice(self):
+    def prewarm_session(self):
+        """現在の演者のセッションをバックグラウンドで準備"""
+        if not self.voice_generator:
+            return
         try:
-            # プログレスバーとステータス表示を開始
-            self.progress_bar.setVisible(True)
-            self.progress_bar.setRange(0, 0)  # 不確定なプログレス
-            self.status_label.setText("🎤 音声生成中...")
-            self.status_label.setStyleSheet("QLabel { color: #2196F3; font-weight: bold; }")
-            self.generate_btn.setEnabled(False)
-            self.play_btn.setEnabled(False)
-            self.save_btn.setEnabled(False)
-            QApplication.processEvents()  # UIを更新
+            self.voice_generator.prewarm(self.system_prompt.toPlainText())
+        except Exception as e:
+            logger.warning(f"セッションの事前準備に失敗: {e}")
+
+    def is_busy(self) -> bool:
+        """生成または結合を実行中かどうか"""
+        return self._worker is not None
+
+    def _start_worker(self, fn, on_result, on_error, on_progress=None) -> Worker:
+        """fnをワーカースレッドで実行し、結果・エラー・進行状況をGUIスレッドで受け取る"""
+        worker = Worker(fn)
+        worker.signals.result.connect(on_result)
+        worker.signals.error.connect(on_error)
+        if on_progress:
+            worker.signals.progress.connect(on_progress)
+        worker.signals.finished.connect(self._on_worker_finished)
+        self._worker = worker
+        self.thread_pool.start(worker)
+        return worker
+
+    def _on_worker_finished(self):
+        self._worker = None
+        self._cancel_token = None
+        self._reset_ui_state()
 
-            # VoiceGeneratorが初期化されているかチェック
-            if not self.voice_generator:
-                msg = "⚠️ APIキーが設定されていません。設定画面でAPIキーを設定してください。"
-                logger.warning(msg)
-                self.status_label.setText(msg)
-                self.status_label.setStyleSheet("QLabel { color: #FF9800; font-weight: bold; }")
-                self._show_api_key_setup()
-                self._reset_ui_state()
-                return
-            
-            text = self.text_input.toPlainText()
-            if not text.strip():
-                msg = "⚠️ セリフが入力されていません"
-                logger.warning(msg)
-                self.status_label.setText(msg)
-                self.status_label.setStyleSheet("QLabel { color: #FF9800; font-weight: bold; }")
+    def generate_voice(self):
+        if self.is_busy():
+            return
+
+        # VoiceGeneratorが初期化されているかチェック
+        if not self.voice_generator:
+            msg = "⚠️ APIキーが設定されていません。設定画面でAPIキーを設定してください。"
+            logger.warning(msg)
+            self.status_label.setText(msg)
+            self.status_label.setStyleSheet("QLabel { color: #FF9800; font-weight: bold; }")
+            self._show_api_key_setup()
+            return
+
+        text = self.text_input.toPlainText()
+        if not text.strip():
+            msg = "⚠️ セリフが入力されていません"
+            logger.warning(msg)
+            self.status_label.setText(msg)
+            self.status_label.setStyleSheet("QLabel { color: #FF9800; font-weight: bold; }")
+            return
+
+        # プログレスバーとステータス表示を開始
+        self.progress_bar.setVisible(True)
+        self.progress_bar.setRange(0, 0)  # 不確定なプログレス
+        self.status_label.setText("🎤 音声生成中...")
+        self.status_label.setStyleSheet("QLabel { color: #2196F3; font-weight: bold; }")
+        self.generate_btn.setEnabled(False)
+        self.stop_btn.setEnabled(True)
+        self.play_btn.setEnabled(False)
+        self.save_btn.setEnabled(False)
+        # 生成中に演者や設定（生成エンジン）が切り替わらないようにする
+        self.actor_combo.setEnabled(False)
+        self.settings_btn.setEnabled(False)
+
+        take_count = self.takes_spin.value()
+        if take_count > 1:
+            try:
+                self._generate_takes(text, take_count)
+            except Exception as e:
+                # テイク用の生成エンジンを作成できなかった場合など
+                self._on_generation_error(e)
                 self._reset_ui_state()
-                return
+            return
+
+        self._clear_takes()
+        stream_playback = self.stream_checkbox.isChecked()
+        # 生成はワーカースレッドで行い、GUIスレッドは描画と停止ボタンの操作を受け付ける
+        self._cancel_token = CancelToken()
+        system_prompt = self.system_prompt.toPlainText()
+        acting_prompt = self.acting_prompt.toPlainText()
+        force_fresh = self.fresh_checkbox.isChecked()
+        cancel_token = self._cancel_token
+
+        def generate(progress):
+            return self.voice_generator.generate_voice(
+                system_prompt,
+                acting_prompt,
+                text,
+                progress_callback=progress,
+                stream_playback=stream_playback,
+                force_fresh=force_fresh,
+                timeout=GENERATION_TIMEOUT,
+                cancel_token=cancel_token,
+            )
+
+        self._start_worker(
+            generate,
+            lambda _: self._on_voice_generated(stream_playback),
+            self._on_generation_error,
+            self.status_label.setText,
+        )
 
-            # プログレスコールバック関数
-            def update_progress(message):
-                self.status_label.setText(message)
-                QApplication.processEvents()
+    def _on_voice_generated(self, stream_playback):
+        """生成完了（GUIスレッドで呼び出される）"""
+        self.status_label.setText("✅ 音声生成完了")
+        cache = getattr(self.voice_generator, "cache", None)
+        if cache:
+            logger.info(f"キャッシュ: ヒット={cache.hits}, ミス={cache.misses}")
+        self.status_label.setStyleSheet("QLabel { color: #4CAF50; font-weight: bold; }")
+        self._show_latest_metrics()
+        # ストリーミング再生時は受信中に再生済み
+        if not stream_playback:
+            self.play_voice()
 
-            self.voice_generator.generate_voice(
-                self.system_prompt.toPlainText(),
-                self.acting_prompt.toPlainText(),
+    def _on_generation_error(self, error):
+        """生成の中止・エラー（GUIスレッドで呼び出される）"""
+        if isinstance(error, GenerationCancelled):
+            self.status_label.setText("⏹ 音声生成を中止しました")
+            self.status_label.setStyleSheet("QLabel { color: #FF9800; font-weight: bold; }")
+            return
+        error_msg = f"❌ 音声生成エラー: {str(error)}"
+        logger.error(error_msg, exc_info=error)
+        self.status_label.setText(error_msg)
+        self.status_label.setStyleSheet("QLabel { color: #F44336; font-weight: bold; }")
+
+    def _generate_takes(self, text, count):
+        """同じセリフを複数テイク同時に生成し、テイクの選択肢に追加"""
+        if not self.take_generator:
+            self.take_generator = AsyncVoiceGenerator(max_concurrency=MAX_TAKES, memory_takes=True)
+        self._clear_takes()
+        self.status_label.setText(f"🎤 {count}テイクを同時に生成中...")
+
+        take_generator = self.take_generator
+        system_prompt = self.system_prompt.toPlainText()
+        acting_prompt = self.acting_prompt.toPlainText()
+        actor = self.get_current_actor()
+
+        def generate(progress):
+            return take_generator.generate_takes_sync(
+                system_prompt,
+                acting_prompt,
                 text,
-                progress_callback=update_progress
+                count,
+                actor=actor,
+                timeout=GENERATION_TIMEOUT,
             )
-            
-            # 生成完了
-            self.status_label.setText("✅ 音声生成完了")
-            self.status_label.setStyleSheet("QLabel { color: #4CAF50; font-weight: bold; }")
-            self.play_voice()
-        except Exception as e:
-            error_msg = f"❌ 音声生成エラー: {str(e)}"
-            logger.error(error_msg, exc_info=True)
-            self.status_label.setText(error_msg)
-            self.status_label.setStyleSheet("QLabel { color: #F44336; font-weight: bold; }")
-        finally:
-            self._reset_ui_state()
+
+        self._start_worker(generate, lambda takes: self._on_takes_generated(takes, count), self._on_generation_error)
+
+    def _on_takes_generated(self, takes, count):
+        """複数テイクの生成完了（GUIスレッドで呼び出される）"""
+        self.takes = takes
+        self.take_combo.addItems([f"テイク{i}" for i in range(1, len(self.takes) + 1)])
+        self.take_combo.setVisible(True)
+
+        message = f"✅ {len(self.takes)}テイクを生成しました（テイクを選んで再生・保存できます）"
+        if len(self.takes) < count:
+            message += f" - {count - len(self.takes)}テイクは失敗"
+        self.status_label.setText(message)
+        self.status_label.setStyleSheet("QLabel { color: #4CAF50; font-weight: bold; }")
+
+    def _show_latest_metrics(self):
+        """直近の生成時間をステータスバーに表示"""
+        latest = self.voice_generator.metrics.latest
+        if not latest:
+            return
+        if latest.get("cache_hit"):
+            message = f"キャッシュから取得 / 合計 {latest['total_ms']:.0f}ms"
+        else:
+            message = (
+                f"TTFB {latest['ttfb_ms']:.0f}ms / 合計 {latest['total_ms']:.0f}ms"
+                f"（音声 {latest['audio_sec']:.1f}秒）"
+            )
+        self.statusBar().showMessage(message)
+
+    def stop_generation(self):
+        """生成中の音声を中止し、再生も止める"""
+        if not self.voice_generator:
+            return
+        self.status_label.setText("⏹ 中止しています...")
+        # 生成の開始前に押された場合も中止できるよう、ワーカーに渡したトークンも中止する
+        if self._cancel_token:
+            self._cancel_token.cancel()
+        self.voice_generator.cancel()
+        if self.take_generator:
+            self.take_generator.cancel()
+        self.voice_generator.stop_playback()
 
     def _reset_ui_state(self):
         """UIの状態をリセット"""
         self.progress_bar.setVisible(False)
         self.generate_btn.setEnabled(True)
+        self.stop_btn.setEnabled(False)
         self.play_btn.setEnabled(True)
         self.save_btn.setEnabled(True)
+        self.actor_combo.setEnabled(True)
+        self.settings_btn.setEnabled(True)
 
     def play_voice(self):
         try:
             if not self.voice_generator:
                 self.status_label.setText("APIキーが設定されていません")
                 return
-            self.voice_generator.play_audio()
+            # 複数テイクを生成した場合は選択中のテイクを再生
+            take = self.selected_take()
+            if self.takes and not take:
+                self.status_label.setText("選択中のテイクは保存済みです")
+                return
+            # テイクはメモリに保持されているため、生成した側で再生する
+            generator = self.take_generator if take else self.voice_generator
+            # 再生の終了を待つ間もGUIが固まらないよう、ワーカースレッドで再生する
+            worker = Worker(lambda progress: generator.play_audio(take))
+            worker.signals.error.connect(self._on_playback_error)
+            worker.signals.finished.connect(lambda: self._playback_workers.discard(worker))
+            self._playback_workers.add(worker)
+            self.thread_pool.start(worker)
         except Exception as e:
-            error_msg = f"音声再生エラー: {str(e)}"
-            logger.error(error_msg, exc_info=True)
-            self.status_label.setText(error_msg)
+            self._on_playback_error(e)
+
+    def _on_playback_error(self, error):
+        error_msg = f"音声再生エラー: {str(error)}"
+        logger.error(error_msg, exc_info=error)
+        self.status_label.setText(error_msg)
 
     def save_voice(self):
         try:
@@ -320,7 +598,20 @@ class VoiceGeneratorGUI(QMainWindow):
                 return
             actor = self.get_current_actor()
             if actor:
-                saved_path = self.voice_generator.save_voice(actor)
+                take = self.selected_take()
+                if self.takes and not take:
+                    self.status_label.setText("保存するテイクがありません")
+                    return
+                if take:
+                    # テイクを生成したプロンプト・セリフと一緒に登録するため、生成した側で保存する
+                    saved_path = self.take_generator.save_voice(actor, take)
+                else:
+                    saved_path = self.voice_generator.save_voice(actor)
+                if take and saved_path:
+                    # 保存したテイクは一時ファイルではなくなるため選択肢に印を付ける
+                    index = self.takes.index(take)
+                    self.takes[index] = None
+                    self.take_combo.setItemText(index, f"テイク{index + 1}（保存済み）")
                 if saved_path:
                     msg = f"保存完了: {saved_path}"
                     logger.info(msg)
@@ -336,6 +627,8 @@ class VoiceGeneratorGUI(QMainWindow):
 
     def mix_audio(self):
         """音声ファイルを結合して無音を除去する"""
+        if self.is_busy():
+            return
         try:
             # 現在選択されている演者を取得
             actor = self.get_current_actor()
@@ -357,47 +650,21 @@ class VoiceGeneratorGUI(QMainWindow):
                 return
 
             self.status_label.setText(f"{actor}の音声を結合中...")
-            QApplication.processEvents()
-
-            # 音声結合処理
-            try:
-                from utils.audio.mix_audio import process_audio
-
-                # すべての処理を一度に実行（音声結合と無音除去）
-                output_file = process_audio(actor, current_date)
-
-                if output_file:
-                    self.status_label.setText(
-                        f"音声結合完了: {os.path.basename(output_file)}"
-                    )
-
-                    # 結果を表示する確認ダイアログ
-                    QMessageBox.information(
-                        self,
-                        "処理完了",
-                        f"音声結合が完了しました。\nファイル: {output_file}",
-                        QMessageBox.StandardButton.Ok,
-                    )
-                else:
-                    self.status_label.setText("音声結合に失敗しました")
-                    QMessageBox.warning(
-                        self,
-                        "エラー",
-                        "音声結合処理に失敗しました。ログを確認してください。",
-                        QMessageBox.StandardButton.Ok,
-                    )
+            self.progress_bar.setVisible(True)
+            self.progress_bar.setRange(0, 0)
+            self.generate_btn.setEnabled(False)
+            self.actor_combo.setEnabled(False)
+            self.settings_btn.setEnabled(False)
 
-            except Exception as e:
-                import traceback
+            # 音声結合処理（結合中もGUIが固まらないようワーカースレッドで実行）
+            from utils.audio.mix_audio import process_audio
 
-                logger.error(f"音声結合エラー: {str(e)}\n{traceback.format_exc()}")
-                self.status_label.setText("音声結合エラー")
-                QMessageBox.critical(
-                    self,
-                    "エラー",
-                    f"音声結合中にエラーが発生しました:\n{str(e)}",
-                    QMessageBox.StandardButton.Ok,
-                )
+            # すべての処理を一度に実行（音声結合と無音除去）
+            self._start_worker(
+                lambda progress: process_audio(actor, current_date),
+                self._on_mixed,
+                self._on_mix_error,
+            )
 
         except Exception as e:
             logger.error(f"音声結合エラー: {str(e)}")
@@ -409,8 +676,44 @@ class VoiceGeneratorGUI(QMainWindow):
                 QMessageBox.StandardButton.Ok,
             )
     
+    def _on_mixed(self, output_file):
+        """音声結合の完了（GUIスレッドで呼び出される）"""
+        if output_file:
+            self.status_label.setText(
+                f"音声結合完了: {os.path.basename(output_file)}"
+            )
+
+            # 結果を表示する確認ダイアログ
+            QMessageBox.information(
+                self,
+                "処理完了",
+                f"音声結合が完了しました。\nファイル: {output_file}",
+                QMessageBox.StandardButton.Ok,
+            )
+        else:
+            self.status_label.setText("音声結合に失敗しました")
+            QMessageBox.warning(
+                self,
+                "エラー",
+                "音声結合処理に失敗しました。ログを確認してください。",
+                QMessageBox.StandardButton.Ok,
+            )
+
+    def _on_mix_error(self, error):
+        """音声結合のエラー（GUIスレッドで呼び出される）"""
+        logger.error(f"音声結合エラー: {str(error)}", exc_info=error)
+        self.status_label.setText("音声結合エラー")
+        QMessageBox.critical(
+            self,
+            "エラー",
+            f"音声結合中にエラーが発生しました:\n{str(error)}",
+            QMessageBox.StandardButton.Ok,
+        )
+
     def open_settings(self):
-        """設定ダイアログを開く"""
+        """設定ダイアログを開く（生成・結合中は開かない）"""
+        if self.is_busy():
+            return
         try:
             from .performer_settings_dialog import PerformerSettingsDialog
             